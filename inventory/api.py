@@ -0,0 +1,472 @@
+"""Local HTTP/JSON API over the inventory service, for scanners and scripts.
+
+Runs without Qt or a display. Every request except /health needs HTTP Basic
+credentials of an app user; users, categories and thresholds can only be
+changed by admins. Stock can be moved one product at a time or in batches
+(`POST /stock`), which are applied in one transaction.
+
+    python -m inventory.api                        # http://127.0.0.1:8765
+    python -m inventory.api --host 0.0.0.0 --port 9000 --workers 16
+
+    curl -u admin:admin123 localhost:8765/products?search=lap
+    curl -u admin:admin123 -X POST localhost:8765/stock \\
+         -d '{"movements": [{"sku": "SKU123", "change": -1, "reason": "Sold"}]}'
+
+Routes (JSON in, JSON out):
+
+    GET    /health
+    GET    /products?search=&category_id=&after=&limit=     → {"products": [...], "next": after}
+                                  (category_id includes its subcategories)
+    POST   /products                                        → {"id": ...}
+    GET    /products/<id>          PUT /products/<id>       DELETE /products/<id>
+    GET    /products/sku/<sku>
+    POST   /products/<id>/stock    {"change", "reason"}     → {"quantity": ...}
+    POST   /stock                  {"movements": [...]}     → {"quantities": [...]}
+    GET    /stock/summary          GET /stock/low?limit=    GET /stock/as-of?moment=&product_id=
+    GET    /categories             POST /categories (admin) PUT /categories/thresholds (admin)
+    GET    /categories/children?parent_id=                  → {"categories": [...]} (no parent_id: top level)
+    GET    /categories/<id>/path   PUT /categories/<id> {"name", "parent_id"} (admin)   DELETE /categories/<id> (admin)
+    GET    /users (admin)          POST /users (admin)      PUT|DELETE /users/<id> (admin)
+    GET    /logs?after=&limit=&username=&action=&product=&date_from=&date_to=
+"""
+import argparse
+import base64
+import binascii
+import json
+import math
+import os
+import re
+import sqlite3
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from inventory import categories, logs, products, users
+from inventory.records import Movement
+from models import db_manager
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 8
+MAX_BODY_BYTES = 10 * 1024 * 1024
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _int(value, name):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ApiError(400, f"{name} must be a whole number.")
+
+
+def _float(value, name):
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        number = math.nan
+    if not math.isfinite(number):
+        raise ApiError(400, f"{name} must be a number.")
+    return number
+
+
+def _optional_int(value, name):
+    return None if value in (None, "") else _int(value, name)
+
+
+def _str(value, name):
+    if not isinstance(value, str):
+        raise ApiError(400, f"{name} must be a string.")
+    return value
+
+
+def _optional_str(value, name):
+    return None if value is None else _str(value, name)
+
+
+def _require(body, *names):
+    missing = [name for name in names if name not in body]
+    if missing:
+        raise ApiError(400, f"Missing field(s): {', '.join(missing)}.")
+
+
+def _found(record, what="product"):
+    if record is None:
+        raise ApiError(404, f"No such {what}.")
+    return record
+
+
+def _after(value):
+    """Paging keys travel as JSON: an id, or [rank, id] for ranked searches."""
+    if not value:
+        return None
+    try:
+        after = json.loads(value)
+    except ValueError:
+        raise ApiError(400, "after must be the `next` value of the previous page.")
+    return tuple(after) if isinstance(after, list) else after
+
+
+# 🛣️ Handlers: (user, path groups, query, body) → (status, payload)
+
+def list_products(user, query, body):
+    page, after = products.list_page(
+        query.get("search", ""), _optional_int(query.get("category_id"), "category_id"),
+        _after(query.get("after")), _int(query.get("limit", products.PAGE_SIZE), "limit")
+    )
+    return 200, {"products": [row._asdict() for row in page], "next": after}
+
+
+def get_product(user, query, body, product_id):
+    return 200, _found(products.get_product(_int(product_id, "id")))._asdict()
+
+
+def get_product_by_sku(user, query, body, sku):
+    return 200, _found(products.find_by_sku(unquote(sku)))._asdict()
+
+
+def add_product(user, query, body):
+    _require(body, "name")
+    product_id = products.add_product(
+        user.username, _str(body["name"], "name"), _optional_int(body.get("category_id"), "category_id"),
+        _optional_str(body.get("sku", ""), "sku"), _float(body.get("price", 0), "price"),
+        _int(body.get("quantity", 0), "quantity"),
+        _optional_int(body.get("low_stock_threshold"), "low_stock_threshold")
+    )
+    return 201, {"id": product_id}
+
+
+def update_product(user, query, body, product_id):
+    product = _found(products.get_product(_int(product_id, "id")))
+    # Fields left out keep their current value; quantity only changes if given
+    updated = products.update_product(
+        user.username, product.id, _str(body.get("name", product.name), "name"),
+        _optional_int(body.get("category_id", product.category_id), "category_id"),
+        _optional_str(body.get("sku", product.sku), "sku"), _float(body.get("price", product.price or 0), "price"),
+        _optional_int(body.get("quantity"), "quantity"),
+        _optional_int(body.get("low_stock_threshold", product.low_stock_threshold), "low_stock_threshold")
+    )
+    _found(updated or None)
+    return 200, products.get_product(product.id)._asdict()
+
+
+def delete_product(user, query, body, product_id):
+    name = _found(products.delete_product(user.username, _int(product_id, "id")))
+    return 200, {"deleted": name}
+
+
+def adjust_stock(user, query, body, product_id):
+    _require(body, "change", "reason")
+    quantity = products.adjust_stock(
+        user.username, _int(product_id, "id"), _int(body["change"], "change"), _str(body["reason"], "reason")
+    )
+    return 200, {"quantity": _found(quantity)}
+
+
+def apply_movements(user, query, body):
+    _require(body, "movements")
+    if not isinstance(body["movements"], list):
+        raise ApiError(400, "movements must be a list.")
+    movements = []
+    for number, item in enumerate(body["movements"], start=1):
+        if not isinstance(item, dict) or "change" not in item or "reason" not in item:
+            raise ApiError(400, f"Movement {number} needs change and reason.")
+        movements.append(Movement(
+            _int(item["change"], "change"), _str(item["reason"], "reason"),
+            _optional_int(item.get("product_id"), "product_id"), _optional_str(item.get("sku"), "sku")
+        ))
+    return 200, {"quantities": products.apply_movements(user.username, movements)}
+
+
+def stock_summary(user, query, body):
+    summary = products.stock_summary()
+    payload = summary._asdict()
+    payload["categories"] = [category._asdict() for category in summary.categories]
+    return 200, payload
+
+
+def low_stock(user, query, body):
+    rows = products.low_stock(_int(query.get("limit", 100), "limit"))
+    return 200, {"products": [row._asdict() for row in rows]}
+
+
+def stock_as_of(user, query, body):
+    if not query.get("moment"):
+        raise ApiError(400, 'moment is required ("YYYY-MM-DD HH:MM:SS", UTC).')
+    product_id = _optional_int(query.get("product_id"), "product_id")
+    stock = products.stock_as_of(query["moment"], product_id)
+    if product_id is not None:
+        return 200, {"product_id": product_id, "quantity": stock}
+    return 200, {"stock": {str(key): value for key, value in stock.items()}}
+
+
+def list_categories(user, query, body):
+    return 200, {"categories": [category._asdict() for category in categories.list_categories()]}
+
+
+def add_category(user, query, body):
+    _require(body, "name")
+    return 201, {"id": categories.add_category(_str(body["name"], "name"), _optional_int(body.get("parent_id"), "parent_id"))}
+
+
+def category_children(user, query, body):
+    nodes = categories.children(_optional_int(query.get("parent_id"), "parent_id"))
+    return 200, {"categories": [node._asdict() for node in nodes]}
+
+
+def category_path(user, query, body, category_id):
+    path = categories.path(_int(category_id, "id"))
+    return 200, {"path": [category._asdict() for category in _found(path or None, "category")]}
+
+
+def update_category(user, query, body, category_id):
+    category_id = _int(category_id, "id")
+    found = True
+    if "name" in body:
+        found = categories.rename_category(category_id, _str(body["name"], "name"))
+    # "parent_id": null moves it to the top level; leaving the field out keeps it where it is
+    if found and "parent_id" in body:
+        found = categories.move_category(category_id, _optional_int(body["parent_id"], "parent_id"))
+    _found(found or None, "category")
+    return 200, {"updated": True}
+
+
+def delete_category(user, query, body, category_id):
+    _found(categories.delete_category(_int(category_id, "id")) or None, "category")
+    return 200, {"deleted": True}
+
+
+def set_thresholds(user, query, body):
+    if not isinstance(body.get("categories") or {}, dict):
+        raise ApiError(400, "categories must be an object of {category id: threshold}.")
+    per_category = {
+        _int(key, "category id"): _optional_int(value, "threshold")
+        for key, value in (body.get("categories") or {}).items()
+    }
+    changed = categories.set_thresholds(_optional_int(body.get("default"), "default"), per_category)
+    return 200, {"changed": changed}
+
+
+def list_users(user, query, body):
+    return 200, {"users": [row._asdict() for row in users.list_users()]}
+
+
+def add_user(user, query, body):
+    _require(body, "username", "password")
+    users.add_user(_str(body["username"], "username"), _str(body["password"], "password"),
+                   _str(body.get("role", "user"), "role"))
+    return 201, {"username": body["username"]}
+
+
+def update_user(user, query, body, user_id):
+    users.update_user(_int(user_id, "id"), _optional_str(body.get("password"), "password"),
+                      _optional_str(body.get("role"), "role"))
+    return 200, {"updated": True}
+
+
+def delete_user(user, query, body, user_id):
+    users.delete_user(_int(user_id, "id"))
+    return 200, {"deleted": True}
+
+
+def list_logs(user, query, body):
+    filters = {key: query[key] for key in ("username", "action", "product", "date_from", "date_to") if query.get(key)}
+    page, after = logs.list_page(_after(query.get("after")), _int(query.get("limit", logs.PAGE_SIZE), "limit"), **filters)
+    return 200, {"logs": [entry._asdict() for entry in page], "next": after}
+
+
+# (method, path pattern, handler, admin only)
+ROUTES = [
+    ("GET", r"/products", list_products, False),
+    ("POST", r"/products", add_product, False),
+    ("GET", r"/products/sku/(.+)", get_product_by_sku, False),
+    ("GET", r"/products/(\d+)", get_product, False),
+    ("PUT", r"/products/(\d+)", update_product, False),
+    ("DELETE", r"/products/(\d+)", delete_product, False),
+    ("POST", r"/products/(\d+)/stock", adjust_stock, False),
+    ("POST", r"/stock", apply_movements, False),
+    ("GET", r"/stock/summary", stock_summary, False),
+    ("GET", r"/stock/low", low_stock, False),
+    ("GET", r"/stock/as-of", stock_as_of, False),
+    ("GET", r"/categories", list_categories, False),
+    ("POST", r"/categories", add_category, True),
+    ("PUT", r"/categories/thresholds", set_thresholds, True),
+    ("GET", r"/categories/children", category_children, False),
+    ("GET", r"/categories/(\d+)/path", category_path, False),
+    ("PUT", r"/categories/(\d+)", update_category, True),
+    ("DELETE", r"/categories/(\d+)", delete_category, True),
+    ("GET", r"/users", list_users, True),
+    ("POST", r"/users", add_user, True),
+    ("PUT", r"/users/(\d+)", update_user, True),
+    ("DELETE", r"/users/(\d+)", delete_user, True),
+    ("GET", r"/logs", list_logs, False),
+]
+ROUTES = [(method, re.compile(pattern + r"/?"), handler, admin_only) for method, pattern, handler, admin_only in ROUTES]
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so a scanner can reuse one connection
+    server_version = "InventoryAPI/1.0"
+    disable_nagle_algorithm = True  # headers and body are separate writes; don't hold the body back
+    timeout = 10  # seconds a kept-alive connection may sit idle before it gives up its worker
+
+    def do_GET(self):
+        self.dispatch("GET")
+
+    def do_POST(self):
+        self.dispatch("POST")
+
+    def do_PUT(self):
+        self.dispatch("PUT")
+
+    def do_DELETE(self):
+        self.dispatch("DELETE")
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def dispatch(self, method):
+        try:
+            status, payload = self.route(method)
+        except ApiError as e:
+            status, payload = e.status, {"error": e.message}
+        except ValueError as e:  # invalid input, as reported by the service
+            status, payload = 400, {"error": str(e)}
+        except sqlite3.IntegrityError as e:  # a constraint the service doesn't check up front
+            if "UNIQUE" in str(e):
+                status, payload = 409, {"error": f"That would duplicate an existing record ({e})."}
+            else:
+                status, payload = 400, {"error": f"That refers to a record that doesn't exist or is invalid ({e})."}
+        except Exception as e:
+            status, payload = 500, {"error": f"Internal error: {e}"}
+        self.send_json(status, payload)
+
+    def route(self, method):
+        url = urlsplit(self.path)
+        body = self.read_body()
+        if url.path == "/health":
+            return 200, {"ok": True}
+
+        allowed = []
+        for route_method, pattern, handler, admin_only in ROUTES:
+            match = pattern.fullmatch(url.path)
+            if not match:
+                continue
+            if route_method != method:
+                allowed.append(route_method)
+                continue
+            user = self.authenticate()
+            if admin_only and user.role != "admin":
+                raise ApiError(403, "Only admins can do this.")
+            query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            return handler(user, query, body, *match.groups())
+
+        if allowed:
+            raise ApiError(405, f"Use {' or '.join(sorted(set(allowed)))} here.")
+        raise ApiError(404, "No such endpoint.")
+
+    def read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            raise ApiError(413, "Request body too large.")
+        if not length:
+            return {}
+        try:
+            body = json.loads(self.rfile.read(length))
+        except ValueError:
+            raise ApiError(400, "The request body isn't valid JSON.")
+        if not isinstance(body, dict):
+            raise ApiError(400, "The request body must be a JSON object.")
+        return body
+
+    def authenticate(self):
+        header = self.headers.get("Authorization", "")
+        if header.startswith("Basic "):
+            try:
+                username, _, password = base64.b64decode(header[6:]).decode("utf-8").partition(":")
+            except (binascii.Error, UnicodeDecodeError):
+                username = password = None
+            user = users.authenticate(username, password) if username else None
+            if user:
+                return user
+        raise ApiError(401, "Log in with an app username and password (HTTP Basic).")
+
+    def send_json(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if status == 401:
+            self.send_header("WWW-Authenticate", 'Basic realm="inventory"')
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class ApiServer(HTTPServer):
+    """HTTPServer that handles requests on a fixed pool of worker threads.
+
+    A fixed pool (rather than a thread per connection) keeps the number of
+    pooled database connections bounded: db_manager opens one per thread.
+    A kept-alive connection holds its worker until it goes idle for
+    RequestHandler.timeout, so give a busy server more workers than clients.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, workers=DEFAULT_WORKERS, quiet=False):
+        super().__init__(address, RequestHandler)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="inventory-api")
+        self.quiet = quiet
+
+    def process_request(self, request, client_address):
+        self.executor.submit(self._handle, request, client_address)
+
+    def _handle(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=False)  # idle keep-alive connections time out on their own
+
+
+def make_server(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=DEFAULT_WORKERS, quiet=False):
+    """Create the server without starting it; call serve_forever() (e.g. on a thread) to run it."""
+    return ApiServer((host, port), workers, quiet)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=DEFAULT_HOST, help="interface to listen on (default: this machine only)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="requests handled at once")
+    parser.add_argument("--quiet", action="store_true", help="don't log every request")
+    args = parser.parse_args()
+
+    db_manager.create_tables()
+    server = make_server(args.host, args.port, args.workers, args.quiet)
+    print(f"🌐 Inventory API on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""Category operations, the category tree and low stock thresholds.
+
+Categories nest: each has an optional parent, and filtering products by a
+category includes everything under it. Names are unique across the tree.
+
+    categories.list_categories()
+    category_id = categories.add_category("Tools")
+    drills = categories.add_category("Drills", parent_id=category_id)
+    categories.children()                    # top level, for a lazily expanded tree
+    categories.path(drills)                  # [Category "Tools", Category "Drills"]
+    categories.move_category(drills, None)   # to the top level
+    categories.set_thresholds(default=5, per_category={category_id: 10})
+"""
+import os
+import sqlite3
+import sys
+from typing import Dict, List, Optional
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from inventory.records import Category, CategoryNode
+from models import category_cache, db_manager, events
+
+
+def list_categories() -> List[Category]:
+    """Every category, by name (from the shared cache; see models/category_cache.py)."""
+    return [Category._make(row) for row in category_cache.rows()]
+
+
+def children(parent_id: Optional[int] = None) -> List[CategoryNode]:
+    """The categories directly under `parent_id` (None: the top level), by name."""
+    return [CategoryNode._make(row) for row in db_manager.get_category_children(parent_id)]
+
+
+def path(category_id: int) -> List[Category]:
+    """The category and its ancestors, top level first (empty if it doesn't exist)."""
+    rows = [category_cache.row_of(ancestor_id) for ancestor_id, _ in db_manager.get_category_path(category_id)]
+    return [Category._make(row) for row in rows if row]
+
+
+def _check_name(name):
+    name = (name or "").strip()
+    if not name:
+        raise ValueError("Category name cannot be empty.")
+    return name
+
+
+def _check_parent(parent_id):
+    if parent_id is not None and category_cache.name_of(parent_id) is None:
+        raise ValueError("No such parent category.")
+
+
+def add_category(name: str, parent_id: Optional[int] = None) -> int:
+    """Add a category (under `parent_id`, if given). Returns its id; raises ValueError if the name is empty or taken."""
+    name = _check_name(name)
+    _check_parent(parent_id)
+    try:
+        with db_manager.connection() as conn:
+            category_id = conn.execute(
+                "INSERT INTO categories (name, parent_id) VALUES (?, ?)", (name, parent_id)
+            ).lastrowid
+    except sqlite3.IntegrityError:
+        raise ValueError(f"There is already a category called {name!r}.")
+    events.publish(events.CATEGORIES_CHANGED)
+    return category_id
+
+
+def rename_category(category_id: int, name: str) -> bool:
+    """Rename a category. Returns False if it doesn't exist; raises ValueError if the name is empty or taken."""
+    name = _check_name(name)
+    try:
+        with db_manager.connection() as conn:
+            found = conn.execute("UPDATE categories SET name=? WHERE id=?", (name, category_id)).rowcount
+    except sqlite3.IntegrityError:
+        raise ValueError(f"There is already a category called {name!r}.")
+    if found:
+        events.publish(events.CATEGORIES_CHANGED)
+        events.publish(events.PRODUCTS_RELOADED)  # listings show the category name
+    return bool(found)
+
+
+def move_category(category_id: int, parent_id: Optional[int]) -> bool:
+    """Move a category, with everything under it, under `parent_id` (None: the top level).
+
+    Returns False if the category doesn't exist; raises ValueError if the
+    parent doesn't exist or is the category itself or one of its subcategories.
+    """
+    _check_parent(parent_id)
+    try:
+        with db_manager.connection() as conn:
+            found = conn.execute("UPDATE categories SET parent_id=? WHERE id=?", (parent_id, category_id)).rowcount
+    except sqlite3.IntegrityError as e:  # raised by the categories_tree_no_cycle trigger
+        raise ValueError(f"{e}.")
+    if found:
+        events.publish(events.CATEGORIES_CHANGED)
+        events.publish(events.PRODUCTS_RELOADED)  # category filters now cover other products
+    return bool(found)
+
+
+def delete_category(category_id: int) -> bool:
+    """Delete an empty category. Returns False if it doesn't exist.
+
+    Raises ValueError if it still has subcategories or products; move or
+    delete those first.
+    """
+    with db_manager.connection() as conn:
+        if conn.execute("SELECT 1 FROM categories WHERE parent_id=? LIMIT 1", (category_id,)).fetchone():
+            raise ValueError("This category still has subcategories.")
+        if conn.execute("SELECT 1 FROM products WHERE category_id=? LIMIT 1", (category_id,)).fetchone():
+            raise ValueError("This category still has products.")
+        conn.execute("DELETE FROM category_stock WHERE category_id=?", (category_id,))
+        found = conn.execute("DELETE FROM categories WHERE id=?", (category_id,)).rowcount
+    if found:
+        events.publish(events.CATEGORIES_CHANGED)
+    return bool(found)
+
+
+def default_threshold() -> int:
+    return db_manager.get_default_low_stock_threshold()
+
+
+def set_thresholds(default: Optional[int] = None, per_category: Optional[Dict[int, Optional[int]]] = None):
+    """Change the default and/or category low stock thresholds (None: use the default).
+
+    Only values that differ are written, as each change re-evaluates the
+    products it applies to. Publishes events.PRODUCTS_RELOADED if anything
+    changed, since any product's low stock flag may have, and
+    events.CATEGORIES_CHANGED if a category's threshold did.
+    """
+    for threshold in [default, *(per_category or {}).values()]:
+        if threshold is not None and threshold < 0:
+            raise ValueError("Low stock thresholds cannot be negative.")
+
+    changed = False
+    if default is not None and default != default_threshold():
+        db_manager.set_default_low_stock_threshold(default)
+        changed = True
+
+    saved = {category.id: category.low_stock_threshold for category in list_categories()}
+    categories_changed = False
+    for category_id, threshold in (per_category or {}).items():
+        if category_id in saved and saved[category_id] != threshold:
+            db_manager.set_category_threshold(category_id, threshold)
+            categories_changed = True
+
+    if categories_changed:
+        events.publish(events.CATEGORIES_CHANGED)
+    changed = changed or categories_changed
+    if changed:
+        events.publish(events.PRODUCTS_RELOADED)
+    return changed
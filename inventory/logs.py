@@ -0,0 +1,44 @@
+"""Reading the audit log, live and archived rows alike.
+
+Filters (all optional): `username`, `action`, `product` (substring of the
+product name), `date_from` and `date_to` ("YYYY-MM-DD", UTC, inclusive).
+
+    page, after = logs.list_page(username="admin")
+    newer = logs.list_new(since_id, username="admin")
+"""
+import os
+import sys
+from typing import List, Tuple
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from inventory.records import LogEntry
+from models import db_manager, log_archive
+
+PAGE_SIZE = 200
+MAX_PAGE_SIZE = 5000
+FILTER_COLUMNS = ("username", "action")
+
+
+def list_page(after=None, limit: int = PAGE_SIZE, **filters) -> Tuple[List[LogEntry], object]:
+    """One page of log entries, newest first, and the key to pass as `after` for the next."""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    rows, after = log_archive.fetch_logs_page(after, limit, **filters)
+    return [LogEntry._make(row) for row in rows], after
+
+
+def list_new(since_id: int, **filters) -> List[LogEntry]:
+    """Entries logged after `since_id`, newest first. Queued entries are written out first."""
+    db_manager.flush_logs(timeout=1)
+    return [LogEntry._make(row) for row in db_manager.fetch_new_logs(since_id, **filters)]
+
+
+def last_id() -> int:
+    return db_manager.get_last_log_id()
+
+
+def distinct_values(column: str) -> List[str]:
+    """Every value of `username` or `action` that appears in the logs, for filter choices."""
+    if column not in FILTER_COLUMNS:
+        raise ValueError(f"Can only list the values of: {', '.join(FILTER_COLUMNS)}.")
+    return log_archive.get_distinct_log_values(column)
@@ -0,0 +1,154 @@
+"""Product operations: listing, lookups, edits and stock movements.
+
+Writes go through models.product_service, so each one is saved together with
+its ledger and log rows and publishes events.PRODUCT_CHANGED. Invalid input
+raises ValueError; a product that doesn't exist gives None (or False).
+
+    page, after = products.list_page("lap")
+    product_id = products.add_product("admin", "Laptop", category_id=1, price=999.0, quantity=5)
+    products.apply_movements("scanner", [Movement(-1, "Sold", sku="SKU123")])
+"""
+import os
+import sys
+from typing import Iterable, List, Optional, Tuple
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from inventory.records import LowStockProduct, Movement, Product, ProductRow, CategoryStock, StockSummary
+from models import db_manager, inventory_ledger, product_service
+
+PAGE_SIZE = 200
+MAX_PAGE_SIZE = 5000
+
+
+def _check_fields(name, price, quantity, low_stock_threshold):
+    if not name or not name.strip():
+        raise ValueError("Product name cannot be empty.")
+    if price is not None and price < 0:
+        raise ValueError("Price cannot be negative.")
+    if quantity is not None and quantity < 0:
+        raise ValueError("Quantity cannot be negative.")
+    if low_stock_threshold is not None and low_stock_threshold < 0:
+        raise ValueError("Low stock threshold cannot be negative.")
+
+
+# 🔎 Reading
+
+def list_page(search_text: str = "", category_id: Optional[int] = None, after=None,
+              limit: int = PAGE_SIZE, conn=None) -> Tuple[List[ProductRow], object]:
+    """One page of the product listing and the key to pass as `after` for the next.
+
+    See db_manager.fetch_products_page; `conn` lets a caller run it on a
+    connection it may interrupt.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    rows, after = db_manager.fetch_products_page(search_text, category_id, after, limit, conn=conn)
+    return [ProductRow._make(row) for row in rows], after
+
+
+def get_row(product_id: int, search_text: str = None,
+            category_id: Optional[int] = None) -> Tuple[Optional[ProductRow], Optional[float]]:
+    """A product's listing row if it matches the filter, and its search rank (see db_manager.fetch_product_row)."""
+    row, rank = db_manager.fetch_product_row(product_id, search_text, category_id)
+    return (ProductRow._make(row) if row else None), rank
+
+
+_PRODUCT_QUERY = """
+    SELECT p.id, p.name, p.category_id, c.name, p.sku, p.price,
+           COALESCE(p.quantity_in_stock, 0), p.low_stock_threshold
+    FROM products p
+    LEFT JOIN categories c ON c.id = p.category_id
+"""
+
+
+def get_product(product_id: int) -> Optional[Product]:
+    with db_manager.connection() as conn:
+        row = conn.execute(_PRODUCT_QUERY + " WHERE p.id = ?", (product_id,)).fetchone()
+    return Product._make(row) if row else None
+
+
+def find_by_sku(sku: str) -> Optional[Product]:
+    """The product with this SKU; raises ValueError if several share it."""
+    with db_manager.connection() as conn:
+        rows = conn.execute(_PRODUCT_QUERY + " WHERE p.sku = ? LIMIT 2", (sku,)).fetchall()
+    if len(rows) > 1:
+        raise ValueError(f"More than one product has SKU {sku!r}.")
+    return Product._make(rows[0]) if rows else None
+
+
+# ✏️ Writing
+
+def add_product(username: str, name: str, category_id: Optional[int] = None, sku: str = "",
+                price: float = 0.0, quantity: int = 0, low_stock_threshold: Optional[int] = None) -> int:
+    """Add a product. Returns its id."""
+    _check_fields(name, price, quantity, low_stock_threshold)
+    return product_service.add_product(
+        username, name.strip(), category_id, sku, price, quantity, low_stock_threshold
+    )
+
+
+def update_product(username: str, product_id: int, name: str, category_id: Optional[int], sku: str,
+                   price: float, quantity: Optional[int] = None,
+                   low_stock_threshold: Optional[int] = None) -> bool:
+    """Update a product; `quantity` None keeps its stock. Returns False if it no longer exists."""
+    _check_fields(name, price, quantity, low_stock_threshold)
+    return product_service.update_product(
+        username, product_id, name.strip(), category_id, sku, price, quantity, low_stock_threshold
+    )
+
+
+def delete_product(username: str, product_id: int) -> Optional[str]:
+    """Delete a product. Returns its name, or None if it was already gone."""
+    return product_service.delete_product(username, product_id)
+
+
+def adjust_stock(username: str, product_id: int, change: int, reason: str) -> Optional[int]:
+    """Move a product's stock by `change`. Returns the new quantity, or None if it no longer exists."""
+    if not reason or not reason.strip():
+        raise ValueError("A stock movement needs a reason.")
+    return product_service.adjust_stock(username, product_id, change, reason.strip())
+
+
+def apply_movements(username: str, movements: Iterable[Movement]) -> List[int]:
+    """Apply many stock movements in one transaction; all or nothing. Returns the new quantities.
+
+    Products can be picked by id or by SKU (for barcode scanners).
+    """
+    resolved = []
+    skus = {}
+    for number, movement in enumerate(movements, start=1):
+        if not movement.reason or not movement.reason.strip():
+            raise ValueError(f"Movement {number} needs a reason.")
+        product_id = movement.product_id
+        if product_id is None:
+            if not movement.sku:
+                raise ValueError(f"Movement {number} needs a product_id or a sku.")
+            if movement.sku not in skus:
+                product = find_by_sku(movement.sku)
+                if product is None:
+                    raise ValueError(f"Movement {number}: no product has SKU {movement.sku!r}.")
+                skus[movement.sku] = product.id
+            product_id = skus[movement.sku]
+        resolved.append((product_id, int(movement.change), movement.reason.strip()))
+    if not resolved:
+        return []
+    return product_service.adjust_stock_many(username, resolved)
+
+
+# 📊 Stock levels
+
+def stock_summary() -> StockSummary:
+    totals, per_category = db_manager.get_stock_summary()
+    return StockSummary(
+        totals["product_count"], totals["total_quantity"], totals["stock_value"],
+        totals["low_stock_count"], [CategoryStock._make(row) for row in per_category]
+    )
+
+
+def low_stock(limit: int = 100) -> List[LowStockProduct]:
+    return [LowStockProduct._make(row) for row in db_manager.get_low_stock_products(limit)]
+
+
+def stock_as_of(moment, product_id: Optional[int] = None):
+    """Stock at a past moment; see inventory_ledger.stock_as_of."""
+    return inventory_ledger.stock_as_of(moment, product_id)
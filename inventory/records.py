@@ -0,0 +1,90 @@
+"""Typed records returned by the inventory service.
+
+They are NamedTuples, so they unpack and index like the database rows they
+are built from (the Qt table models keep using `row[column]`) and turn into
+JSON with `record._asdict()`.
+"""
+from typing import NamedTuple, Optional
+
+
+class ProductRow(NamedTuple):
+    """One row of the product listing (db_manager.LISTING_COLUMNS)."""
+    id: int
+    name: str
+    category: Optional[str]
+    sku: Optional[str]
+    price: Optional[float]
+    quantity: Optional[int]
+    low: int  # 1 when the product is in the low_stock set
+
+
+class Product(NamedTuple):
+    """A product with everything needed to edit it."""
+    id: int
+    name: str
+    category_id: Optional[int]
+    category: Optional[str]
+    sku: Optional[str]
+    price: Optional[float]
+    quantity: int
+    low_stock_threshold: Optional[int]  # None: the category's or the default threshold
+
+
+class Category(NamedTuple):
+    id: int
+    name: str
+    low_stock_threshold: Optional[int]
+    parent_id: Optional[int] = None  # None: a top-level category
+
+
+class CategoryNode(NamedTuple):
+    """A category as shown in the category tree."""
+    id: int
+    name: str
+    child_count: int    # direct subcategories
+    product_count: int  # products in it and all its subcategories
+
+
+class CategoryStock(NamedTuple):
+    category: str
+    product_count: int
+    total_quantity: int
+    stock_value: float
+
+
+class StockSummary(NamedTuple):
+    product_count: int
+    total_quantity: int
+    stock_value: float
+    low_stock_count: int
+    categories: list  # [CategoryStock], highest stock value first
+
+
+class LowStockProduct(NamedTuple):
+    id: int
+    name: str
+    category: Optional[str]
+    quantity: int
+    threshold: int
+
+
+class User(NamedTuple):
+    id: int
+    username: str
+    role: str
+
+
+class LogEntry(NamedTuple):
+    id: int
+    timestamp: str
+    username: str
+    action: str
+    product_name: str
+
+
+class Movement(NamedTuple):
+    """A stock movement to apply: `product_id` or `sku` picks the product."""
+    change: int
+    reason: str
+    product_id: Optional[int] = None
+    sku: Optional[str] = None
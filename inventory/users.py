@@ -0,0 +1,67 @@
+"""User accounts: login and the admin's user management.
+
+    user = users.authenticate("admin", "admin123")   # User or None
+    users.add_user("clerk", "secret", "user")
+"""
+import os
+import sqlite3
+import sys
+from typing import List, Optional
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from inventory.records import User
+from models import db_manager, passwords
+
+ROLES = ("user", "admin")
+
+
+def authenticate(username: str, password: str) -> Optional[User]:
+    """The user these credentials belong to, or None.
+
+    Looks the user up by username and checks the password against its stored
+    hash in constant time; an unknown username costs as much as a wrong
+    password. A hash made at an older cost is replaced after a good login.
+    """
+    row = db_manager.get_user_credentials(username)
+    if row is None:
+        passwords.verify_missing_user(password)
+        return None
+    user_id, username, role, encoded = row
+    if not passwords.verify_password(password, encoded):
+        return None
+    if passwords.needs_rehash(encoded):
+        db_manager.set_password_hash(user_id, passwords.hash_password(password))
+    return User(user_id, username, role)
+
+
+def list_users() -> List[User]:
+    return [User._make(row) for row in db_manager.get_all_users()]
+
+
+def _check_role(role):
+    if role not in ROLES:
+        raise ValueError(f"Role must be one of: {', '.join(ROLES)}.")
+
+
+def add_user(username: str, password: str, role: str = "user"):
+    """Add a user; raises ValueError if a field is missing or the username is taken."""
+    username = (username or "").strip()
+    if not username or not password:
+        raise ValueError("Username and password are required.")
+    _check_role(role)
+    try:
+        db_manager.add_user(username, password, role)
+    except sqlite3.IntegrityError:
+        raise ValueError(f"There is already a user called {username!r}.")
+
+
+def update_user(user_id: int, password: Optional[str] = None, role: Optional[str] = None):
+    """Change a user's password and/or role; None leaves it as it is."""
+    if role is not None:
+        _check_role(role)
+    db_manager.update_user(user_id, password=password or None, role=role)
+
+
+def delete_user(user_id: int):
+    db_manager.delete_user(user_id)
@@ -1,17 +1,141 @@
+"""Starts the Inventory app.
+
+    python main.py
+    python main.py --database /tmp/copy.db     # run against another database file
+
+Startup runs in phases, each timed and printed as it finishes:
+
+1. imports: the database modules this file needs
+2. Qt: PyQt5 is imported and the application object created
+3. schema: `create_tables()` applies any pending migrations, once, here
+4. database thread: the pooled connection the windows use is opened on the
+   db_executor thread while startup continues
+5. login window: imported, built and shown; then the time of its first paint
+6. once it is painted, in the background while the login form is up:
+   - warm-up: the category list, the stock summary and the first page of
+     products and logs are read on the database thread, so the pages the
+     first windows need are already in its cache
+   - the log retention and stock ledger schedulers are started
+"""
+import argparse
+import json
 import sys
-from PyQt5.QtWidgets import QApplication, QMainWindow, QLabel
+import threading
+import time
+from contextlib import contextmanager
+
+LAUNCHED = time.perf_counter()
+
+from models import db_executor, db_manager
+
+
+class StartupTimer:
+    """How long each startup phase took, and when it finished (ms since launch)."""
+
+    def __init__(self, output="text"):
+        self.output = output
+        self.phases = []
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        yield
+        self.record(name, start)
+
+    def record(self, name, start, background=False):
+        end = time.perf_counter()
+        entry = {"phase": name, "ms": round((end - start) * 1000, 1),
+                 "at_ms": round((end - LAUNCHED) * 1000, 1), "background": background}
+        with self.lock:
+            self.phases.append(entry)
+        if self.output == "text":
+            label = f"↳ {name}" if background else name
+            print(f"   {label:<26} {entry['ms']:8.1f} ms   (+{entry['at_ms']:.0f} ms)")
+
+    def report_json(self):
+        with self.lock:
+            print(json.dumps({"phases": self.phases}), flush=True)
+
+
+def warm_up():
+    """Read what the first windows show, on the database thread's own connection."""
+    from inventory import categories, logs, products
+
+    categories.list_categories()
+    products.stock_summary()
+    products.list_page()
+    logs.list_page()
+
+
+def run_in_background(timer, name, fn):
+    """Submit `fn` to the database thread and record when it finishes."""
+    start = time.perf_counter()
+    future = db_executor.submit(fn)
+    future.add_done_callback(
+        lambda f: timer.record(name, start, background=True) if f.exception() is None
+        else print(f"⚠️ Startup {name} failed: {f.exception()}")
+    )
+    return future
+
+
+def start_schedulers():
+    from models import inventory_ledger, log_archive
+
+    log_archive.start_scheduler()  # archives old log rows once a day
+    inventory_ledger.start_scheduler()  # checkpoints and reconciles the stock ledger once a day
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inventory Management System")
+    parser.add_argument("--database", help="database file to use instead of db/database.db")
+    parser.add_argument("--timings", choices=["text", "json", "off"], default="text",
+                        help="how to report the startup breakdown")
+    parser.add_argument("--exit-after-first-paint", action="store_true",
+                        help="quit once the login form is painted (used by utils/benchmark_startup.py)")
+    args = parser.parse_args(argv)
+
+    timer = StartupTimer(args.timings)
+    if args.timings == "text":
+        print("🚀 Starting Inventory Management System")
+    timer.record("imports", LAUNCHED)
+
+    with timer.phase("Qt"):
+        from PyQt5.QtCore import QEvent, QObject
+        from PyQt5.QtWidgets import QApplication
+        app = QApplication(sys.argv[:1])
+
+    with timer.phase("schema & migrations"):
+        if args.database:
+            db_manager.set_database_path(args.database)
+        db_manager.create_tables()
+
+    # Opened on the thread that runs the windows' queries, not this one
+    run_in_background(timer, "database thread", db_manager.get_connection)
+
+    with timer.phase("login window"):
+        from ui.login_window import LoginWindow
+        window = LoginWindow()
+        window.show()
+
+    class FirstPaint(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Paint:
+                window.removeEventFilter(self)
+                timer.record("first paint", LAUNCHED)
+                if args.exit_after_first_paint:
+                    timer.report_json()
+                    app.exit(0)
+                    return False
+                run_in_background(timer, "warm-up", warm_up)
+                with timer.phase("schedulers"):
+                    start_schedulers()
+            return False
 
-class MainWindow(QMainWindow):
-    def __init__(self):
-        super().__init__()
-        self.setWindowTitle("Inventory Management System")
-        self.setGeometry(200, 200, 800, 600)
+    first_paint = FirstPaint()
+    window.installEventFilter(first_paint)
+    return app.exec_()
 
-        label = QLabel("Welcome to Inventory Management", self)
-        label.setGeometry(250, 250, 400, 30)  # explicitly set size
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    window = MainWindow()
-    window.show()
-    sys.exit(app.exec_())
+    sys.exit(main())
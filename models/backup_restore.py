@@ -1,40 +1,301 @@
+"""Database backups taken with the SQLite online backup API.
+
+A backup copies the live database page by page on its own connection, inside
+one read transaction: in WAL mode that reads a fixed snapshot while clerks
+keep writing, so the copy is consistent and never blocks them. The copy can
+be gzip- or zstd-compressed, and every backup gets a JSON manifest next to it
+with the SHA-256 of the file, so a damaged or truncated backup is caught
+before it is restored.
+
+Restoring validates the backup first and swaps it in with an atomic rename,
+so a bad backup or a crash halfway never leaves a broken live database.
+
+    path = backup_database(compression="gzip", progress=print)
+    verify_backup(path)
+    restore_database(path)
+"""
+import gzip
+import hashlib
+import json
 import os
 import shutil
-from datetime import datetime
-from PyQt5.QtWidgets import QFileDialog, QMessageBox
+import sqlite3
+import sys
+from datetime import datetime, timezone
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models import db_manager, events, migrations
 
-DB_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '../db/database.db'))
 BACKUP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../backups'))
 
 os.makedirs(BACKUP_DIR, exist_ok=True)
 
-def backup_database(parent=None):
-    if not os.path.exists(DB_PATH):
-        QMessageBox.critical(parent, "Error", "Database file not found!")
-        return
+PAGES_PER_STEP = 1024            # pages copied per backup step, between progress reports
+COPY_CHUNK = 1024 * 1024         # bytes per read when compressing or hashing
+COMPRESSIONS = {None: "", "gzip": ".gz", "zstd": ".zst"}
+REQUIRED_TABLES = ("users", "categories", "products", "inventory_logs", "logs")
+
+
+class BackupCancelled(Exception):
+    pass
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        raise ValueError("zstd compression needs the zstandard package (pip install zstandard).")
+    return zstandard
+
+
+def available_compressions():
+    """The compressions this install can write; zstd needs the optional zstandard package."""
+    names = [None, "gzip"]
+    try:
+        _zstd()
+        names.append("zstd")
+    except ValueError:
+        pass
+    return names
+
+
+def manifest_path(backup_path):
+    for extension in COMPRESSIONS.values():
+        if extension and backup_path.endswith(extension):
+            backup_path = backup_path[:-len(extension)]
+    return os.path.splitext(backup_path)[0] + ".json"
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(COPY_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def copy_database(target_path, progress=None, is_cancelled=None):
+    """Copy the live database into `target_path` through the backup API.
+
+    Returns its schema version, page size and page count. `progress(pages
+    copied, total pages)` is called after every step.
+    """
+    source = db_manager.open_connection()
+    source.isolation_level = None
+    target = sqlite3.connect(target_path)
+
+    def step(status, remaining, total):
+        if is_cancelled and is_cancelled():
+            raise BackupCancelled()  # makes Connection.backup abort
+        if progress:
+            progress(total - remaining, total)
+
+    try:
+        # One read transaction for the whole copy: every step then reads the
+        # same snapshot, so concurrent writes neither tear nor restart it
+        source.execute("BEGIN")
+        source.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+        source.backup(target, pages=PAGES_PER_STEP, progress=step)
+        source.execute("COMMIT")
+
+        # The copy is read back on its own, so it must not depend on a -wal file
+        target.execute("PRAGMA journal_mode = DELETE")
+        info = {
+            "schema_version": target.execute("PRAGMA user_version").fetchone()[0],
+            "page_size": target.execute("PRAGMA page_size").fetchone()[0],
+            "page_count": target.execute("PRAGMA page_count").fetchone()[0],
+        }
+    finally:
+        target.close()
+        source.close()
+    return info
+
+
+def _compress(source_path, target_path, compression, progress, is_cancelled):
+    if compression == "gzip":
+        opener = lambda: gzip.open(target_path, "wb", compresslevel=6)
+    else:
+        opener = lambda: _zstd().ZstdCompressor(level=3, threads=-1).stream_writer(open(target_path, "wb"))
+
+    total = os.path.getsize(source_path)
+    done = 0
+    with open(source_path, "rb") as source, opener() as target:
+        for chunk in iter(lambda: source.read(COPY_CHUNK), b""):
+            if is_cancelled and is_cancelled():
+                raise BackupCancelled()
+            target.write(chunk)
+            done += len(chunk)
+            if progress:
+                progress(done, total)
 
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_filename = f"backup_{timestamp}.db"
-    backup_path = os.path.join(BACKUP_DIR, backup_filename)
 
+def backup_database(backup_dir=BACKUP_DIR, compression=None, progress=None, is_cancelled=None):
+    """Back up the live database and return the path of the backup file.
+
+    `compression` is None, "gzip" or "zstd". `progress(fraction_done)` is
+    called as pages are copied (and compressed). Raises BackupCancelled if
+    `is_cancelled()` turns true; nothing is left behind then.
+    """
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression {compression!r}")
+    if compression == "zstd":
+        _zstd()
+
+    started = datetime.now()
+    name = f"backup_{started.strftime('%Y%m%d_%H%M%S')}.db"
+    path = os.path.join(backup_dir, name + COMPRESSIONS[compression])
+    snapshot_path = os.path.join(backup_dir, name + ".part")
+    part_path = path + ".part"
+    os.makedirs(backup_dir, exist_ok=True)
+
+    # Copying is the whole job uncompressed, roughly half of it otherwise
+    copy_share = 0.5 if compression else 1.0
+
+    def report(share, offset):
+        if not progress:
+            return None
+        return lambda done, total: progress(offset + share * (done / total if total else 1.0))
+
+    try:
+        info = copy_database(snapshot_path, report(copy_share, 0.0), is_cancelled)
+        database_sha256 = _sha256(snapshot_path)
+        if compression:
+            _compress(snapshot_path, part_path, compression, report(1 - copy_share, copy_share), is_cancelled)
+            os.remove(snapshot_path)
+        else:
+            os.replace(snapshot_path, part_path)
+
+        manifest = {
+            "file": os.path.basename(path),
+            "created": started.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+            "source": os.path.abspath(db_manager.DB_PATH),
+            "compression": compression,
+            "size": os.path.getsize(part_path),
+            "sha256": _sha256(part_path),
+            "database_sha256": database_sha256,
+            **info,
+        }
+        with open(manifest_path(path), "w", encoding="utf-8") as file:
+            json.dump(manifest, file, indent=2)
+        os.replace(part_path, path)
+    finally:
+        for leftover in (snapshot_path, part_path):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+
+    if progress:
+        progress(1.0)
+    return path
+
+
+def verify_backup(path):
+    """Check a backup against its manifest. Returns the manifest; raises ValueError if it doesn't match."""
     try:
-        shutil.copy2(DB_PATH, backup_path)
-        QMessageBox.information(parent, "Backup Successful", f"Backup saved to:\n{backup_path}")
-    except Exception as e:
-        QMessageBox.critical(parent, "Error", f"Backup failed:\n{e}")
+        with open(manifest_path(path), encoding="utf-8") as file:
+            manifest = json.load(file)
+    except FileNotFoundError:
+        raise ValueError("The backup has no manifest, so it can't be verified.")
+
+    if os.path.getsize(path) != manifest["size"] or _sha256(path) != manifest["sha256"]:
+        raise ValueError("The backup file doesn't match its manifest checksum; it is damaged or incomplete.")
+    return manifest
+
+
+def _decompress(path, target_path):
+    if path.endswith(".gz"):
+        opener = lambda: gzip.open(path, "rb")
+    else:
+        opener = lambda: _zstd().ZstdDecompressor().stream_reader(open(path, "rb"))
+    with opener() as source, open(target_path, "wb") as target:
+        shutil.copyfileobj(source, target, COPY_CHUNK)
+
 
-def restore_database(parent=None):
-    file_path, _ = QFileDialog.getOpenFileName(
-        parent,
-        "Select Backup File",
-        BACKUP_DIR,
-        "Database Files (*.db)"
-    )
-    if not file_path:
-        return
+def validate_candidate(path):
+    """Check that `path` is a healthy database this version of the app can use.
 
+    Runs `PRAGMA quick_check`, looks for the app's tables and compares the
+    schema version with the migrations this app knows. Older versions are
+    fine (they are migrated after restoring). Returns the schema version;
+    raises ValueError with the reason otherwise.
+    """
     try:
-        shutil.copy2(file_path, DB_PATH)
-        QMessageBox.information(parent, "Restore Successful", "Database restored from backup.")
-    except Exception as e:
-        QMessageBox.critical(parent, "Error", f"Restore failed:\n{e}")
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    except sqlite3.Error as e:
+        raise ValueError(f"The file can't be opened as a database: {e}")
+    try:
+        problems = [row[0] for row in conn.execute("PRAGMA quick_check")]
+        if problems != ["ok"]:
+            raise ValueError("The backup is corrupt:\n" + "\n".join(problems[:10]))
+
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        missing = [table for table in REQUIRED_TABLES if table not in tables]
+        if missing:
+            raise ValueError(f"This isn't an inventory database (no {', '.join(missing)} table).")
+
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+    except sqlite3.DatabaseError as e:
+        raise ValueError(f"The file isn't a valid database: {e}")
+    finally:
+        conn.close()
+
+    if version > migrations.LATEST_VERSION:
+        raise ValueError(
+            f"The backup was made by a newer version of the app (schema {version}, "
+            f"this app knows up to {migrations.LATEST_VERSION})."
+        )
+    return version
+
+
+def restore_database(path, progress=None):
+    """Replace the live database with the backup at `path` (.db, .db.gz or .db.zst).
+
+    The backup is checked against its manifest (when it has one) and with
+    validate_candidate(), then copied through the backup API into a temp
+    file next to the live database and renamed over it, so the live file is
+    never half-written. Afterwards it is migrated to the current schema and
+    events.DATABASE_RESTORED is published so open windows reload.
+    `progress(fraction_done)` is optional. Raises ValueError if the backup
+    can't be used; the live database is untouched then.
+    """
+    if os.path.exists(manifest_path(path)):
+        verify_backup(path)
+
+    live_dir = os.path.dirname(os.path.abspath(db_manager.DB_PATH))
+    plain_path = os.path.join(live_dir, "restore-candidate.db.part")
+    target_path = os.path.join(live_dir, "restore-target.db.part")
+    try:
+        candidate = path
+        if path.endswith((".gz", ".zst")):
+            _decompress(path, plain_path)
+            candidate = plain_path
+        if progress:
+            progress(0.2)
+
+        version = validate_candidate(candidate)
+        if progress:
+            progress(0.4)
+
+        source = sqlite3.connect(f"file:{candidate}?mode=ro", uri=True)
+        target = sqlite3.connect(target_path)
+        try:
+            source.backup(target)
+            target.execute("PRAGMA journal_mode = WAL")
+        finally:
+            target.close()
+            source.close()
+        if progress:
+            progress(0.8)
+
+        db_manager.replace_database(target_path)
+    finally:
+        for leftover in (plain_path, target_path):
+            for suffix in ("", "-wal", "-shm", "-journal"):
+                if os.path.exists(leftover + suffix):
+                    os.remove(leftover + suffix)
+
+    if version < migrations.LATEST_VERSION:
+        db_manager.create_tables()
+    events.publish(events.DATABASE_RESTORED)
+    if progress:
+        progress(1.0)
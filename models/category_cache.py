@@ -0,0 +1,99 @@
+"""Process-wide cache of the categories table.
+
+Every window, the HTTP API and the bulk importer read categories from here
+instead of querying them each time. The cache is dropped when
+events.CATEGORIES_CHANGED or events.DATABASE_RESTORED is published, and
+re-validated on every read against `db_manager.data_version()`, so changes
+made by another process (or by code that doesn't publish) are picked up too.
+
+    category_cache.rows()                 # [(id, name, low_stock_threshold, parent_id), ...] by name
+    category_cache.row_of(3)              # (3, 'Tools', None, None)
+    category_cache.name_of(3)             # 'Tools'
+    category_cache.id_of("tools")         # 3 (exact name first, then ignoring case)
+    category_cache.ids_by_name()          # {'Tools': 3, ...}
+    category_cache.has_children(3)        # whether any category has 3 as its parent
+"""
+import os
+import sys
+import threading
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models import db_manager, events
+
+_lock = threading.Lock()
+_rows = None         # cached rows, or None until loaded / after invalidate()
+_by_id = {}
+_by_name = {}
+_by_folded_name = {}
+_parents = set()     # ids of categories that have subcategories
+_version = None      # db_manager.data_version() the rows were read at
+_epoch = 0           # bumped by invalidate(), so a load that raced it isn't kept
+
+
+def invalidate(*_):
+    global _rows, _epoch
+    with _lock:
+        _rows = None
+        _epoch += 1
+
+
+def _load():
+    global _rows, _by_id, _by_name, _by_folded_name, _parents, _version
+    version = db_manager.data_version()
+    with _lock:
+        if _rows is not None and _version == version:
+            return _rows
+        epoch = _epoch
+
+    # Version read first: a commit while the query runs makes the next read reload
+    rows = db_manager.get_categories()
+    with _lock:
+        if epoch == _epoch:
+            _rows, _version = rows, version
+            _by_id = {row[0]: row for row in rows}
+            _by_name = {row[1]: row[0] for row in rows}
+            _by_folded_name = {row[1].casefold(): row[0] for row in reversed(rows)}
+            _parents = {row[3] for row in rows if row[3] is not None}
+    return rows
+
+
+def rows():
+    """(id, name, low_stock_threshold or None, parent_id or None) for every category, by name."""
+    return list(_load())
+
+
+def row_of(category_id):
+    """(id, name, low_stock_threshold, parent_id) of one category, or None."""
+    _load()
+    with _lock:
+        return _by_id.get(category_id)
+
+
+def name_of(category_id):
+    row = row_of(category_id)
+    return row[1] if row else None
+
+
+def id_of(name):
+    """Id of the category called `name` (or, failing that, the same name in another case)."""
+    _load()
+    with _lock:
+        return _by_name.get(name) or _by_folded_name.get((name or "").casefold())
+
+
+def has_children(category_id):
+    _load()
+    with _lock:
+        return category_id in _parents
+
+
+def ids_by_name():
+    """{name: id} of every category — a copy the caller may add to."""
+    _load()
+    with _lock:
+        return dict(_by_name)
+
+
+events.subscribe(events.CATEGORIES_CHANGED, invalidate)
+events.subscribe(events.DATABASE_RESTORED, invalidate)
@@ -0,0 +1,106 @@
+"""Single database thread that runs queries for the GUI and hands back futures.
+
+The Qt windows never touch SQLite on the event loop thread: they `submit()`
+work here and get a `concurrent.futures.Future` (ui/db_calls.py turns it
+into a Qt signal). One thread runs everything in the order it was
+submitted, on its own pooled connection, so writes from the UI are applied
+in the order the user made them and a read submitted after a write sees it.
+
+    future = db_executor.submit(products.adjust_stock, "admin", 7, -1, "Sold")
+    quantity = future.result()
+
+    quantity = await db_executor.run(products.adjust_stock, "admin", 7, -1, "Sold")  # asyncio
+"""
+import atexit
+import queue
+import threading
+from concurrent.futures import Future
+
+_STOP = object()
+
+
+class DatabaseExecutor:
+    """FIFO queue of calls plus the one thread that runs them.
+
+    Calls made from inside a running call (e.g. a service function that
+    submits another) run inline, so the thread never waits on itself.
+    """
+
+    def __init__(self, name="db-executor"):
+        self.name = name
+        self.queue = queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name=self.name, daemon=True)
+                self.thread.start()
+
+    def on_executor_thread(self):
+        return threading.current_thread() is self.thread
+
+    def submit(self, fn, *args, **kwargs):
+        """Queue `fn(*args, **kwargs)` behind everything already submitted. Returns a Future."""
+        future = Future()
+        if self.on_executor_thread():
+            self._call(future, fn, args, kwargs)
+            return future
+        self.start()
+        self.queue.put((future, fn, args, kwargs))
+        return future
+
+    def flush(self, timeout=None):
+        """Block until everything submitted before this call has run."""
+        if self.thread is None or not self.thread.is_alive() or self.on_executor_thread():
+            return True
+        return self.submit(lambda: None).exception(timeout) is None
+
+    def stop(self, timeout=5):
+        """Run whatever is queued, then stop the thread."""
+        if self.thread is None or not self.thread.is_alive():
+            return
+        self.queue.put(_STOP)
+        self.thread.join(timeout)
+
+    def run(self):
+        while True:
+            item = self.queue.get()
+            if item is _STOP:
+                return
+            self._call(*item)
+
+    @staticmethod
+    def _call(future, fn, args, kwargs):
+        if not future.set_running_or_notify_cancel():
+            return  # cancelled while it waited in the queue
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+
+
+_executor = DatabaseExecutor()
+atexit.register(_executor.stop)  # run writes still queued at exit
+
+
+def submit(fn, *args, **kwargs):
+    return _executor.submit(fn, *args, **kwargs)
+
+
+async def run(fn, *args, **kwargs):
+    """Await `fn(*args, **kwargs)` on the database thread from asyncio code."""
+    import asyncio  # ~25 ms to import; only asyncio callers need it
+
+    return await asyncio.wrap_future(_executor.submit(fn, *args, **kwargs))
+
+
+def flush(timeout=None):
+    return _executor.flush(timeout)
+
+
+def stop(timeout=5):
+    _executor.stop(timeout)
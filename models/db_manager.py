@@ -1,18 +1,176 @@
+import atexit
 import sqlite3
 import os
+import sys
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models import db_executor, migrations, passwords
+from models.log_writer import LogWriter
 
 DB_PATH = os.path.join(os.path.dirname(__file__), '../db/database.db')
 
+# Applied once to every connection when it is opened
+CONNECTION_PRAGMAS = [
+    "PRAGMA journal_mode = WAL",        # readers don't block the writer
+    "PRAGMA synchronous = NORMAL",      # no fsync per commit in WAL mode; still crash-safe
+    "PRAGMA cache_size = -65536",       # 64 MiB page cache
+    "PRAGMA mmap_size = 268435456",     # read up to 256 MiB through mmap
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA foreign_keys = ON",
+]
+
+# 🔌 Connection pool: one long-lived connection per thread
+_local = threading.local()
+_pool = []                  # every pooled connection, so they can all be closed
+_pool_lock = threading.Lock()
+_pool_generation = 0        # bumped by close_all_connections() to retire old handles
+_version_conn = None        # (connection, generation) that only reads PRAGMA data_version
+
+
+def open_connection():
+    """Open a new, tuned connection that the caller owns and must close.
+
+    Most code should use `connection()` instead; this is for threads that need
+    a connection of their own (e.g. one they can interrupt).
+    """
+    conn = sqlite3.connect(DB_PATH, timeout=30, check_same_thread=False)
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
 
 def get_connection():
-    return sqlite3.connect(DB_PATH)
+    """Return this thread's pooled connection, opening it on first use.
 
+    Don't close it — it is reused by every later call on the same thread.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.generation != _pool_generation:
+        # Opened under the lock so replace_database() can't swap the file in between
+        with _pool_lock:
+            conn = open_connection()
+            _pool.append(conn)
+            _local.conn = conn
+            _local.generation = _pool_generation
+            _local.depth = 0
+    return conn
 
-def create_tables():
-    """Create all necessary tables if they don’t exist."""
+
+def release_connection():
+    """Close this thread's pooled connection, if it has one.
+
+    Call it when a short-lived thread (e.g. a QThread worker) finishes, or its
+    connection stays open until close_all_connections().
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        return
+    _local.conn = None
+    with _pool_lock:
+        if conn in _pool:
+            _pool.remove(conn)
+    conn.close()
+
+
+@contextmanager
+def connection():
+    """Use this thread's pooled connection as a transaction.
+
+        with db_manager.connection() as conn:
+            conn.execute(...)
+
+    Commits when the outermost `with` block exits and rolls back if it raises,
+    so nested blocks join the caller's transaction.
+    """
     conn = get_connection()
-    cursor = conn.cursor()
+    _local.depth += 1
     try:
+        yield conn
+    except BaseException:
+        _local.depth -= 1
+        if _local.depth == 0:
+            conn.rollback()
+        raise
+    _local.depth -= 1
+    if _local.depth == 0:
+        conn.commit()
+
+
+def _retire_pool():
+    # Caller holds _pool_lock
+    global _pool_generation
+    _pool_generation += 1
+    for conn in _pool:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+    _pool.clear()
+
+
+def close_all_connections():
+    """Close every pooled connection; threads transparently reopen on next use."""
+    with _pool_lock:
+        _retire_pool()
+
+
+def replace_database(new_path):
+    """Swap the file at `new_path` in for the live database.
+
+    Queued database calls and log rows are run first, then every pooled
+    connection is closed, the file is renamed over DB_PATH and the old
+    -wal/-shm files are removed (left in place, SQLite would replay the old
+    WAL onto the new file). Connections are reopened on the new file on next use. Connections
+    a caller opened itself with open_connection() must be closed beforehand.
+    """
+    db_executor.flush(timeout=5)
+    flush_logs(timeout=5)
+    with _pool_lock:
+        _retire_pool()
+        os.replace(new_path, DB_PATH)
+        for suffix in ("-wal", "-shm"):
+            if os.path.exists(DB_PATH + suffix):
+                os.remove(DB_PATH + suffix)
+
+
+def set_database_path(path):
+    """Point the app at another database file (closes all pooled connections)."""
+    global DB_PATH
+    close_all_connections()
+    DB_PATH = path
+
+
+def data_version():
+    """A token that changes whenever anyone — this process or another — commits to the database.
+
+    Equal tokens mean nothing was committed in between, so a cache can be
+    checked for a few microseconds instead of re-running its query. Read on
+    a pooled connection of its own that never writes, because a connection's
+    `PRAGMA data_version` doesn't count its own commits.
+    """
+    global _version_conn
+    with _pool_lock:
+        if _version_conn is None or _version_conn[1] != _pool_generation:
+            conn = open_connection()
+            _pool.append(conn)
+            _version_conn = (conn, _pool_generation)
+        return _pool_generation, _version_conn[0].execute("PRAGMA data_version").fetchone()[0]
+
+
+atexit.register(close_all_connections)
+
+
+def create_tables():
+    """Create all necessary tables if they don’t exist."""
+    with connection() as conn:
+        cursor = conn.cursor()
+        # Only takes effect on a brand-new file; older databases are converted
+        # with `utils/archive_logs.py --enable-incremental-vacuum`
+        cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS users (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -63,112 +221,556 @@ def create_tables():
             )
         """)
 
-        conn.commit()
-        print("✅ Tables created successfully.")
-    finally:
-        conn.close()
+    print("✅ Tables created successfully.")
+
+    version = migrations.migrate(get_connection())
+    print(f"✅ Schema is at version {version}.")
 
 
 def insert_dummy_data():
     """Insert default users, categories, and products (if not already present)."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("INSERT OR IGNORE INTO users (username, password, role) VALUES (?, ?, ?)",
-                       ('admin', 'admin123', 'admin'))
-        cursor.execute("INSERT OR IGNORE INTO users (username, password, role) VALUES (?, ?, ?)",
-                       ('user1', 'user123', 'user'))
+    with connection() as conn:
+        cursor = conn.cursor()
+        for username, password, role in (('admin', 'admin123', 'admin'), ('user1', 'user123', 'user')):
+            # Hashing is slow, so only for users that are actually missing
+            if not cursor.execute("SELECT 1 FROM users WHERE username=?", (username,)).fetchone():
+                cursor.execute("INSERT INTO users (username, password, role) VALUES (?, ?, ?)",
+                               (username, passwords.hash_password(password), role))
 
         cursor.execute("INSERT OR IGNORE INTO categories (name) VALUES (?)", ('Electronics',))
         cursor.execute("INSERT OR IGNORE INTO categories (name) VALUES (?)", ('Groceries',))
 
-        cursor.execute("""
-            INSERT OR IGNORE INTO products (name, category_id, sku, price, quantity_in_stock) 
-            VALUES (?, ?, ?, ?, ?)""",
-                       ('Laptop', 1, 'SKU123', 1000.0, 10))
-        cursor.execute("""
-            INSERT OR IGNORE INTO products (name, category_id, sku, price, quantity_in_stock) 
-            VALUES (?, ?, ?, ?, ?)""",
-                       ('Apples', 2, 'SKU456', 2.5, 100))
+        from models import inventory_ledger  # imports this module
+
+        for product in (('Laptop', 1, 'SKU123', 1000.0, 10), ('Apples', 2, 'SKU456', 2.5, 100)):
+            # SKUs aren't unique in the schema, so check rather than INSERT OR IGNORE
+            if cursor.execute("SELECT 1 FROM products WHERE sku=?", (product[2],)).fetchone():
+                continue
+            cursor.execute("""
+                INSERT INTO products (name, category_id, sku, price, quantity_in_stock) 
+                VALUES (?, ?, ?, ?, ?)""",
+                           product)
+            # Opening stock goes in the ledger too, or reconcile() would flag it
+            inventory_ledger.record_entry(conn, cursor.lastrowid, product[4], "Initial stock")
+
+    print("✅ Dummy data inserted.")
+
+
+# 🪵 Audit logging
+
+def _write_log_rows(rows):
+    """Insert a batch of (timestamp, username, action, product_name) rows in one commit."""
+    with connection() as conn:
+        conn.executemany("""
+            INSERT INTO logs (timestamp, username, action, product_name) 
+            VALUES (?, ?, ?, ?)
+        """, rows)
+    print(f"🪵 {len(rows)} log(s) saved")
 
-        conn.commit()
-        print("✅ Dummy data inserted.")
-    finally:
-        conn.close()
+
+_log_writer = LogWriter(_write_log_rows)
+# Registered after close_all_connections, so it runs first at exit and the
+# queued rows are written before the connections go away
+atexit.register(_log_writer.stop)
 
 
 def log_action(username, action, product_name):
-    """Record an action in the logs table."""
-    try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO logs (username, action, product_name) 
-            VALUES (?, ?, ?)
-        """, (username, action, product_name))
-        conn.commit()
-        print(f"🪵 Log saved: {username} - {action} - {product_name}")
-    except Exception as e:
-        print(f"⚠️ Failed to log action: {e}")
-    finally:
-        if conn:
-            conn.close()
+    """Record an action in the logs table.
+
+    Returns immediately: the row is written by the background log writer,
+    batched with any other pending rows. The timestamp is taken now (UTC, like
+    CURRENT_TIMESTAMP), not when the batch is written.
+    """
+    timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    _log_writer.submit((timestamp, username, action, product_name))
+
+
+def write_log(conn, username, action, product_name):
+    """Insert a log row on `conn`, as part of the caller's transaction."""
+    conn.execute("""
+        INSERT INTO logs (username, action, product_name) 
+        VALUES (?, ?, ?)
+    """, (username, action, product_name))
+
+
+def flush_logs(timeout=None):
+    """Wait until every queued log row has been written."""
+    return _log_writer.flush(timeout)
+
+
+# 📜 Log viewer helpers
+
+def _log_query(username=None, action=None, product=None, date_from=None, date_to=None):
+    """Build the WHERE clauses and params for the log viewer filters.
+
+    `date_from` and `date_to` are inclusive "YYYY-MM-DD" dates, compared
+    against the UTC timestamps the logs are stored with.
+    """
+    clauses = []
+    params = []
+    if username:
+        clauses.append("username = ?")
+        params.append(username)
+    if action:
+        clauses.append("action = ?")
+        params.append(action)
+    if product:
+        clauses.append("product_name LIKE ?")
+        params.append(f"%{product}%")
+    if date_from:
+        clauses.append("timestamp >= ?")
+        params.append(date_from)
+    if date_to:
+        # timestamps are "YYYY-MM-DD HH:MM:SS", so anything on date_to sorts below date_to + "~"
+        clauses.append("timestamp < ?")
+        params.append(date_to + "~")
+    return clauses, params
+
+
+def build_logs_page_query(after=None, limit=200, table="logs", **filters):
+    """Return (query, params) for one page of logs, newest first.
+
+    `table` can name an attached archive's copy, e.g. "log_archive.logs".
+    """
+    clauses, params = _log_query(**filters)
+    if after is not None:
+        clauses.append("(timestamp, id) < (?, ?)")
+        params.extend(after)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    params.append(limit)
+
+    query = f"""
+        SELECT id, timestamp, username, action, product_name
+        FROM {table}
+        {where}
+        ORDER BY timestamp DESC, id DESC
+        LIMIT ?
+    """
+    return query, params
+
+
+def fetch_logs_page(after=None, limit=200, table="logs", **filters):
+    """Fetch one page of logs (id, timestamp, username, action, product name), newest first.
+
+    Returns (rows, next_after), keyed on (timestamp, id) like
+    fetch_products_page. Filters are the keyword arguments of _log_query.
+    Only the live table is read; log_archive.fetch_logs_page continues into
+    the archives.
+    """
+    query, params = build_logs_page_query(after, limit, table, **filters)
+    with connection() as conn:
+        rows = conn.execute(query, params).fetchall()
+
+    if not rows:
+        return [], after
+    return rows, (rows[-1][1], rows[-1][0])
+
+
+def build_new_logs_query(since_id, **filters):
+    """Return (query, params) for the logs written after the row with id `since_id`."""
+    clauses, params = _log_query(**filters)
+    clauses.append("id > ?")
+    params.append(since_id)
+
+    # NOT INDEXED keeps the planner on the rowid range: the filter indexes
+    # would read every matching row ever logged to find the few new ones
+    query = f"""
+        SELECT id, timestamp, username, action, product_name
+        FROM logs NOT INDEXED
+        WHERE {' AND '.join(clauses)}
+        ORDER BY timestamp DESC, id DESC
+    """
+    return query, params
+
+
+def fetch_new_logs(since_id, **filters):
+    """Fetch the logs written after `since_id` (newest first).
+
+    Goes by id rather than timestamp: rows queued by log_action carry the time
+    they were logged, which can be a moment before a row that was committed
+    first, but ids always grow in commit order.
+    """
+    query, params = build_new_logs_query(since_id, **filters)
+    with connection() as conn:
+        return conn.execute(query, params).fetchall()
+
+
+def get_last_log_id():
+    with connection() as conn:
+        return conn.execute("SELECT COALESCE(MAX(id), 0) FROM logs").fetchone()[0]
+
+
+def build_distinct_log_values_query(column, table="logs"):
+    """Return the query for every distinct value of a logs column, sorted.
+
+    It hops from one value to the next through the column's index instead of
+    reading every row, which is what a plain SELECT DISTINCT would do.
+    """
+    return f"""
+        WITH RECURSIVE seen(value) AS (
+            SELECT MIN({column}) FROM {table}
+            UNION ALL
+            SELECT (SELECT MIN({column}) FROM {table} WHERE {column} > seen.value)
+            FROM seen WHERE seen.value IS NOT NULL
+        )
+        SELECT value FROM seen WHERE value IS NOT NULL
+    """
+
+
+def get_distinct_log_values(column, table="logs"):
+    """Every distinct value of a logs column ("username" or "action"), sorted."""
+    query = build_distinct_log_values_query(column, table)
+    with connection() as conn:
+        return [row[0] for row in conn.execute(query)]
+
+
+# ⚙️ Settings
+
+def get_setting(key, default=None):
+    with connection() as conn:
+        row = conn.execute("SELECT value FROM settings WHERE key=?", (key,)).fetchone()
+    return row[0] if row else default
+
+
+def set_setting(key, value):
+    with connection() as conn:
+        conn.execute(
+            "INSERT INTO settings (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, str(value))
+        )
+
+
+# 📊 Stock summary (category_stock and low_stock are kept up to date by triggers)
+
+def get_stock_summary():
+    """Totals per category, from the maintained summary rather than a scan of products.
+
+    Returns (totals, per_category): totals is a dict with product_count,
+    total_quantity, stock_value and low_stock_count; per_category is a list
+    of (category name, product count, total quantity, stock value) with
+    uncategorized products under "Uncategorized".
+    """
+    with connection() as conn:
+        per_category = conn.execute("""
+            SELECT COALESCE(c.name, 'Uncategorized'), s.product_count, s.total_quantity, s.stock_value
+            FROM category_stock s
+            LEFT JOIN categories c ON c.id = s.category_id
+            WHERE s.product_count > 0
+            ORDER BY s.stock_value DESC
+        """).fetchall()
+        low_stock_count = conn.execute("SELECT COUNT(*) FROM low_stock").fetchone()[0]
+
+    totals = {
+        "product_count": sum(row[1] for row in per_category),
+        "total_quantity": sum(row[2] for row in per_category),
+        "stock_value": round(sum(row[3] for row in per_category), 2),
+        "low_stock_count": low_stock_count,
+    }
+    return totals, [(name, count, quantity, round(value, 2)) for name, count, quantity, value in per_category]
+
+
+def get_low_stock_products(limit=100):
+    """The products furthest below their threshold: (id, name, category, quantity, threshold)."""
+    with connection() as conn:
+        return conn.execute("""
+            SELECT p.id, p.name, c.name, l.quantity, l.threshold
+            FROM low_stock l
+            CROSS JOIN products p ON p.id = l.product_id  -- drive from the (small) low_stock set
+            LEFT JOIN categories c ON c.id = p.category_id
+            ORDER BY l.quantity - l.threshold, p.id
+            LIMIT ?
+        """, (limit,)).fetchall()
+
+
+def get_default_low_stock_threshold():
+    return int(get_setting("low_stock_threshold", migrations.DEFAULT_LOW_STOCK_THRESHOLD))
+
+
+def set_default_low_stock_threshold(threshold):
+    """Change the default threshold; a trigger re-evaluates the low_stock set."""
+    set_setting("low_stock_threshold", int(threshold))
+
+
+def get_categories():
+    """(id, name, low_stock_threshold or None, parent_id or None) for every category, by name."""
+    with connection() as conn:
+        return conn.execute(
+            "SELECT id, name, low_stock_threshold, parent_id FROM categories ORDER BY name"
+        ).fetchall()
+
+
+# Categories directly under a parent (NULL: the top level), with how many
+# subcategories each has and how many products are in its whole subtree
+CATEGORY_CHILDREN_QUERY = """
+    SELECT c.id, c.name,
+           (SELECT COUNT(*) FROM categories k WHERE k.parent_id = c.id),
+           (SELECT CAST(TOTAL(s.product_count) AS INTEGER)
+            FROM category_tree t JOIN category_stock s ON s.category_id = t.descendant_id
+            WHERE t.ancestor_id = c.id)
+    FROM categories c
+    WHERE c.parent_id IS ?
+    ORDER BY c.name
+"""
+
+CATEGORY_PATH_QUERY = """
+    SELECT c.id, c.name FROM category_tree t JOIN categories c ON c.id = t.ancestor_id
+    WHERE t.descendant_id = ? ORDER BY t.depth DESC
+"""
+
+
+def get_category_children(parent_id=None):
+    """(id, name, subcategory count, product count) for each category directly under `parent_id`."""
+    with connection() as conn:
+        return conn.execute(CATEGORY_CHILDREN_QUERY, (parent_id,)).fetchall()
+
+
+def get_category_path(category_id):
+    """(id, name) from the top-level category down to `category_id` itself."""
+    with connection() as conn:
+        return conn.execute(CATEGORY_PATH_QUERY, (category_id,)).fetchall()
+
+
+def set_category_threshold(category_id, threshold):
+    """Set a category's threshold (None falls back to the default); its products are re-evaluated by a trigger."""
+    with connection() as conn:
+        conn.execute("UPDATE categories SET low_stock_threshold=? WHERE id=?", (threshold, category_id))
+
+
+def rebuild_stock_summary():
+    """Recompute category_stock and low_stock from products, e.g. after editing the database by hand."""
+    with connection() as conn:
+        for statement in migrations.STOCK_SUMMARY_REBUILD:
+            conn.execute(statement)
+
+
+# 📦 Product helpers
+
+# The trigram tokenizer can only match terms of at least this many characters
+FTS_MIN_TERM_LENGTH = 3
+
+
+def _fts_phrase(text):
+    """Quote search text as a single FTS5 phrase so punctuation is matched literally."""
+    return '"' + text.replace('"', '""') + '"'
+
+
+def _product_query(search_text=None, category_id=None):
+    """Build the FROM/WHERE part of the product listing queries.
+
+    Returns (from_sql, clauses, params, ranked). Searches of three characters or
+    more go through the products_fts trigram index and are ranked by bm25;
+    shorter ones can't use the index and fall back to a LIKE scan.
+
+    A category filter covers its subcategories too, through the category_tree
+    closure table. A category without subcategories is filtered on
+    `p.category_id = ?` alone, which pages in id order straight off the index.
+    """
+    clauses = []
+    params = []
+    ranked = bool(search_text) and len(search_text) >= FTS_MIN_TERM_LENGTH
+
+    if ranked:
+        from_sql = """
+            FROM products_fts f
+            JOIN products p ON p.id = f.rowid
+            LEFT JOIN categories c ON p.category_id = c.id
+        """
+        clauses.append("products_fts MATCH ?")
+        params.append(_fts_phrase(search_text))
+    else:
+        from_sql = """
+            FROM products p
+            LEFT JOIN categories c ON p.category_id = c.id
+        """
+        if search_text:
+            clauses.append("(p.name LIKE ? OR p.sku LIKE ?)")
+            params.extend([f"%{search_text}%", f"%{search_text}%"])
+
+    if category_id:
+        from models import category_cache  # imports this module
+
+        if category_cache.has_children(category_id):
+            clauses.append("p.category_id IN (SELECT descendant_id FROM category_tree WHERE ancestor_id = ?)")
+        else:
+            clauses.append("p.category_id = ?")
+        params.append(category_id)
+
+    return from_sql, clauses, params, ranked
+
+
+# Listing rows: (id, name, category, sku, price, quantity, low); `low` is 1 for products in the low_stock set
+LISTING_COLUMNS = """
+    p.id, p.name, c.name as category, p.sku, p.price, p.quantity_in_stock,
+    EXISTS(SELECT 1 FROM low_stock l WHERE l.product_id = p.id) AS low
+"""
+
+
+def build_products_page_query(search_text=None, category_id=None, after=None, limit=200):
+    """Return (query, params, ranked) for one page of the product listing."""
+    from_sql, clauses, params, ranked = _product_query(search_text, category_id)
+
+    if ranked:
+        if after is not None:
+            last_rank, last_id = after
+            clauses.append("(f.rank > ? OR (f.rank = ? AND p.id > ?))")
+            params.extend([last_rank, last_rank, last_id])
+        order_by = "f.rank, p.id"
+        rank_column = ", f.rank"
+    else:
+        if after is not None:
+            clauses.append("p.id > ?")
+            params.append(after)
+        order_by = "p.id"
+        rank_column = ""
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    params.append(limit)
+
+    query = f"""
+        SELECT {LISTING_COLUMNS}{rank_column}
+        {from_sql}
+        {where}
+        ORDER BY {order_by}
+        LIMIT ?
+    """
+    return query, params, ranked
+
+
+def fetch_products_page(search_text=None, category_id=None, after=None, limit=200, conn=None):
+    """Fetch one page of product listing rows (see LISTING_COLUMNS).
+
+    Returns (rows, next_after): pass `next_after` back as `after` to get the
+    following page. Pages are keyed on the last row seen (the product id, or
+    (rank, id) for ranked searches) instead of an OFFSET, so every page costs
+    the same no matter how deep the user has scrolled. Pass `conn` to run on a
+    caller-owned connection (e.g. one that may be interrupted).
+    """
+    query, params, ranked = build_products_page_query(search_text, category_id, after, limit)
+
+    if conn is not None:
+        rows = conn.execute(query, params).fetchall()
+    else:
+        with connection() as conn:
+            rows = conn.execute(query, params).fetchall()
+
+    if not rows:
+        return [], after
+    if ranked:
+        last = rows[-1]
+        return [row[:7] for row in rows], (last[7], last[0])
+    return rows, rows[-1][0]
+
+
+def build_product_row_query(product_id, search_text=None, category_id=None):
+    """Return (query, params, ranked) for one product's listing row, if it matches the filter."""
+    from_sql, clauses, params, ranked = _product_query(search_text, category_id)
+    clauses.append("p.id = ?")
+    params.append(product_id)
+    rank_column = ", f.rank" if ranked else ""
+
+    query = f"""
+        SELECT {LISTING_COLUMNS}{rank_column}
+        {from_sql}
+        WHERE {' AND '.join(clauses)}
+    """
+    return query, params, ranked
+
+
+def fetch_product_row(product_id, search_text=None, category_id=None):
+    """Fetch one product's listing row, or None if it doesn't exist or doesn't match the filter.
+
+    Returns (row, rank): `rank` is the bm25 rank for ranked searches (the
+    first half of their paging key) and None otherwise.
+    """
+    query, params, ranked = build_product_row_query(product_id, search_text, category_id)
+
+    with connection() as conn:
+        row = conn.execute(query, params).fetchone()
+
+    if row is None:
+        return None, None
+    return row[:7], (row[7] if ranked else None)
+
+
+def build_products_query(search_text=None, category_id=None):
+    """Return (query, params) for every product matching the filter."""
+    from_sql, clauses, params, ranked = _product_query(search_text, category_id)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    order_by = "f.rank, p.id" if ranked else "p.id"
+
+    query = f"""
+        SELECT p.id, p.name, c.name as category, p.sku, p.price, p.quantity_in_stock
+        {from_sql}
+        {where}
+        ORDER BY {order_by}
+    """
+    return query, params
+
+
+def build_products_count_query(search_text=None, category_id=None):
+    """Return (query, params) counting the products that match the filter."""
+    from_sql, clauses, params, _ = _product_query(search_text, category_id)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    return f"SELECT COUNT(*) {from_sql} {where}", params
 
 
 # 👤 User management helpers
 
+def get_user_credentials(username):
+    """(id, username, role, password hash) for a login, or None. Goes by the username index only."""
+    with connection() as conn:
+        return conn.execute(
+            "SELECT id, username, role, password FROM users WHERE username=?", (username,)
+        ).fetchone()
+
+
+def set_password_hash(user_id, encoded):
+    with connection() as conn:
+        conn.execute("UPDATE users SET password=? WHERE id=?", (encoded, user_id))
+
+
 def get_all_users():
     """Fetch all users (id, username, role)."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT id, username, role FROM users")
-    users = cursor.fetchall()
-    conn.close()
-    return users
+    with connection() as conn:
+        return conn.execute("SELECT id, username, role FROM users").fetchall()
 
 
 def add_user(username, password, role):
-    """Add a new user."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute(
-        "INSERT INTO users (username, password, role) VALUES (?, ?, ?)",
-        (username, password, role)
-    )
-    conn.commit()
-    conn.close()
+    """Add a new user; only a salted hash of the password is stored."""
+    encoded = passwords.hash_password(password)  # slow; done before taking the write lock
+    with connection() as conn:
+        conn.execute(
+            "INSERT INTO users (username, password, role) VALUES (?, ?, ?)",
+            (username, encoded, role)
+        )
 
 
 def update_user(user_id, password=None, role=None):
     """Update a user's password and/or role."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    if password and role:
-        cursor.execute(
-            "UPDATE users SET password=?, role=? WHERE id=?",
-            (password, role, user_id)
-        )
-    elif password:
-        cursor.execute(
-            "UPDATE users SET password=? WHERE id=?",
-            (password, user_id)
-        )
-    elif role:
-        cursor.execute(
-            "UPDATE users SET role=? WHERE id=?",
-            (role, user_id)
-        )
-    conn.commit()
-    conn.close()
+    if password:
+        password = passwords.hash_password(password)
+    with connection() as conn:
+        if password and role:
+            conn.execute(
+                "UPDATE users SET password=?, role=? WHERE id=?",
+                (password, role, user_id)
+            )
+        elif password:
+            conn.execute(
+                "UPDATE users SET password=? WHERE id=?",
+                (password, user_id)
+            )
+        elif role:
+            conn.execute(
+                "UPDATE users SET role=? WHERE id=?",
+                (role, user_id)
+            )
 
 
 def delete_user(user_id):
     """Delete a user by id."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM users WHERE id=?", (user_id,))
-    conn.commit()
-    conn.close()
+    with connection() as conn:
+        conn.execute("DELETE FROM users WHERE id=?", (user_id,))
 
 
 if __name__ == "__main__":
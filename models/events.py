@@ -0,0 +1,61 @@
+"""Process-wide change notifications from the data layer.
+
+Writers publish a topic after their transaction commits; views subscribe and
+patch themselves instead of reloading everything. Callbacks run on the
+publishing thread, so Qt code should forward them through a signal.
+
+    events.subscribe(events.PRODUCT_CHANGED, on_product_changed)
+    events.publish(events.PRODUCT_CHANGED, product_id, events.UPDATED)
+"""
+import threading
+
+# Topics
+PRODUCT_CHANGED = "product_changed"    # (product_id, kind)
+PRODUCTS_RELOADED = "products_reloaded"  # () many products changed at once, e.g. an import
+DATABASE_RESTORED = "database_restored"  # () the whole database was replaced from a backup
+CATEGORIES_CHANGED = "categories_changed"  # () a category was added, or its name or threshold changed
+
+# Kinds of product change
+ADDED = "added"
+UPDATED = "updated"
+DELETED = "deleted"
+
+_subscribers = {}
+_lock = threading.Lock()
+
+
+def _same(a, b):
+    # A Qt signal's `emit` is a new object on every access (`window.changed.emit`
+    # != `window.changed.emit`), but its bound signal compares equal
+    if a == b:
+        return True
+    owner_a, owner_b = getattr(a, "__self__", None), getattr(b, "__self__", None)
+    return (owner_a is not None and owner_b is not None
+            and getattr(a, "__name__", None) == getattr(b, "__name__", None)
+            and type(owner_a) is type(owner_b) and owner_a == owner_b)
+
+
+def subscribe(topic, callback):
+    with _lock:
+        callbacks = _subscribers.setdefault(topic, [])
+        if not any(_same(callback, existing) for existing in callbacks):
+            callbacks.append(callback)
+
+
+def unsubscribe(topic, callback):
+    with _lock:
+        callbacks = _subscribers.get(topic, [])
+        for existing in callbacks:
+            if _same(callback, existing):
+                callbacks.remove(existing)
+                break
+
+
+def publish(topic, *args):
+    with _lock:
+        callbacks = list(_subscribers.get(topic, []))
+    for callback in callbacks:
+        try:
+            callback(*args)
+        except Exception as e:
+            print(f"⚠️ {topic} subscriber failed: {e}")
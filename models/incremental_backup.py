@@ -0,0 +1,253 @@
+"""Incremental backups: snapshots that only store the chunks that changed.
+
+Each snapshot takes a consistent copy of the live database (through
+backup_restore.copy_database), cuts it into fixed, page-aligned chunks and
+stores every chunk under its SHA-256 in a shared chunk store. A chunk that an
+earlier snapshot already stored isn't written again, so an hourly snapshot
+of a large database that barely changed costs a few megabytes instead of a
+full copy. The snapshot itself is a small JSON file listing its chunks.
+
+    backups/incremental/
+        chunks/3f/3fa9…       zlib-compressed chunk, named by the hash of its contents
+        snapshots/20250710_153000_000000.json
+
+    snapshot_id = take_snapshot()
+    restore_snapshot(snapshot_id, "restored.db")
+    prune(hourly=24, daily=7, weekly=4)
+"""
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import zlib
+from datetime import datetime, timezone
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models import backup_restore, db_manager
+
+STORE_DIR = os.path.join(backup_restore.BACKUP_DIR, "incremental")
+CHUNK_PAGES = 64  # database pages per chunk (256 KiB with the default 4 KiB pages)
+
+# Snapshots kept by prune(): the newest one of each of the last N hours / days / weeks
+DEFAULT_KEEP = {"hourly": 24, "daily": 7, "weekly": 4}
+
+# prune() must not delete a chunk that a snapshot in progress has decided to reuse
+_store_lock = threading.Lock()
+
+
+def _chunk_path(store_dir, digest):
+    return os.path.join(store_dir, "chunks", digest[:2], digest)
+
+
+def _snapshot_path(store_dir, snapshot_id):
+    return os.path.join(store_dir, "snapshots", f"{snapshot_id}.json")
+
+
+def _write_atomically(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    part_path = path + ".part"
+    with open(part_path, "wb") as file:
+        file.write(data)
+    os.replace(part_path, path)
+
+
+def take_snapshot(store_dir=STORE_DIR, progress=None, is_cancelled=None):
+    """Snapshot the live database into the chunk store. Returns the snapshot id.
+
+    `progress(fraction_done)` and `is_cancelled()` work as for
+    backup_restore.backup_database; a cancelled snapshot leaves no snapshot
+    file (chunks it already stored are reused next time or pruned).
+    """
+    with _store_lock:
+        return _take_snapshot(store_dir, progress, is_cancelled)
+
+
+def _take_snapshot(store_dir, progress, is_cancelled):
+    started = datetime.now(timezone.utc)
+    snapshot_id = started.strftime("%Y%m%d_%H%M%S_%f")
+    os.makedirs(store_dir, exist_ok=True)
+
+    def report(share, offset):
+        if not progress:
+            return None
+        return lambda done, total: progress(offset + share * done / (total or 1))
+
+    with tempfile.TemporaryDirectory(dir=store_dir) as tmp:
+        copy_path = os.path.join(tmp, "snapshot.db")
+        info = backup_restore.copy_database(copy_path, report(0.5, 0.0), is_cancelled)
+
+        chunk_size = info["page_size"] * CHUNK_PAGES
+        total = os.path.getsize(copy_path)
+        chunks = []
+        new_chunks = 0
+        bytes_written = 0
+        database_digest = hashlib.sha256()
+        chunk_progress = report(0.5, 0.5)
+
+        with open(copy_path, "rb") as file:
+            for data in iter(lambda: file.read(chunk_size), b""):
+                if is_cancelled and is_cancelled():
+                    raise backup_restore.BackupCancelled()
+                database_digest.update(data)
+                digest = hashlib.sha256(data).hexdigest()
+                chunks.append(digest)
+
+                path = _chunk_path(store_dir, digest)
+                if not os.path.exists(path):
+                    compressed = zlib.compress(data, 1)
+                    _write_atomically(path, compressed)
+                    new_chunks += 1
+                    bytes_written += len(compressed)
+                if chunk_progress:
+                    chunk_progress(len(chunks) * chunk_size, total)
+
+    snapshot = {
+        "id": snapshot_id,
+        "created": started.strftime("%Y-%m-%d %H:%M:%S"),
+        "source": os.path.abspath(db_manager.DB_PATH),
+        "size": total,
+        "chunk_size": chunk_size,
+        "chunks": chunks,
+        "new_chunks": new_chunks,
+        "bytes_written": bytes_written,
+        "database_sha256": database_digest.hexdigest(),
+        **info,
+    }
+    # Written last: a snapshot only exists once all of its chunks do
+    _write_atomically(_snapshot_path(store_dir, snapshot_id), json.dumps(snapshot, indent=1).encode())
+    if progress:
+        progress(1.0)
+    return snapshot_id
+
+
+def list_snapshots(store_dir=STORE_DIR):
+    """Every snapshot's metadata (without its chunk list), newest first."""
+    folder = os.path.join(store_dir, "snapshots")
+    if not os.path.isdir(folder):
+        return []
+
+    snapshots = []
+    for name in sorted(os.listdir(folder), reverse=True):
+        if name.endswith(".json"):
+            snapshot = load_snapshot(name[:-len(".json")], store_dir)
+            del snapshot["chunks"]
+            snapshots.append(snapshot)
+    return snapshots
+
+
+def load_snapshot(snapshot_id, store_dir=STORE_DIR):
+    try:
+        with open(_snapshot_path(store_dir, snapshot_id), encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        raise ValueError(f"There is no snapshot {snapshot_id!r}.")
+
+
+def restore_snapshot(snapshot_id, target_path, store_dir=STORE_DIR, progress=None):
+    """Rebuild a snapshot's database file at `target_path`.
+
+    The result is checked against the snapshot's SHA-256 before it replaces
+    `target_path`; raises ValueError if a chunk is missing or damaged. This
+    only writes the file — use backup_restore to swap it in for the live
+    database.
+    """
+    snapshot = load_snapshot(snapshot_id, store_dir)
+    database_digest = hashlib.sha256()
+    part_path = target_path + ".part"
+
+    try:
+        with open(part_path, "wb") as target:
+            for number, digest in enumerate(snapshot["chunks"], start=1):
+                try:
+                    with open(_chunk_path(store_dir, digest), "rb") as file:
+                        data = zlib.decompress(file.read())
+                except (FileNotFoundError, zlib.error):
+                    raise ValueError(f"Chunk {digest} of snapshot {snapshot_id} is missing or damaged.")
+                if hashlib.sha256(data).hexdigest() != digest:
+                    raise ValueError(f"Chunk {digest} of snapshot {snapshot_id} is damaged.")
+                database_digest.update(data)
+                target.write(data)
+                if progress:
+                    progress(number / len(snapshot["chunks"]))
+
+        if database_digest.hexdigest() != snapshot["database_sha256"]:
+            raise ValueError(f"Snapshot {snapshot_id} doesn't rebuild to the database it recorded.")
+        os.replace(part_path, target_path)
+    finally:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+    return snapshot
+
+
+def restore_snapshot_to_live(snapshot_id, store_dir=STORE_DIR, progress=None):
+    """Rebuild a snapshot and make it the live database (see backup_restore.restore_database)."""
+    live_dir = os.path.dirname(os.path.abspath(db_manager.DB_PATH))
+    with tempfile.TemporaryDirectory(dir=live_dir) as tmp:
+        rebuilt_path = os.path.join(tmp, "snapshot.db")
+        restore_snapshot(
+            snapshot_id, rebuilt_path, store_dir,
+            progress=(lambda fraction: progress(fraction / 2)) if progress else None
+        )
+        backup_restore.restore_database(
+            rebuilt_path, progress=(lambda fraction: progress(0.5 + fraction / 2)) if progress else None
+        )
+
+
+def _bucket(created, period):
+    if period == "hourly":
+        return created.strftime("%Y-%m-%d %H")
+    if period == "daily":
+        return created.strftime("%Y-%m-%d")
+    year, week, _ = created.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def prune(hourly=None, daily=None, weekly=None, store_dir=STORE_DIR):
+    """Delete the snapshots the keep policy doesn't need, then their unused chunks.
+
+    Keeps the newest snapshot in each of the last `hourly` hours, `daily`
+    days and `weekly` ISO weeks that have one (defaults in DEFAULT_KEEP); the
+    newest snapshot is always kept. Returns (snapshots deleted, chunks deleted).
+    """
+    keep_counts = {
+        "hourly": DEFAULT_KEEP["hourly"] if hourly is None else hourly,
+        "daily": DEFAULT_KEEP["daily"] if daily is None else daily,
+        "weekly": DEFAULT_KEEP["weekly"] if weekly is None else weekly,
+    }
+    with _store_lock:
+        return _prune(keep_counts, store_dir)
+
+
+def _prune(keep_counts, store_dir):
+    snapshots = list_snapshots(store_dir)
+    keep = {snapshots[0]["id"]} if snapshots else set()
+
+    for period, count in keep_counts.items():
+        seen = set()
+        for snapshot in snapshots:  # newest first, so the first one per bucket wins
+            bucket = _bucket(datetime.strptime(snapshot["created"], "%Y-%m-%d %H:%M:%S"), period)
+            if bucket not in seen and len(seen) < count:
+                seen.add(bucket)
+                keep.add(snapshot["id"])
+
+    deleted = 0
+    for snapshot in snapshots:
+        if snapshot["id"] not in keep:
+            os.remove(_snapshot_path(store_dir, snapshot["id"]))
+            deleted += 1
+
+    # Chunks no remaining snapshot refers to
+    used = set()
+    for snapshot_id in keep:
+        used.update(load_snapshot(snapshot_id, store_dir)["chunks"])
+    removed_chunks = 0
+    chunks_dir = os.path.join(store_dir, "chunks")
+    for folder, _, names in os.walk(chunks_dir):
+        for name in names:
+            if name not in used:
+                os.remove(os.path.join(folder, name))
+                removed_chunks += 1
+    return deleted, removed_chunks
@@ -0,0 +1,265 @@
+"""The stock ledger: every stock movement is a row in `inventory_logs`.
+
+`products.quantity_in_stock` is the materialized balance of a product's
+movements and is only ever changed together with a ledger row, in the same
+transaction, so reading the current stock stays a single-row lookup.
+
+Checkpoints (migration 6) record the balances the ledger adds up to at one
+ledger row. Stock as of any moment is then the nearest checkpoint before it
+plus the few movements after, not a replay of the whole history; they also
+let log retention archive old ledger rows without losing the balances.
+
+    inventory_ledger.record_movement(conn, product_id, -3, "Sold")
+    inventory_ledger.take_checkpoint()
+    inventory_ledger.stock_as_of("2025-07-01 00:00:00")   # {product_id: quantity}
+    inventory_ledger.reconcile()                          # products whose balance disagrees
+"""
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models import db_manager, log_archive
+
+RUN_INTERVAL = 24 * 60 * 60  # seconds between scheduled checkpoints
+
+
+# ✍️ Writing movements
+
+def record_entry(conn, product_id, change, reason):
+    """Add a ledger row for a balance the caller has already set (e.g. a new product's opening stock)."""
+    if change:
+        conn.execute(
+            "INSERT INTO inventory_logs (product_id, change, reason) VALUES (?, ?, ?)",
+            (product_id, change, reason)
+        )
+
+
+def record_movement(conn, product_id, change, reason):
+    """Add a ledger row and move the product's balance by `change`. Returns the new balance.
+
+    Runs in the caller's transaction. Returns None if the product doesn't
+    exist; raises ValueError if the movement would take stock below zero.
+    """
+    row = conn.execute("SELECT quantity_in_stock FROM products WHERE id=?", (product_id,)).fetchone()
+    if row is None:
+        return None
+    balance = (row[0] or 0) + change
+    if balance < 0:
+        raise ValueError(f"Only {row[0] or 0} in stock; can't remove {-change}.")
+
+    if change:
+        conn.execute("UPDATE products SET quantity_in_stock=? WHERE id=?", (balance, product_id))
+        record_entry(conn, product_id, change, reason)
+    return balance
+
+
+# 📍 Checkpoints
+
+def latest_checkpoint(conn):
+    """(id, taken_at, ledger_id) of the newest checkpoint, or None."""
+    return conn.execute(
+        "SELECT id, taken_at, ledger_id FROM stock_checkpoints ORDER BY id DESC LIMIT 1"
+    ).fetchone()
+
+
+def take_checkpoint():
+    """Checkpoint the ledger up to its newest row. Returns the checkpoint id, or None if nothing moved.
+
+    Only the products that moved since the previous checkpoint get a row, so
+    this costs as much as the movements since then, not the whole catalog.
+    """
+    with db_manager.connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")  # no movements land while we add up
+        previous = latest_checkpoint(conn)
+        previous_ledger_id = previous[2] if previous else 0
+        ledger_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM inventory_logs").fetchone()[0]
+        if previous and ledger_id <= previous_ledger_id:
+            return None
+
+        checkpoint_id = conn.execute(
+            "INSERT INTO stock_checkpoints (ledger_id) VALUES (?)", (ledger_id,)
+        ).lastrowid
+        conn.execute("""
+            INSERT INTO stock_checkpoint_balances (product_id, checkpoint_id, quantity)
+            SELECT m.product_id, ?, m.change + COALESCE((
+                SELECT b.quantity FROM stock_checkpoint_balances b
+                WHERE b.product_id = m.product_id ORDER BY b.checkpoint_id DESC LIMIT 1
+            ), 0)
+            FROM (
+                SELECT product_id, SUM(change) AS change FROM inventory_logs
+                WHERE id > ? AND id <= ? AND product_id IS NOT NULL
+                GROUP BY product_id
+            ) m
+        """, (checkpoint_id, previous_ledger_id, ledger_id))
+    return checkpoint_id
+
+
+# 🕰️ Stock as of a moment
+
+def _as_text(moment):
+    if isinstance(moment, datetime):
+        return moment.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    return moment
+
+
+def _movements(conn, table, after_id, moment, product_id, before_id=None):
+    """Sum of `table`'s movements after ledger row `after_id` up to `moment`, per product.
+
+    Deleting a product deletes its live ledger rows; its archived ones are
+    skipped here so it doesn't reappear in past stock.
+    """
+    clauses = ["id > ?", "timestamp <= ?", "product_id IN (SELECT id FROM main.products)"]
+    params = [after_id, moment]
+    if before_id is not None:
+        clauses.append("id < ?")
+        params.append(before_id)
+    if product_id is not None:
+        clauses.append("product_id = ?")
+        params.append(product_id)
+        source = table
+    else:
+        # Read just the rows since the checkpoint by rowid, not every product's index range
+        source = f"{table} NOT INDEXED"
+    return conn.execute(f"""
+        SELECT product_id, SUM(change) FROM {source}
+        WHERE {' AND '.join(clauses)}
+        GROUP BY product_id
+    """, params).fetchall()
+
+
+def stock_as_of(moment, product_id=None):
+    """Every product's stock at `moment` (UTC "YYYY-MM-DD HH:MM:SS" or a datetime), as {product_id: quantity}.
+
+    With `product_id`, returns just that product's quantity. Starts from the
+    newest checkpoint taken at or before `moment` and adds the movements
+    after it, reading archived ledger rows when they are needed. Before the
+    first checkpoint, only the ledger rows themselves are counted.
+    """
+    moment = _as_text(moment)
+    totals = {}
+
+    with db_manager.connection() as conn:
+        checkpoint = conn.execute("""
+            SELECT id, taken_at, ledger_id FROM stock_checkpoints
+            WHERE taken_at <= ? ORDER BY taken_at DESC, id DESC LIMIT 1
+        """, (moment,)).fetchone()
+        after_id = checkpoint[2] if checkpoint else 0
+
+        if checkpoint and product_id is not None:
+            row = conn.execute("""
+                SELECT product_id, quantity FROM stock_checkpoint_balances
+                WHERE product_id = ? AND checkpoint_id <= ?
+                ORDER BY checkpoint_id DESC LIMIT 1
+            """, (product_id, checkpoint[0])).fetchone()
+            balances = [row] if row else []
+        elif checkpoint:
+            # Each product's newest balance at or before the checkpoint (bare column with MAX)
+            balances = conn.execute("""
+                SELECT product_id, quantity, MAX(checkpoint_id) FROM stock_checkpoint_balances
+                WHERE checkpoint_id <= ? GROUP BY product_id
+            """, (checkpoint[0],)).fetchall()
+        else:
+            balances = []
+        for row in balances:
+            totals[row[0]] = row[1]
+
+        # Ledger rows past `moment` start here; the rows in between are live or archived
+        first_after = conn.execute("""
+            SELECT id FROM inventory_logs WHERE timestamp > ? ORDER BY timestamp, id LIMIT 1
+        """, (moment,)).fetchone()
+        first_live = conn.execute("SELECT MIN(id) FROM inventory_logs").fetchone()[0]
+        for pid, change in _movements(conn, "inventory_logs", after_id, moment, product_id,
+                                      first_after[0] if first_after else None):
+            totals[pid] = totals.get(pid, 0) + change
+
+    # Archived rows are all older than the live ones; a row caught between
+    # being copied and deleted is counted from the live table only
+    since_month = checkpoint[1][:7] if checkpoint else ""
+    for month in log_archive.list_archives():
+        if month < since_month or month > moment[:7]:
+            continue
+        with db_manager.connection() as conn, log_archive.attached(conn, month):
+            for pid, change in _movements(conn, f"{log_archive.ARCHIVE_ALIAS}.inventory_logs",
+                                          after_id, moment, product_id, first_live):
+                totals[pid] = totals.get(pid, 0) + change
+
+    if product_id is not None:
+        return totals.get(product_id, 0)
+    return {pid: quantity for pid, quantity in totals.items() if quantity}
+
+
+# 🧮 Reconciliation
+
+def reconcile(fix=False, username="system"):
+    """Check every product's balance against the ledger in one pass.
+
+    The ledger balance is the newest checkpoint balance plus the movements
+    since the latest checkpoint. Returns [(product_id, name, balance, ledger
+    balance)] for the products that disagree; with `fix`, their balances
+    are set to the ledger's and the correction is logged.
+    """
+    with db_manager.connection() as conn:
+        checkpoint = latest_checkpoint(conn)
+        mismatches = conn.execute("""
+            SELECT id, name, balance, ledger FROM (
+                SELECT p.id, p.name, COALESCE(p.quantity_in_stock, 0) AS balance,
+                       COALESCE((
+                           SELECT b.quantity FROM stock_checkpoint_balances b
+                           WHERE b.product_id = p.id ORDER BY b.checkpoint_id DESC LIMIT 1
+                       ), 0) + COALESCE(m.change, 0) AS ledger
+                FROM products p
+                LEFT JOIN (
+                    SELECT product_id, SUM(change) AS change FROM inventory_logs
+                    WHERE id > ? GROUP BY product_id
+                ) m ON m.product_id = p.id
+            ) WHERE balance != ledger
+        """, (checkpoint[2] if checkpoint else 0,)).fetchall()
+
+        if fix and mismatches:
+            conn.executemany(
+                "UPDATE products SET quantity_in_stock=? WHERE id=?",
+                [(ledger, product_id) for product_id, _, _, ledger in mismatches]
+            )
+            db_manager.write_log(conn, username, "Reconciled", f"{len(mismatches)} product balance(s)")
+    return mismatches
+
+
+# ⏰ Daily checkpoint + reconciliation
+
+def run_if_due(now=None):
+    """Take a checkpoint and reconcile if the last run was more than RUN_INTERVAL ago."""
+    now = now or datetime.now(timezone.utc)
+    last_run = db_manager.get_setting("stock_checkpoint_last_run")
+    if last_run:
+        last_run = datetime.strptime(last_run, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
+        if (now - last_run).total_seconds() < RUN_INTERVAL:
+            return None
+
+    take_checkpoint()
+    mismatches = reconcile()
+    for product_id, name, balance, ledger in mismatches:
+        print(f"⚠️ Stock of {name} (#{product_id}) is {balance}, but its ledger adds up to {ledger}")
+    db_manager.set_setting("stock_checkpoint_last_run", now.strftime("%Y-%m-%d %H:%M:%S"))
+    return mismatches
+
+
+def _scheduler_loop(check_every):
+    while True:
+        try:
+            run_if_due()
+        except Exception as e:
+            print(f"⚠️ Stock checkpoint failed: {e}")
+        time.sleep(check_every)
+
+
+def start_scheduler(check_every=60 * 60):
+    """Check hourly on a daemon thread whether a checkpoint is due, and take it."""
+    thread = threading.Thread(
+        target=_scheduler_loop, args=(check_every,), name="stock-checkpoint", daemon=True
+    )
+    thread.start()
+    return thread
@@ -0,0 +1,323 @@
+"""Retention for the `logs` and `inventory_logs` tables.
+
+Rows past the retention limits (older than `log_retention_days`, or beyond
+the newest `log_max_rows` of a table) are moved out of database.db into one
+archive database per month, `db/archive/logs-YYYY-MM.db`, which is ATTACHed
+to copy rows in and to read them back. Freed pages are then returned to the
+file system a few at a time with `PRAGMA incremental_vacuum`.
+
+Stock ledger rows are only archived once a stock checkpoint covers them
+(see inventory_ledger), so past stock levels stay computable.
+
+Archiving always moves the oldest rows by (timestamp, id), so every archived
+row sorts below every live one and the months don't overlap. Reading the
+logs newest-first is therefore the live table followed by the archives from
+newest to oldest; fetch_logs_page walks them in that order.
+
+    log_archive.run_retention()              # archive whatever is due now
+    log_archive.start_scheduler()            # ... and keep doing it daily
+"""
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models import db_manager
+
+# Defaults for the settings table keys of the same name
+DEFAULT_RETENTION_DAYS = 365
+DEFAULT_MAX_ROWS = 1000000
+
+RUN_INTERVAL = 24 * 60 * 60  # seconds between scheduled runs
+CHUNK_ROWS = 50000           # rows moved per transaction, so the write lock is held briefly
+VACUUM_STEP_PAGES = 2000     # pages freed per incremental_vacuum call
+
+ARCHIVE_ALIAS = "log_archive"
+ARCHIVE_PATTERN = re.compile(r"^logs-(\d{4}-\d{2})\.db$")
+
+# table → (columns, indexes) of the archived copy; ids are kept as they were
+ARCHIVED_TABLES = {
+    "logs": (
+        "id, timestamp, username, action, product_name",
+        ["timestamp", "username, timestamp", "action, timestamp"],
+    ),
+    "inventory_logs": (
+        "id, product_id, change, reason, timestamp",
+        ["timestamp", "product_id"],
+    ),
+}
+
+ARCHIVE_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS {alias}.logs (
+        id INTEGER PRIMARY KEY,
+        timestamp DATETIME,
+        username TEXT NOT NULL,
+        action TEXT NOT NULL,
+        product_name TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS {alias}.inventory_logs (
+        id INTEGER PRIMARY KEY,
+        product_id INTEGER,
+        change INTEGER,
+        reason TEXT,
+        timestamp TIMESTAMP
+    )
+    """,
+]
+
+
+def archive_dir():
+    return os.path.join(os.path.dirname(os.path.abspath(db_manager.DB_PATH)), "archive")
+
+
+def archive_path(month):
+    return os.path.join(archive_dir(), f"logs-{month}.db")
+
+
+def list_archives():
+    """Months ("YYYY-MM") that have an archive file, newest first."""
+    if not os.path.isdir(archive_dir()):
+        return []
+    months = [match.group(1) for match in map(ARCHIVE_PATTERN.match, os.listdir(archive_dir())) if match]
+    return sorted(months, reverse=True)
+
+
+def _month_bounds(month):
+    """("YYYY-MM-01", first day of the next month) for a "YYYY-MM" month."""
+    year, number = map(int, month.split("-"))
+    year, number = (year + 1, 1) if number == 12 else (year, number + 1)
+    return f"{month}-01", f"{year:04d}-{number:02d}-01"
+
+
+@contextmanager
+def attached(conn, month, create=False):
+    """ATTACH a month's archive to `conn` as `log_archive` for the duration of the block.
+
+    Must be used outside a transaction. With `create`, the archive file and
+    its tables are created if missing.
+    """
+    if create:
+        os.makedirs(archive_dir(), exist_ok=True)
+    conn.execute(f"ATTACH DATABASE ? AS {ARCHIVE_ALIAS}", (archive_path(month),))
+    try:
+        if create:
+            for statement in ARCHIVE_SCHEMA:
+                conn.execute(statement.format(alias=ARCHIVE_ALIAS))
+            for table, (_, indexes) in ARCHIVED_TABLES.items():
+                for columns in indexes:
+                    name = f"idx_{table}_{columns.replace(', ', '_')}"
+                    conn.execute(f"CREATE INDEX IF NOT EXISTS {ARCHIVE_ALIAS}.{name} ON {table}({columns})")
+        yield conn
+    finally:
+        conn.execute(f"DETACH DATABASE {ARCHIVE_ALIAS}")
+
+
+# 📜 Reading live and archived logs as one
+
+def fetch_logs_page(after=None, limit=200, **filters):
+    """Like db_manager.fetch_logs_page, but carries on into the archives once the live rows run out."""
+    rows, after = db_manager.fetch_logs_page(after, limit, **filters)
+    if len(rows) == limit:
+        return rows, after
+
+    date_from = filters.get("date_from")
+    date_to = filters.get("date_to")
+    for month in list_archives():
+        month_start, next_month = _month_bounds(month)
+        if after is not None and month_start > after[0]:
+            continue  # everything in it was on earlier pages
+        if (date_to and month_start > date_to) or (date_from and next_month <= date_from):
+            continue
+
+        with db_manager.connection() as conn, attached(conn, month):
+            page, after = db_manager.fetch_logs_page(
+                after, limit - len(rows), table=f"{ARCHIVE_ALIAS}.logs", **filters
+            )
+        rows.extend(page)
+        if len(rows) == limit:
+            break
+    return rows, after
+
+
+def get_distinct_log_values(column):
+    """Every distinct value of a logs column across live and archived logs, sorted."""
+    values = set(db_manager.get_distinct_log_values(column))
+    for month in list_archives():
+        with db_manager.connection() as conn, attached(conn, month):
+            values.update(db_manager.get_distinct_log_values(column, f"{ARCHIVE_ALIAS}.logs"))
+    return sorted(values)
+
+
+# 🗄️ Moving old rows out
+
+def retention_limits():
+    """(days, max rows) from the settings table, or the defaults."""
+    days = int(db_manager.get_setting("log_retention_days", DEFAULT_RETENTION_DAYS))
+    max_rows = int(db_manager.get_setting("log_max_rows", DEFAULT_MAX_ROWS))
+    return days, max_rows
+
+
+def _cutoff(conn, table, days, max_rows, now):
+    """(timestamp, id) key below which rows of `table` are due for archiving, or None."""
+    oldest_kept = (now - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+    cutoff = (oldest_kept, 0)
+
+    count = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    if count > max_rows:
+        first_kept = conn.execute(f"""
+            SELECT timestamp, id FROM {table} ORDER BY timestamp, id LIMIT 1 OFFSET ?
+        """, (count - max_rows,)).fetchone()
+        cutoff = max(cutoff, tuple(first_kept))
+
+    if table == "inventory_logs":
+        # Only ledger rows a stock checkpoint already covers may leave, so
+        # past stock can still be worked out from the checkpoint
+        checkpoint = conn.execute("SELECT MAX(ledger_id) FROM stock_checkpoints").fetchone()[0] or 0
+        first_uncovered = conn.execute(
+            "SELECT timestamp, id FROM inventory_logs WHERE id > ? ORDER BY id LIMIT 1", (checkpoint,)
+        ).fetchone()
+        if first_uncovered is not None:
+            cutoff = min(cutoff, tuple(first_uncovered))
+
+    due = conn.execute(f"""
+        SELECT timestamp, id FROM {table} WHERE (timestamp, id) < (?, ?)
+        ORDER BY timestamp, id LIMIT 1
+    """, cutoff).fetchone()
+    return cutoff if due else None
+
+
+def _archive_table(conn, table, cutoff):
+    """Move the rows of `table` below `cutoff` into their monthly archives. Returns how many."""
+    columns, _ = ARCHIVED_TABLES[table]
+    moved = 0
+    while True:
+        oldest = conn.execute(f"""
+            SELECT timestamp FROM {table} WHERE (timestamp, id) < (?, ?)
+            ORDER BY timestamp, id LIMIT 1
+        """, cutoff).fetchone()
+        if oldest is None:
+            return moved
+
+        month = oldest[0][:7]
+        upper = min(cutoff, (_month_bounds(month)[1], 0))
+        chunk_end = conn.execute(f"""
+            SELECT timestamp, id FROM {table} ORDER BY timestamp, id LIMIT 1 OFFSET ?
+        """, (CHUNK_ROWS,)).fetchone()
+        if chunk_end is not None:
+            upper = min(upper, tuple(chunk_end))
+
+        # The main database is in WAL mode, so a transaction spanning it and
+        # the archive isn't atomic across both. Copy (committed on its own)
+        # first, then delete: if we stop in between, the next run re-copies
+        # (ignored as duplicates) and deletes. Rows are never lost, at worst
+        # briefly in both.
+        with attached(conn, month, create=True):
+            conn.execute(f"""
+                INSERT OR IGNORE INTO {ARCHIVE_ALIAS}.{table} ({columns})
+                SELECT {columns} FROM main.{table} WHERE (timestamp, id) < (?, ?)
+            """, upper)
+            moved += conn.execute(
+                f"DELETE FROM main.{table} WHERE (timestamp, id) < (?, ?)", upper
+            ).rowcount
+
+
+def incremental_vacuum(conn, max_pages=None, convert=False):
+    """Return free pages to the file system in small steps. Returns how many were freed.
+
+    Databases created before auto_vacuum was turned on need one full VACUUM to
+    switch it on. That holds the write lock for as long as it takes, so it is
+    only done when `convert` is set (`utils/archive_logs.py
+    --enable-incremental-vacuum`); otherwise this warns and frees nothing.
+    """
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        if not convert:
+            print("⚠️ Incremental vacuum is off for this database; run "
+                  "`python utils/archive_logs.py --enable-incremental-vacuum` to switch it on.")
+            return 0
+        print("🧹 Enabling incremental vacuum (one-off full VACUUM)…")
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+        return 0
+
+    freed = 0
+    while max_pages is None or freed < max_pages:
+        free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if not free:
+            break
+        step = min(free, VACUUM_STEP_PAGES)
+        conn.execute(f"PRAGMA incremental_vacuum({step})").fetchall()
+        freed += step
+        time.sleep(0)  # let other threads at the database between steps
+    return freed
+
+
+def run_retention(days=None, max_rows=None, now=None, convert_vacuum=False):
+    """Archive every row past the retention limits, then vacuum.
+
+    `days` and `max_rows` default to the configured limits. `convert_vacuum`
+    allows the one-off full VACUUM, see `incremental_vacuum`. Returns
+    {table: rows archived}.
+    """
+    configured_days, configured_max_rows = retention_limits()
+    days = configured_days if days is None else days
+    max_rows = configured_max_rows if max_rows is None else max_rows
+    now = now or datetime.now(timezone.utc)
+
+    # Queued audit rows go in first, so none land behind the cutoff afterwards
+    db_manager.flush_logs(timeout=5)
+    # ... and the stock ledger is checkpointed, so its old rows may go
+    from models import inventory_ledger  # imports this module
+    inventory_ledger.take_checkpoint()
+
+    archived = {}
+    conn = db_manager.open_connection()
+    conn.isolation_level = None  # autocommit: each statement is its own short transaction
+    try:
+        for table in ARCHIVED_TABLES:
+            cutoff = _cutoff(conn, table, days, max_rows, now)
+            archived[table] = _archive_table(conn, table, cutoff) if cutoff else 0
+            if archived[table]:
+                print(f"🗄️ Archived {archived[table]} row(s) from {table}")
+        incremental_vacuum(conn, convert=convert_vacuum)
+    finally:
+        conn.close()
+
+    db_manager.set_setting("log_retention_last_run", now.strftime("%Y-%m-%d %H:%M:%S"))
+    return archived
+
+
+def run_if_due(now=None):
+    """Run retention if the last run was more than RUN_INTERVAL ago."""
+    now = now or datetime.now(timezone.utc)
+    last_run = db_manager.get_setting("log_retention_last_run")
+    if last_run:
+        last_run = datetime.strptime(last_run, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
+        if (now - last_run).total_seconds() < RUN_INTERVAL:
+            return None
+    return run_retention(now=now)
+
+
+def _scheduler_loop(check_every):
+    while True:
+        try:
+            run_if_due()
+        except Exception as e:
+            print(f"⚠️ Log retention failed: {e}")
+        time.sleep(check_every)
+
+
+def start_scheduler(check_every=60 * 60):
+    """Check hourly on a daemon thread whether retention is due, and run it."""
+    thread = threading.Thread(
+        target=_scheduler_loop, args=(check_every,), name="log-retention", daemon=True
+    )
+    thread.start()
+    return thread
@@ -0,0 +1,120 @@
+"""Background writer that batches audit log rows into group commits.
+
+Callers hand rows to `submit()` and return immediately; a single writer thread
+drains the queue and writes everything waiting in one transaction, so a burst
+of edits costs one commit instead of one per action.
+"""
+import queue
+import threading
+import time
+
+_STOP = object()
+
+
+class LogWriter:
+    """Queue plus writer thread around a `write_batch(rows)` function.
+
+    Backpressure: the queue holds at most `max_pending` rows. When it is full,
+    `submit()` waits up to `put_timeout` seconds for room and then writes the
+    row itself, synchronously — audit rows are never dropped, the caller just
+    slows down to the speed of the database.
+
+    Failures: a batch that can't be written (e.g. the database is locked for
+    longer than the busy timeout) is retried after each of `retry_delays`,
+    then kept and written ahead of the next batch, every `retry_every`
+    seconds until it goes through. `flush()` doesn't report success while
+    rows are held back. Only rows still failing when the process exits are
+    lost, and that is reported.
+    """
+
+    def __init__(self, write_batch, max_pending=10000, batch_size=500, put_timeout=0.5,
+                 retry_delays=(0.1, 0.5, 2.0), retry_every=5.0):
+        self.write_batch = write_batch
+        self.batch_size = batch_size
+        self.put_timeout = put_timeout
+        self.retry_delays = retry_delays
+        self.retry_every = retry_every
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.thread = None
+        self.lock = threading.Lock()
+        self.failed_rows = []  # written ahead of the next batch; guarded by self.lock
+
+    def start(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name="log-writer", daemon=True)
+                self.thread.start()
+
+    def submit(self, row):
+        """Queue one row for writing (starts the writer thread on first use)."""
+        self.start()
+        try:
+            self.queue.put(row, timeout=self.put_timeout)
+        except queue.Full:
+            if not self.write([row]):
+                with self.lock:
+                    self.failed_rows.append(row)
+
+    def flush(self, timeout=None):
+        """Block until every row submitted before this call has been written."""
+        if self.thread is None or not self.thread.is_alive():
+            return True
+        done = threading.Event()
+        self.queue.put(done)
+        return done.wait(timeout)
+
+    def stop(self, timeout=5):
+        """Write whatever is queued, then stop the writer thread."""
+        if self.thread is None or not self.thread.is_alive():
+            return
+        self.queue.put(_STOP)
+        self.thread.join(timeout)
+
+    def run(self):
+        flushes = []  # flush() calls waiting for held-back rows
+        while True:
+            with self.lock:
+                held_back = bool(self.failed_rows)
+            try:
+                # With rows held back, wake up now and then to retry them
+                batch = [self.queue.get(timeout=self.retry_every if held_back else None)]
+            except queue.Empty:
+                batch = []
+            # Take whatever else is already waiting, up to one batch
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            with self.lock:
+                rows, self.failed_rows = self.failed_rows, []
+            rows += [item for item in batch if isinstance(item, tuple)]
+            if rows and not self.write(rows):
+                with self.lock:
+                    self.failed_rows[:0] = rows
+
+            flushes += [item for item in batch if isinstance(item, threading.Event)]
+            with self.lock:
+                held_back = bool(self.failed_rows)
+            stopping = any(item is _STOP for item in batch)
+            if not held_back:
+                for done in flushes:
+                    done.set()
+                flushes = []
+            elif stopping:
+                print(f"⚠️ {len(self.failed_rows)} logged action(s) could not be written and are lost")
+            if stopping:
+                return
+
+    def write(self, row_batch):
+        """Write rows, retrying after each of `retry_delays`. Returns whether they were written."""
+        for delay in (0, *self.retry_delays):
+            time.sleep(delay)
+            try:
+                self.write_batch(row_batch)
+                return True
+            except Exception as e:
+                error = e
+        print(f"⚠️ Failed to log {len(row_batch)} action(s), will try again: {error}")
+        return False
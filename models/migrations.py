@@ -0,0 +1,381 @@
+"""Versioned schema migrations, tracked with `PRAGMA user_version`.
+
+`create_tables` creates the base tables; everything added after that lives
+here as a numbered step. To change the schema, append a new function to
+MIGRATIONS — never edit or reorder a step that has already shipped.
+"""
+
+
+def add_product_search_index(cursor):
+    """Create the products_fts full-text index and the triggers that keep it in sync.
+
+    products_fts is an external-content FTS5 table over products.name and
+    products.sku using the trigram tokenizer, so `MATCH` finds any substring
+    (like `LIKE '%...%'`) through the index. When the index is first added to an
+    existing database it is backfilled from the products table.
+    """
+    exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='products_fts'"
+    ).fetchone()
+
+    cursor.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+            name,
+            sku,
+            content='products',
+            content_rowid='id',
+            tokenize='trigram'
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS products_fts_insert AFTER INSERT ON products BEGIN
+            INSERT INTO products_fts(rowid, name, sku) VALUES (new.id, new.name, new.sku);
+        END
+    """)
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS products_fts_delete AFTER DELETE ON products BEGIN
+            INSERT INTO products_fts(products_fts, rowid, name, sku)
+            VALUES ('delete', old.id, old.name, old.sku);
+        END
+    """)
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS products_fts_update AFTER UPDATE OF name, sku ON products BEGIN
+            INSERT INTO products_fts(products_fts, rowid, name, sku)
+            VALUES ('delete', old.id, old.name, old.sku);
+            INSERT INTO products_fts(rowid, name, sku) VALUES (new.id, new.name, new.sku);
+        END
+    """)
+
+    if not exists:
+        cursor.execute("INSERT INTO products_fts(products_fts) VALUES ('rebuild')")
+
+
+def add_hot_query_indexes(cursor):
+    """Index the columns the app filters, joins and sorts on.
+
+    users.username needs nothing extra: its UNIQUE constraint already gives the
+    login lookup an index, and a (username, password) index would only repeat it.
+    """
+    # Category filter and the products → categories join
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_products_category_id ON products(category_id)")
+    # SKU lookups
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_products_sku ON products(sku)")
+    # View Logs sorts by timestamp
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_logs_timestamp ON logs(timestamp)")
+    # Stock history per product
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_inventory_logs_product_id ON inventory_logs(product_id)")
+    cursor.execute("ANALYZE")
+
+
+def add_log_filter_indexes(cursor):
+    """Index the View Logs filters together with the sort key.
+
+    The log viewer pages newest-first on (timestamp, id); with the filter
+    column in front of timestamp, a user or action filter reads just its own
+    rows, already in page order. id rides along as the rowid.
+    """
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_logs_username_timestamp ON logs(username, timestamp)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_logs_action_timestamp ON logs(action, timestamp)")
+    cursor.execute("ANALYZE")
+
+
+def add_settings_and_log_retention(cursor):
+    """Add the key/value settings table and the index log retention archives by.
+
+    Retention moves the oldest inventory_logs rows out in (timestamp, id)
+    order, the same way it does for logs (already indexed on timestamp).
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS settings (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_inventory_logs_timestamp ON inventory_logs(timestamp)")
+
+
+DEFAULT_LOW_STOCK_THRESHOLD = 5
+
+
+def _threshold_of(row):
+    """SQL for a product's low-stock threshold: its own, else its category's, else the default."""
+    return f"""COALESCE(
+        {row}.low_stock_threshold,
+        (SELECT low_stock_threshold FROM categories WHERE id = {row}.category_id),
+        (SELECT CAST(value AS INTEGER) FROM settings WHERE key = 'low_stock_threshold'),
+        {DEFAULT_LOW_STOCK_THRESHOLD}
+    )"""
+
+
+# Recomputes category_stock and low_stock from scratch (backfill and reconciliation)
+STOCK_SUMMARY_REBUILD = [
+    "DELETE FROM category_stock",
+    """
+    INSERT INTO category_stock (category_id, product_count, total_quantity, stock_value)
+    SELECT COALESCE(category_id, 0), COUNT(*),
+           TOTAL(quantity_in_stock), TOTAL(COALESCE(price, 0) * COALESCE(quantity_in_stock, 0))
+    FROM products GROUP BY COALESCE(category_id, 0)
+    """,
+    "DELETE FROM low_stock",
+    f"""
+    INSERT INTO low_stock (product_id, quantity, threshold)
+    SELECT id, quantity, threshold FROM (
+        SELECT p.id, COALESCE(p.quantity_in_stock, 0) AS quantity, {_threshold_of("p")} AS threshold
+        FROM products p
+    ) WHERE quantity < threshold
+    """,
+]
+
+
+def add_stock_summary(cursor):
+    """Keep per-category stock totals and the set of low-stock products up to date with triggers.
+
+    category_stock has one row per category (0 for uncategorized) with its
+    product count, units in stock and stock value (price × quantity);
+    low_stock holds every product whose quantity is below its threshold. The
+    dashboard reads both without touching products. Thresholds can be set
+    per product and per category; the default lives in settings.
+    """
+    cursor.execute("ALTER TABLE products ADD COLUMN low_stock_threshold INTEGER")
+    cursor.execute("ALTER TABLE categories ADD COLUMN low_stock_threshold INTEGER")
+    cursor.execute(
+        "INSERT OR IGNORE INTO settings (key, value) VALUES ('low_stock_threshold', ?)",
+        (str(DEFAULT_LOW_STOCK_THRESHOLD),)
+    )
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS category_stock (
+            category_id INTEGER PRIMARY KEY,
+            product_count INTEGER NOT NULL DEFAULT 0,
+            total_quantity INTEGER NOT NULL DEFAULT 0,
+            stock_value REAL NOT NULL DEFAULT 0
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS low_stock (
+            product_id INTEGER PRIMARY KEY,
+            quantity INTEGER NOT NULL,
+            threshold INTEGER NOT NULL
+        )
+    """)
+
+    add_new = f"""
+        INSERT INTO category_stock (category_id, product_count, total_quantity, stock_value)
+        VALUES (
+            COALESCE(new.category_id, 0), 1, COALESCE(new.quantity_in_stock, 0),
+            COALESCE(new.price, 0) * COALESCE(new.quantity_in_stock, 0)
+        )
+        ON CONFLICT(category_id) DO UPDATE SET
+            product_count = product_count + 1,
+            total_quantity = total_quantity + excluded.total_quantity,
+            stock_value = stock_value + excluded.stock_value;
+        INSERT INTO low_stock (product_id, quantity, threshold)
+        SELECT new.id, COALESCE(new.quantity_in_stock, 0), threshold
+        FROM (SELECT {_threshold_of("new")} AS threshold)
+        WHERE COALESCE(new.quantity_in_stock, 0) < threshold;
+    """
+    remove_old = """
+        UPDATE category_stock SET
+            product_count = product_count - 1,
+            total_quantity = total_quantity - COALESCE(old.quantity_in_stock, 0),
+            stock_value = stock_value - COALESCE(old.price, 0) * COALESCE(old.quantity_in_stock, 0)
+        WHERE category_id = COALESCE(old.category_id, 0);
+        DELETE FROM low_stock WHERE product_id = old.id;
+    """
+    cursor.execute(f"CREATE TRIGGER IF NOT EXISTS products_stock_insert AFTER INSERT ON products BEGIN {add_new} END")
+    cursor.execute(f"CREATE TRIGGER IF NOT EXISTS products_stock_delete AFTER DELETE ON products BEGIN {remove_old} END")
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS products_stock_update
+        AFTER UPDATE OF category_id, price, quantity_in_stock, low_stock_threshold ON products
+        BEGIN {remove_old} {add_new} END
+    """)
+
+    # A category's or the default threshold changing re-evaluates the products it applies to
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS categories_low_stock_update
+        AFTER UPDATE OF low_stock_threshold ON categories
+        BEGIN
+            DELETE FROM low_stock WHERE product_id IN (SELECT id FROM products WHERE category_id = new.id);
+            {STOCK_SUMMARY_REBUILD[3].strip().replace("FROM products p", "FROM products p WHERE p.category_id = new.id")};
+        END
+    """)
+    for event in ("INSERT", "UPDATE"):
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS settings_low_stock_{event.lower()}
+            AFTER {event} ON settings WHEN new.key = 'low_stock_threshold'
+            BEGIN
+                {STOCK_SUMMARY_REBUILD[2]};
+                {STOCK_SUMMARY_REBUILD[3].strip()};
+            END
+        """)
+
+    for statement in STOCK_SUMMARY_REBUILD:
+        cursor.execute(statement)
+
+
+def add_stock_checkpoints(cursor):
+    """Checkpoints of the stock ledger, so past stock levels don't need the whole history.
+
+    inventory_logs is the ledger of stock movements and
+    products.quantity_in_stock the balance it adds up to. A checkpoint
+    records, as of one ledger row (ledger_id), the balance of every product
+    that moved since the previous checkpoint; a product's balance at a
+    checkpoint is its newest row at or before it. The first checkpoint takes
+    the current balances as the opening stock.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS stock_checkpoints (
+            id INTEGER PRIMARY KEY,
+            taken_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            ledger_id INTEGER NOT NULL
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS stock_checkpoint_balances (
+            product_id INTEGER NOT NULL,
+            checkpoint_id INTEGER NOT NULL,
+            quantity INTEGER NOT NULL,
+            PRIMARY KEY (product_id, checkpoint_id)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_stock_checkpoints_taken_at ON stock_checkpoints(taken_at)")
+
+    checkpoint_id = cursor.execute("""
+        INSERT INTO stock_checkpoints (ledger_id) SELECT COALESCE(MAX(id), 0) FROM inventory_logs
+    """).lastrowid
+    cursor.execute("""
+        INSERT INTO stock_checkpoint_balances (product_id, checkpoint_id, quantity)
+        SELECT id, ?, quantity_in_stock FROM products WHERE COALESCE(quantity_in_stock, 0) != 0
+    """, (checkpoint_id,))
+
+
+def hash_user_passwords(cursor):
+    """Replace every plaintext users.password with a salted hash (see models/passwords.py).
+
+    The hashes are derived on a thread pool, since each one is deliberately
+    slow, and written back in one batch.
+    """
+    from models import passwords
+
+    rows = [row for row in cursor.execute("SELECT id, password FROM users").fetchall()
+            if not passwords.is_hashed(row[1])]
+    hashes = passwords.hash_many(password for _, password in rows)
+    cursor.executemany(
+        "UPDATE users SET password = ? WHERE id = ?",
+        ((encoded, user_id) for (user_id, _), encoded in zip(rows, hashes))
+    )
+
+
+def add_category_tree(cursor):
+    """Nest categories: a parent per category plus a closure table of every ancestor.
+
+    category_tree has one row per (ancestor, descendant) pair, including each
+    category with itself at depth 0, so "everything under Electronics" is a
+    primary key range (`ancestor_id = ?`) instead of a recursive walk, and a
+    category's path is an index lookup on `descendant_id`. Triggers keep it
+    in step when categories are added, moved (re-parented) or deleted, and
+    refuse to move a category under itself. Names stay unique across the
+    whole tree.
+    """
+    cursor.execute("ALTER TABLE categories ADD COLUMN parent_id INTEGER REFERENCES categories(id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_categories_parent_id ON categories(parent_id, name)")
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS category_tree (
+            ancestor_id INTEGER NOT NULL,
+            descendant_id INTEGER NOT NULL,
+            depth INTEGER NOT NULL,
+            PRIMARY KEY (ancestor_id, descendant_id)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_category_tree_descendant ON category_tree(descendant_id, depth)")
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS categories_tree_insert AFTER INSERT ON categories
+        BEGIN
+            INSERT INTO category_tree (ancestor_id, descendant_id, depth)
+            SELECT ancestor_id, new.id, depth + 1 FROM category_tree WHERE descendant_id = new.parent_id
+            UNION ALL
+            SELECT new.id, new.id, 0;
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS categories_tree_no_cycle
+        BEFORE UPDATE OF parent_id ON categories
+        WHEN new.parent_id IN (SELECT descendant_id FROM category_tree WHERE ancestor_id = new.id)
+        BEGIN
+            SELECT RAISE(ABORT, 'A category cannot be moved under itself or one of its subcategories');
+        END
+    """)
+    # Moving a subtree: unlink it from its old ancestors, then link it under every ancestor of the new parent
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS categories_tree_move
+        AFTER UPDATE OF parent_id ON categories WHEN old.parent_id IS NOT new.parent_id
+        BEGIN
+            DELETE FROM category_tree
+            WHERE descendant_id IN (SELECT descendant_id FROM category_tree WHERE ancestor_id = new.id)
+              AND ancestor_id IN (SELECT ancestor_id FROM category_tree
+                                  WHERE descendant_id = new.id AND ancestor_id != new.id);
+            INSERT INTO category_tree (ancestor_id, descendant_id, depth)
+            SELECT above.ancestor_id, below.descendant_id, above.depth + below.depth + 1
+            FROM category_tree above, category_tree below
+            WHERE above.descendant_id = new.parent_id AND below.ancestor_id = new.id;
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS categories_tree_delete AFTER DELETE ON categories
+        BEGIN
+            DELETE FROM category_tree WHERE descendant_id = old.id;
+        END
+    """)
+
+    cursor.execute("INSERT OR IGNORE INTO category_tree (ancestor_id, descendant_id, depth) SELECT id, id, 0 FROM categories")
+
+
+# (version, description, function) — versions must stay in increasing order
+MIGRATIONS = [
+    (1, "Full-text search index for products", add_product_search_index),
+    (2, "Indexes for hot queries", add_hot_query_indexes),
+    (3, "Indexes for the log viewer filters", add_log_filter_indexes),
+    (4, "Settings table and log retention index", add_settings_and_log_retention),
+    (5, "Stock summary and low-stock set", add_stock_summary),
+    (6, "Stock ledger checkpoints", add_stock_checkpoints),
+    (7, "Hashed passwords", hash_user_passwords),
+    (8, "Category hierarchy", add_category_tree),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn):
+    """Apply every migration newer than the database's user_version.
+
+    Each step runs in its own transaction together with the version bump, so a
+    failed step leaves the database at the last good version. Returns the
+    version the database ends up at.
+    """
+    current = get_version(conn)
+
+    for version, description, step in MIGRATIONS:
+        if version <= current:
+            continue
+
+        cursor = conn.cursor()
+        cursor.execute("BEGIN")
+        try:
+            step(cursor)
+            cursor.execute(f"PRAGMA user_version = {version}")
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+        print(f"🔧 Migration {version} applied: {description}")
+        current = version
+
+    return current
@@ -0,0 +1,152 @@
+"""Password hashing for the users table: salted scrypt (or PBKDF2), parameters stored per row.
+
+`users.password` holds an encoded hash, never the password itself:
+
+    scrypt$<n>$<r>$<p>$<salt>$<key>              (salt and key base64)
+    pbkdf2_sha256$<iterations>$<salt>$<key>      (if hashlib has no scrypt)
+
+Because every row carries its own parameters, the cost can be raised
+without invalidating anyone's password: old rows still verify, and
+`needs_rehash()` tells the login to store a fresh hash at the new cost.
+
+Deriving a key is deliberately slow (~0.1 s), so successful verifications
+are remembered for the life of the process. The cache holds an HMAC of
+(stored hash, password) under a random per-process key — never the
+password — and a password change gives the row a new salt, which makes its
+old entries unreachable.
+"""
+import base64
+import hashlib
+import hmac
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+SCRYPT = "scrypt"
+PBKDF2 = "pbkdf2_sha256"
+
+# Current cost; rows hashed with less are rehashed on their next login
+SCRYPT_PARAMS = {"n": 2 ** 15, "r": 8, "p": 1}  # 32 MiB, ~0.1 s
+PBKDF2_ITERATIONS = 600_000
+DEFAULT_SCHEME = SCRYPT if hasattr(hashlib, "scrypt") else PBKDF2
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+CACHE_SIZE = 1024
+_session_key = os.urandom(32)
+_verified = OrderedDict()
+_verified_lock = threading.Lock()
+
+
+def _b64(data):
+    return base64.b64encode(data).decode("ascii")
+
+
+def _derive(password, scheme, params, salt):
+    secret = password.encode("utf-8")
+    if scheme == SCRYPT:
+        n, r, p = params["n"], params["r"], params["p"]
+        return hashlib.scrypt(secret, salt=salt, n=n, r=r, p=p, maxmem=128 * n * r * (p + 1) + 2 ** 20,
+                              dklen=KEY_BYTES)
+    if scheme == PBKDF2:
+        return hashlib.pbkdf2_hmac("sha256", secret, salt, params["iterations"], dklen=KEY_BYTES)
+    raise ValueError(f"Unknown password hash scheme {scheme!r}.")
+
+
+def current_params(scheme=DEFAULT_SCHEME):
+    return dict(SCRYPT_PARAMS) if scheme == SCRYPT else {"iterations": PBKDF2_ITERATIONS}
+
+
+def hash_password(password, scheme=DEFAULT_SCHEME, **params):
+    """Encode `password` with a fresh salt (at the current cost unless `params` say otherwise)."""
+    params = {**current_params(scheme), **params}
+    salt = os.urandom(SALT_BYTES)
+    key = _derive(password, scheme, params, salt)
+    if scheme == SCRYPT:
+        return f"{SCRYPT}${params['n']}${params['r']}${params['p']}${_b64(salt)}${_b64(key)}"
+    return f"{PBKDF2}${params['iterations']}${_b64(salt)}${_b64(key)}"
+
+
+def hash_many(passwords, workers=None):
+    """hash_password() for each password, on a thread pool (hashlib releases the GIL)."""
+    passwords = list(passwords)
+    if len(passwords) < 2:
+        return [hash_password(password) for password in passwords]
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        return list(pool.map(hash_password, passwords))
+
+
+def parse(encoded):
+    """(scheme, params, salt, key) of an encoded hash, or None if `encoded` isn't one."""
+    parts = (encoded or "").split("$")
+    try:
+        if parts[0] == SCRYPT and len(parts) == 6:
+            params = {"n": int(parts[1]), "r": int(parts[2]), "p": int(parts[3])}
+            return SCRYPT, params, base64.b64decode(parts[4]), base64.b64decode(parts[5])
+        if parts[0] == PBKDF2 and len(parts) == 4:
+            return PBKDF2, {"iterations": int(parts[1])}, base64.b64decode(parts[2]), base64.b64decode(parts[3])
+    except ValueError:
+        pass
+    return None
+
+
+def is_hashed(value):
+    return parse(value) is not None
+
+
+def needs_rehash(encoded):
+    """Whether `encoded` uses another scheme or a lower cost than the current one."""
+    parsed = parse(encoded)
+    if parsed is None:
+        return True
+    scheme, params, _, _ = parsed
+    if scheme != DEFAULT_SCHEME:
+        return True
+    return any(params[name] < value for name, value in current_params(scheme).items())
+
+
+def _cache_key(encoded, password):
+    return hmac.new(_session_key, f"{encoded}\0{password}".encode("utf-8"), hashlib.sha256).digest()
+
+
+def verify_password(password, encoded):
+    """Whether `password` matches the encoded hash; compared in constant time."""
+    parsed = parse(encoded)
+    if parsed is None or password is None:
+        return False
+
+    cache_key = _cache_key(encoded, password)
+    with _verified_lock:
+        if cache_key in _verified:
+            _verified.move_to_end(cache_key)
+            return True
+
+    scheme, params, salt, key = parsed
+    if not hmac.compare_digest(_derive(password, scheme, params, salt), key):
+        return False
+    with _verified_lock:
+        _verified[cache_key] = True
+        if len(_verified) > CACHE_SIZE:
+            _verified.popitem(last=False)
+    return True
+
+
+# Checked against when the username doesn't exist, so an unknown user takes
+# as long as a wrong password and logins don't reveal which usernames exist
+_dummy_hash = None
+
+
+def verify_missing_user(password):
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash = hash_password(password or "")  # one derivation, like a real check
+        return
+    _, params, salt, _ = parse(_dummy_hash)
+    _derive(password or "", DEFAULT_SCHEME, params, salt)
+
+
+def clear_cache():
+    """Forget every remembered verification (e.g. to time a cold login)."""
+    with _verified_lock:
+        _verified.clear()
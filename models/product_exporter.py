@@ -0,0 +1,125 @@
+"""Streaming product export straight from a SQLite cursor.
+
+Rows are pulled with `fetchmany` and written as they arrive, so memory use
+stays flat however large the catalog is. The output format follows the file
+name: `.csv`, `.csv.gz`, or `.parquet` / `.arrow` (those two need pyarrow).
+
+    rows = export_products("products.csv.gz", search_text="laptop")
+"""
+import csv
+import gzip
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models import db_manager
+
+HEADERS = ["ID", "Name", "Category", "SKU", "Price", "Quantity"]
+FETCH_SIZE = 5000
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+def _arrow_schema(pa):
+    return pa.schema([
+        ("ID", pa.int64()),
+        ("Name", pa.string()),
+        ("Category", pa.string()),
+        ("SKU", pa.string()),
+        ("Price", pa.float64()),
+        ("Quantity", pa.int64()),
+    ])
+
+
+def _write_csv(path, batches, compress):
+    if compress:
+        file = gzip.open(path, mode='wt', newline='', encoding='utf-8', compresslevel=6)
+    else:
+        file = open(path, mode='w', newline='', encoding='utf-8')
+    with file:
+        writer = csv.writer(file)
+        writer.writerow(HEADERS)
+        for rows in batches:
+            writer.writerows(rows)
+
+
+def _write_arrow(path, batches, parquet):
+    try:
+        import pyarrow as pa
+        if parquet:
+            import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Parquet/Arrow export needs the pyarrow package (pip install pyarrow).")
+
+    schema = _arrow_schema(pa)
+    writer = pq.ParquetWriter(path, schema) if parquet else pa.ipc.new_file(path, schema)
+    try:
+        for rows in batches:
+            columns = zip(*rows)
+            batch = pa.record_batch(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                schema=schema,
+            )
+            if parquet:
+                writer.write_table(pa.Table.from_batches([batch]))
+            else:
+                writer.write_batch(batch)
+    finally:
+        writer.close()
+
+
+def export_products(path, search_text=None, category_id=None, progress=None, is_cancelled=None):
+    """Write every product matching the filter to `path`. Returns the row count.
+
+    `progress(rows_written, total_rows)` is called after every chunk and
+    `is_cancelled()` is checked before each one. The file is written under a
+    temporary name and only renamed into place when complete, so a cancelled
+    or failed export (ExportCancelled / other exceptions) leaves nothing behind.
+    """
+    lower = path.lower()
+    if lower.endswith(".parquet"):
+        write = lambda target, batches: _write_arrow(target, batches, parquet=True)
+    elif lower.endswith((".arrow", ".feather")):
+        write = lambda target, batches: _write_arrow(target, batches, parquet=False)
+    else:
+        write = lambda target, batches: _write_csv(target, batches, compress=lower.endswith(".gz"))
+
+    # A connection of its own: a long read must not tie up this thread's pooled
+    # one, and in WAL mode it doesn't block writers either
+    conn = db_manager.open_connection()
+    written = 0
+    try:
+        count_query, count_params = db_manager.build_products_count_query(search_text, category_id)
+        total = conn.execute(count_query, count_params).fetchone()[0]
+
+        query, params = db_manager.build_products_query(search_text, category_id)
+        cursor = conn.execute(query, params)
+
+        def batches():
+            nonlocal written
+            while True:
+                if is_cancelled and is_cancelled():
+                    raise ExportCancelled()
+                rows = cursor.fetchmany(FETCH_SIZE)
+                if not rows:
+                    return
+                yield rows
+                written += len(rows)
+                if progress:
+                    progress(written, total)
+
+        partial = path + ".part"
+        try:
+            write(partial, batches())
+            os.replace(partial, path)
+        except BaseException:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+    finally:
+        conn.close()
+
+    return written
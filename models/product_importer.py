@@ -0,0 +1,315 @@
+"""Streaming bulk import of products from CSV (or .xlsx) files.
+
+Rows are read in batches and upserted by SKU: existing products with that SKU
+are updated, new ones inserted. Each batch is one transaction with its stock
+changes and an audit row, so an interrupted import leaves only whole batches.
+
+    result = import_products("catalog.csv", "admin", progress=print)
+    print(result.inserted, result.updated, result.errors[:10])
+"""
+import csv
+import os
+import sys
+from contextlib import contextmanager
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models import category_cache, db_manager, events
+
+# Accepted header names (lower-cased) for each field; the export's headers work too
+COLUMN_ALIASES = {
+    "name": ("name", "product name", "product"),
+    "sku": ("sku",),
+    "category": ("category", "category name"),
+    "price": ("price", "unit price"),
+    "quantity": ("quantity", "quantity in stock", "quantity_in_stock", "qty", "stock"),
+}
+REQUIRED_COLUMNS = ("name", "sku")
+
+# Per-row triggers that keep products_fts in sync; FTS5 flushes its pending
+# index data at every statement savepoint, so firing these once per imported
+# row is ~20x slower than indexing a whole batch with one statement
+FTS_TRIGGERS = ("products_fts_insert", "products_fts_update")
+
+MAX_REPORTED_ERRORS = 1000
+SQL_VARIABLE_CHUNK = 500
+
+
+class ImportResult:
+    def __init__(self):
+        self.inserted = 0
+        self.updated = 0
+        self.error_count = 0
+        self.errors = []  # (line number, message), the first MAX_REPORTED_ERRORS of them
+        self.cancelled = False
+
+    def add_error(self, line_number, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line_number, message))
+
+
+def _read_csv(path):
+    """Yield (line number, cell values, fraction of the file read) for every row, header included."""
+    with open(path, newline='', encoding='utf-8-sig') as file:
+        reader = csv.reader(file)
+        size = os.path.getsize(path) or 1
+        for row in reader:
+            yield reader.line_num, row, file.buffer.tell() / size
+
+
+def _read_xlsx(path):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValueError("Importing .xlsx files needs the openpyxl package (pip install openpyxl).")
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    sheet = workbook.active
+    total = sheet.max_row or 1
+    try:
+        for line_number, row in enumerate(sheet.iter_rows(values_only=True), start=1):
+            values = ["" if value is None else str(value) for value in row]
+            yield line_number, values, line_number / total
+    finally:
+        workbook.close()
+
+
+def _map_columns(header):
+    positions = {}
+    normalized = [column.strip().lower() for column in header]
+    for field, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in normalized:
+                positions[field] = normalized.index(alias)
+                break
+
+    missing = [field for field in REQUIRED_COLUMNS if field not in positions]
+    if missing:
+        raise ValueError(f"Missing required column(s): {', '.join(missing)}")
+    return tuple(positions.get(field) for field in COLUMN_ALIASES)
+
+
+def _parse_row(values, positions):
+    """Turn raw cell values into (name, sku, category, price, quantity) or raise ValueError.
+
+    `positions` is the (name, sku, category, price, quantity) column index
+    tuple from _map_columns, with None for columns the file doesn't have.
+    """
+    if len(values) < len(positions):
+        values = values + [""] * (len(positions) - len(values))
+    name_at, sku_at, category_at, price_at, quantity_at = positions
+
+    name = values[name_at].strip()
+    sku = values[sku_at].strip()
+    if not name:
+        raise ValueError("name is empty")
+    if not sku:
+        raise ValueError("sku is empty")
+
+    price_text = values[price_at].strip() if price_at is not None else ""
+    try:
+        price = float(price_text) if price_text else 0.0
+    except ValueError:
+        raise ValueError(f"price {price_text!r} is not a number")
+    if price < 0:
+        raise ValueError("price is negative")
+
+    quantity_text = values[quantity_at].strip() if quantity_at is not None else ""
+    try:
+        quantity = int(quantity_text) if quantity_text.isdigit() else int(float(quantity_text or 0))
+    except ValueError:
+        raise ValueError(f"quantity {quantity_text!r} is not a number")
+    if quantity < 0:
+        raise ValueError("quantity is negative")
+
+    category = values[category_at].strip() if category_at is not None else ""
+    return name, sku, category, price, quantity
+
+
+@contextmanager
+def _fts_triggers_paused(conn):
+    """Drop the products_fts sync triggers for the rest of the current transaction.
+
+    They are recreated from their stored SQL before the transaction commits,
+    and the caller holds the write lock, so no other connection ever sees the
+    database without them. The caller must index the rows it touched itself.
+    """
+    placeholders = ", ".join("?" for _ in FTS_TRIGGERS)
+    saved = conn.execute(
+        f"SELECT name, sql FROM sqlite_master WHERE type='trigger' AND name IN ({placeholders})",
+        FTS_TRIGGERS
+    ).fetchall()
+    for name, _ in saved:
+        conn.execute(f"DROP TRIGGER {name}")
+    try:
+        yield
+    finally:
+        for _, sql in saved:
+            conn.execute(sql)
+
+
+class _CategoryMap:
+    """name → id for categories, from the shared cache; unknown names are created on first use."""
+
+    def __init__(self):
+        self.ids = category_cache.ids_by_name()
+        self.folded = {name.casefold(): cat_id for name, cat_id in self.ids.items()}
+        self.created = False
+
+    def resolve(self, conn, name):
+        if not name:
+            return None
+        cat_id = self.ids.get(name) or self.folded.get(name.casefold())
+        if cat_id is None:
+            cat_id = conn.execute("INSERT INTO categories (name) VALUES (?)", (name,)).lastrowid
+            self.ids[name] = cat_id
+            self.folded[name.casefold()] = cat_id
+            self.created = True
+        return cat_id
+
+
+def _existing_by_sku(conn, skus):
+    """sku → [(id, name, sku, quantity), ...] for the products that already exist."""
+    found = {}
+    skus = list(skus)
+    for start in range(0, len(skus), SQL_VARIABLE_CHUNK):
+        chunk = skus[start:start + SQL_VARIABLE_CHUNK]
+        placeholders = ", ".join("?" for _ in chunk)
+        for row in conn.execute(
+            f"SELECT id, name, sku, quantity_in_stock FROM products WHERE sku IN ({placeholders})", chunk
+        ):
+            found.setdefault(row[2], []).append(row)
+    return found
+
+
+def _write_batch(conn, categories, batch, username, source_name):
+    """Upsert one batch of parsed rows. Returns (inserted, updated)."""
+    # Last row wins when a SKU appears more than once in the batch
+    by_sku = {}
+    for name, sku, category, price, quantity in batch:
+        by_sku[sku] = (name, sku, categories.resolve(conn, category), price, quantity)
+
+    existing = _existing_by_sku(conn, by_sku)
+    inserts = []
+    updates = []
+    stock_changes = []
+    fts_changes = []
+
+    for sku, (name, _, category_id, price, quantity) in by_sku.items():
+        if sku not in existing:
+            inserts.append((name, category_id, sku, price, quantity))
+            continue
+        for product_id, old_name, old_sku, old_quantity in existing[sku]:
+            updates.append((name, category_id, price, quantity, product_id))
+            if quantity != (old_quantity or 0):
+                stock_changes.append((product_id, quantity - (old_quantity or 0), "Imported"))
+            if name != old_name:
+                fts_changes.append((product_id, old_name, old_sku, name, sku))
+
+    last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM products").fetchone()[0]
+
+    with _fts_triggers_paused(conn):
+        conn.executemany("""
+            UPDATE products SET name=?, category_id=?, price=?, quantity_in_stock=?
+            WHERE id=?
+        """, updates)
+        conn.executemany("""
+            INSERT INTO products (name, category_id, sku, price, quantity_in_stock)
+            VALUES (?, ?, ?, ?, ?)
+        """, inserts)
+
+        # Index what the paused triggers would have
+        conn.executemany("""
+            INSERT INTO products_fts (products_fts, rowid, name, sku) VALUES ('delete', ?, ?, ?)
+        """, [(product_id, old_name, old_sku) for product_id, old_name, old_sku, _, _ in fts_changes])
+        conn.executemany("""
+            INSERT INTO products_fts (rowid, name, sku) VALUES (?, ?, ?)
+        """, [(product_id, name, sku) for product_id, _, _, name, sku in fts_changes])
+        conn.execute("""
+            INSERT INTO products_fts (rowid, name, sku)
+            SELECT id, name, sku FROM products WHERE id > ?
+        """, (last_id,))
+
+    conn.execute("""
+        INSERT INTO inventory_logs (product_id, change, reason)
+        SELECT id, quantity_in_stock, 'Imported' FROM products
+        WHERE id > ? AND quantity_in_stock != 0
+    """, (last_id,))
+    conn.executemany(
+        "INSERT INTO inventory_logs (product_id, change, reason) VALUES (?, ?, ?)", stock_changes
+    )
+
+    db_manager.write_log(
+        conn, username, "Imported",
+        f"{len(inserts)} new / {len(updates)} updated from {source_name}"
+    )
+    return len(inserts), len(updates)
+
+
+def import_products(path, username, batch_size=10000, progress=None, is_cancelled=None):
+    """Import products from a .csv or .xlsx file and return an ImportResult.
+
+    `progress(rows_read, fraction_done)` is called after every batch.
+    `is_cancelled()` is checked between batches; batches already committed stay.
+    Raises ValueError if the file can't be read or lacks the required columns.
+    Publishes events.PRODUCTS_RELOADED once done if anything was written, and
+    events.CATEGORIES_CHANGED if new categories were created.
+    """
+    result = ImportResult()
+    categories = _CategoryMap()
+    try:
+        _import(path, username, batch_size, progress, is_cancelled, result, categories)
+    finally:
+        if categories.created:
+            events.publish(events.CATEGORIES_CHANGED)
+        if result.inserted or result.updated:
+            events.publish(events.PRODUCTS_RELOADED)
+    return result
+
+
+def _import(path, username, batch_size, progress, is_cancelled, result, categories):
+    reader = _read_xlsx(path) if path.lower().endswith(".xlsx") else _read_csv(path)
+    source_name = os.path.basename(path)
+
+    try:
+        _, header, _ = next(reader)
+    except StopIteration:
+        raise ValueError("The file is empty.")
+    positions = _map_columns(header)
+
+    batch = []
+    rows_read = 0
+    fraction = 0.0
+
+    def flush():
+        # BEGIN IMMEDIATE takes the write lock up front, so the id range read
+        # in _write_batch can't change under us
+        with db_manager.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            inserted, updated = _write_batch(conn, categories, batch, username, source_name)
+        result.inserted += inserted
+        result.updated += updated
+        batch.clear()
+        if progress:
+            progress(rows_read, fraction)
+
+    for line_number, values, fraction in reader:
+        if not any(values):
+            continue
+        rows_read += 1
+        try:
+            batch.append(_parse_row(values, positions))
+        except ValueError as e:
+            result.add_error(line_number, str(e))
+
+        if len(batch) >= batch_size:
+            flush()
+            if is_cancelled and is_cancelled():
+                result.cancelled = True
+                return
+
+    if batch:
+        flush()
+    elif progress:
+        progress(rows_read, 1.0)
@@ -0,0 +1,122 @@
+"""Product writes, each done together with its audit rows in one transaction.
+
+Every function here changes `products` and records the matching `logs` row
+(and stock ledger row when stock changes, see inventory_ledger) in a single
+commit, so the audit trail can't disagree with the data after a crash. After
+the commit, an events.PRODUCT_CHANGED notification is published.
+"""
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models import db_manager, events, inventory_ledger
+
+
+def add_product(username, name, category_id, sku, price, quantity, low_stock_threshold=None):
+    """Insert a product and log it. Returns the new product id.
+
+    `low_stock_threshold` of None uses the category's (or the default) threshold.
+    """
+    with db_manager.connection() as conn:
+        cursor = conn.execute("""
+            INSERT INTO products (name, category_id, sku, price, quantity_in_stock, low_stock_threshold)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (name, category_id, sku, price, quantity, low_stock_threshold))
+        product_id = cursor.lastrowid
+
+        inventory_ledger.record_entry(conn, product_id, quantity, "Initial stock")
+        db_manager.write_log(conn, username, "Added", name)
+
+    events.publish(events.PRODUCT_CHANGED, product_id, events.ADDED)
+    return product_id
+
+
+def update_product(username, product_id, name, category_id, sku, price, quantity=None, low_stock_threshold=None):
+    """Update a product and log it. Returns False if the product no longer exists.
+
+    `quantity` sets the stock outright, recorded in the ledger as an "Edited"
+    movement of the difference; leave it None to keep the stock and move it
+    with adjust_stock() instead.
+    """
+    with db_manager.connection() as conn:
+        cursor = conn.execute("""
+            UPDATE products
+            SET name=?, category_id=?, sku=?, price=?, low_stock_threshold=?
+            WHERE id=?
+        """, (name, category_id, sku, price, low_stock_threshold, product_id))
+        if cursor.rowcount == 0:
+            return False
+
+        if quantity is not None:
+            current = conn.execute(
+                "SELECT quantity_in_stock FROM products WHERE id=?", (product_id,)
+            ).fetchone()[0] or 0
+            inventory_ledger.record_movement(conn, product_id, quantity - current, "Edited")
+        db_manager.write_log(conn, username, "Edited", name)
+
+    events.publish(events.PRODUCT_CHANGED, product_id, events.UPDATED)
+    return True
+
+
+def adjust_stock(username, product_id, change, reason):
+    """Move a product's stock by `change` (e.g. +20 "Received", -3 "Sold") and log it.
+
+    Returns the new quantity, or None if the product no longer exists.
+    Raises ValueError if it would take the stock below zero.
+    """
+    with db_manager.connection() as conn:
+        balance = inventory_ledger.record_movement(conn, product_id, change, reason)
+        if balance is None:
+            return None
+        name = conn.execute("SELECT name FROM products WHERE id=?", (product_id,)).fetchone()[0]
+        db_manager.write_log(conn, username, f"Stock {reason}", name)
+
+    events.publish(events.PRODUCT_CHANGED, product_id, events.UPDATED)
+    return balance
+
+
+def adjust_stock_many(username, movements):
+    """Apply [(product_id, change, reason)] in one transaction. Returns the new quantities.
+
+    All or nothing: raises ValueError (and saves none of them) if a product
+    doesn't exist or a movement would take its stock below zero. Meant for
+    scanners posting many movements at once; each still gets its ledger and
+    log row.
+    """
+    balances = []
+    with db_manager.connection() as conn:
+        for number, (product_id, change, reason) in enumerate(movements, start=1):
+            try:
+                balance = inventory_ledger.record_movement(conn, product_id, change, reason)
+            except ValueError as e:
+                raise ValueError(f"Movement {number}: {e}")
+            if balance is None:
+                raise ValueError(f"Movement {number}: there is no product {product_id}.")
+            name = conn.execute("SELECT name FROM products WHERE id=?", (product_id,)).fetchone()[0]
+            db_manager.write_log(conn, username, f"Stock {reason}", name)
+            balances.append(balance)
+
+    for product_id in dict.fromkeys(product_id for product_id, _, _ in movements):
+        events.publish(events.PRODUCT_CHANGED, product_id, events.UPDATED)
+    return balances
+
+
+def delete_product(username, product_id):
+    """Delete a product and log it. Returns its name, or None if it was already gone.
+
+    Its stock history in inventory_logs goes with it: those rows reference the
+    product, and the `logs` row keeps the record that it was deleted.
+    """
+    with db_manager.connection() as conn:
+        row = conn.execute("SELECT name FROM products WHERE id=?", (product_id,)).fetchone()
+        if row is None:
+            return None
+
+        conn.execute("DELETE FROM inventory_logs WHERE product_id=?", (product_id,))
+        conn.execute("DELETE FROM stock_checkpoint_balances WHERE product_id=?", (product_id,))
+        conn.execute("DELETE FROM products WHERE id=?", (product_id,))
+        db_manager.write_log(conn, username, "Deleted", row[0])
+
+    events.publish(events.PRODUCT_CHANGED, product_id, events.DELETED)
+    return row[0]
@@ -6,7 +6,9 @@ import sys
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from models import db_manager
+from inventory import products
+from ui.category_model import category_model
+from ui.db_calls import run_query
 
 
 class AddProductWindow(QWidget):
@@ -30,6 +32,7 @@ class AddProductWindow(QWidget):
         # Category
         layout.addWidget(QLabel("Category:"))
         self.category_dropdown = QComboBox()
+        self.category_dropdown.setModel(category_model())  # shared, kept up to date
         layout.addWidget(self.category_dropdown)
 
         # Price
@@ -45,25 +48,30 @@ class AddProductWindow(QWidget):
         self.quantity_input.setMaximum(1000000)
         layout.addWidget(self.quantity_input)
 
+        # Low stock threshold; "Default" uses the category's or the global one
+        layout.addWidget(QLabel("Low Stock Below:"))
+        self.threshold_input = QSpinBox()
+        self.threshold_input.setRange(-1, 1000000)
+        self.threshold_input.setSpecialValueText("Default")
+        self.threshold_input.setValue(-1)
+        layout.addWidget(self.threshold_input)
+
         # Submit button
-        add_button = QPushButton("➕ Add Product")
-        add_button.clicked.connect(self.add_product)
-        layout.addWidget(add_button)
+        self.add_button = QPushButton("➕ Add Product")
+        self.add_button.clicked.connect(self.add_product)
+        layout.addWidget(self.add_button)
 
         self.setLayout(layout)
 
-        self.load_categories()
-
-    def load_categories(self):
-        conn = db_manager.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, name FROM categories")
-        categories = cursor.fetchall()
-        conn.close()
-
-        self.category_dropdown.clear()
-        for cat_id, cat_name in categories:
-            self.category_dropdown.addItem(cat_name, cat_id)
+    def reopen(self):
+        # Shown again from the dashboard: start a fresh form
+        self.name_input.clear()
+        self.sku_input.clear()
+        self.price_input.setValue(0)
+        self.quantity_input.setValue(0)
+        self.threshold_input.setValue(-1)
+        self.add_button.setEnabled(True)
+        category_model().refresh()
 
     def add_product(self):
         name = self.name_input.text()
@@ -71,22 +79,24 @@ class AddProductWindow(QWidget):
         category_id = self.category_dropdown.currentData()
         price = self.price_input.value()
         quantity = self.quantity_input.value()
+        threshold = self.threshold_input.value()
+        threshold = None if threshold < 0 else threshold
 
         if not name:
             QMessageBox.warning(self, "Error", "Product name cannot be empty.")
             return
 
-        conn = db_manager.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO products (name, category_id, sku, price, quantity_in_stock)
-            VALUES (?, ?, ?, ?, ?)
-        """, (name, category_id, sku, price, quantity))
-        conn.commit()
-        conn.close()
-
-        # 🔷 Log the addition
-        db_manager.log_action("admin", "Added", name)
+        # 🔷 Saved and logged in one transaction, on the database thread
+        self.add_button.setEnabled(False)
+        run_query(
+            self, products.add_product, "admin", name, category_id, sku, price, quantity, threshold,
+            done=self.product_added, failed=self.add_failed
+        )
 
+    def product_added(self, product_id):
         QMessageBox.information(self, "Success", "Product added successfully.")
         self.close()
+
+    def add_failed(self, message):
+        self.add_button.setEnabled(True)
+        QMessageBox.warning(self, "Error", message)
@@ -0,0 +1,96 @@
+from PyQt5 import sip
+from PyQt5.QtCore import Qt, QConcatenateTablesProxyModel, QCoreApplication, pyqtSignal
+from PyQt5.QtGui import QStandardItem, QStandardItemModel
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from inventory import categories
+from models import events
+from ui.db_calls import run_query
+
+
+class CategoryModel(QStandardItemModel):
+    """Every category by name, with its id as item data — one model behind every category combo box.
+
+    Combo boxes `setModel()` it instead of filling themselves. When categories
+    change it is patched in place (rows added, renamed, removed), so the
+    combos keep their selection and nothing is rebuilt. It stops listening
+    when it is closed or deleted (the shared one goes with the application).
+    """
+
+    changed = pyqtSignal()  # carries category and restore events to the GUI thread
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.changed.connect(self.refresh)
+        # One `emit` object, so it can be unsubscribed without touching a deleted model
+        forward = self.forward = self.changed.emit
+        events.subscribe(events.CATEGORIES_CHANGED, forward)
+        events.subscribe(events.DATABASE_RESTORED, forward)
+        self.destroyed.connect(lambda: _unsubscribe(forward))
+
+    def close(self):
+        """Stop following category changes."""
+        _unsubscribe(self.forward)
+
+    def refresh(self):
+        """Re-read the category cache on the database thread (a no-op check if nothing changed)."""
+        run_query(self, categories.list_categories, done=self.sync)
+
+    def sync(self, category_list):
+        wanted = [(category.id, category.name) for category in category_list]
+        ids = {category_id for category_id, _ in wanted}
+        for row in reversed(range(self.rowCount())):
+            if self.item(row).data(Qt.UserRole) not in ids:
+                self.removeRow(row)
+
+        for position, (category_id, name) in enumerate(wanted):
+            item = self.item(position)
+            if item is None or item.data(Qt.UserRole) != category_id:
+                found = self.match(self.index(position, 0), Qt.UserRole, category_id, 1, Qt.MatchExactly)
+                if found:
+                    item = self.takeRow(found[0].row())[0]
+                else:
+                    item = QStandardItem(name)
+                    item.setData(category_id, Qt.UserRole)
+                self.insertRow(position, item)
+            if item.text() != name:
+                item.setText(name)
+
+
+def _unsubscribe(forward):
+    events.unsubscribe(events.CATEGORIES_CHANGED, forward)
+    events.unsubscribe(events.DATABASE_RESTORED, forward)
+
+
+_shared = None
+_with_all = None
+
+
+def category_model():
+    """The shared CategoryModel (created, and filled in the background, on first use).
+
+    It belongs to the running QApplication and is deleted with it; a later
+    application gets a new one.
+    """
+    global _shared
+    if _shared is None or sip.isdeleted(_shared):
+        _shared = CategoryModel(QCoreApplication.instance())
+        _shared.refresh()
+    return _shared
+
+
+def category_filter_model():
+    """The shared categories with an "All Categories" row first (its data is None), for filters."""
+    global _with_all
+    if _with_all is None or sip.isdeleted(_with_all):
+        all_row = QStandardItemModel()
+        all_row.appendRow(QStandardItem("All Categories"))
+        _with_all = QConcatenateTablesProxyModel(QCoreApplication.instance())
+        _with_all.addSourceModel(all_row)
+        _with_all.addSourceModel(category_model())
+        _with_all.all_row = all_row  # keep it alive with the proxy
+    return _with_all
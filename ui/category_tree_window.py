@@ -0,0 +1,324 @@
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QTreeView, QPushButton, QMessageBox, QInputDialog, QHeaderView
+)
+from PyQt5.QtCore import Qt, QAbstractItemModel, QModelIndex, pyqtSignal
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from inventory import categories
+from models import events
+from ui.category_model import category_model
+from ui.db_calls import run_query
+
+
+class CategoryNode:
+    def __init__(self, parent=None, record=None):
+        self.parent = parent
+        self.id, self.name, self.child_count, self.product_count = record or (None, "", 0, 0)
+        self.children = None  # not fetched yet
+        self.fetching = False
+
+
+class CategoryTreeModel(QAbstractItemModel):
+    """The category tree, read one level at a time as branches are expanded.
+
+    Each node's children are fetched on the database thread the first time
+    the view asks for them (`canFetchMore` / `fetchMore`), so a large tree
+    opens with a single query for the top level.
+    """
+
+    HEADERS = ["Category", "Products"]
+    loaded = pyqtSignal(QModelIndex)  # a node's children arrived
+    failed = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.root = CategoryNode()
+        self.generation = 0  # bumped by reset(), so fetches from before it are dropped
+
+    def reset(self):
+        self.beginResetModel()
+        self.root = CategoryNode()
+        self.generation += 1
+        self.endResetModel()
+
+    def node(self, index):
+        return index.internalPointer() if index.isValid() else self.root
+
+    def index_of(self, node):
+        if node is self.root:
+            return QModelIndex()
+        return self.createIndex(node.parent.children.index(node), 0, node)
+
+    def index(self, row, column, parent=QModelIndex()):
+        node = self.node(parent)
+        if node.children is None or not 0 <= row < len(node.children):
+            return QModelIndex()
+        return self.createIndex(row, column, node.children[row])
+
+    def parent(self, index):
+        if not index.isValid():
+            return QModelIndex()
+        return self.index_of(index.internalPointer().parent)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        children = self.node(parent).children
+        return len(children) if children else 0
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self.HEADERS)
+
+    def hasChildren(self, parent=QModelIndex()):
+        node = self.node(parent)
+        if node.children is None:
+            return node is self.root or node.child_count > 0
+        return bool(node.children)
+
+    def canFetchMore(self, parent):
+        node = self.node(parent)
+        return node.children is None and not node.fetching and self.hasChildren(parent)
+
+    def fetchMore(self, parent):
+        node = self.node(parent)
+        node.fetching = True
+        generation = self.generation
+        run_query(
+            self, categories.children, node.id,
+            done=lambda rows: self.add_children(generation, node, rows),
+            failed=self.failed.emit
+        )
+
+    def add_children(self, generation, node, rows):
+        if generation != self.generation:
+            return
+        node.fetching = False
+        parent = self.index_of(node)
+        if rows:
+            self.beginInsertRows(parent, 0, len(rows) - 1)
+        node.children = [CategoryNode(node, row) for row in rows]
+        if rows:
+            self.endInsertRows()
+        self.loaded.emit(parent)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        node = index.internalPointer()
+        if role == Qt.DisplayRole:
+            return node.name if index.column() == 0 else f"{node.product_count:,}"
+        if role == Qt.TextAlignmentRole and index.column() == 1:
+            return Qt.AlignRight | Qt.AlignVCenter
+        if role == Qt.UserRole:
+            return node.id
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+
+class CategoryTreeWindow(QWidget):
+    show_products = pyqtSignal(int)  # category id whose products (and its subcategories') to list
+    categories_changed = pyqtSignal()  # carries category and restore events to the GUI thread
+
+    def __init__(self, editable=False):
+        super().__init__()
+        self.editable = editable
+        self.setWindowTitle("Categories")
+        self.resize(500, 500)
+
+        layout = QVBoxLayout()
+
+        # Title
+        layout.addWidget(QLabel("🗂️ Categories"))
+
+        # Tree; branches are read from the database as they are expanded
+        self.model = CategoryTreeModel(self)
+        self.model.loaded.connect(self.restore_expanded)
+        self.model.failed.connect(
+            lambda message: QMessageBox.critical(self, "Error", f"Failed to load categories:\n{message}")
+        )
+        self.tree = QTreeView()
+        self.tree.setModel(self.model)
+        self.tree.setUniformRowHeights(True)
+        self.tree.header().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.tree.header().setStretchLastSection(False)
+        self.tree.doubleClicked.connect(self.emit_show_products)
+        self.tree.selectionModel().currentChanged.connect(self.show_path)
+        layout.addWidget(self.tree)
+
+        self.path_label = QLabel("")
+        layout.addWidget(self.path_label)
+
+        # Buttons
+        button_layout = QHBoxLayout()
+        products_btn = QPushButton("📦 Show Products")
+        products_btn.clicked.connect(self.emit_show_products)
+        refresh_btn = QPushButton("🔄 Refresh")
+        refresh_btn.clicked.connect(self.refresh)
+        button_layout.addWidget(products_btn)
+        button_layout.addWidget(refresh_btn)
+        layout.addLayout(button_layout)
+
+        # ✏️ Changing the tree is admin only
+        if self.editable:
+            edit_layout = QHBoxLayout()
+            for caption, handler in [
+                ("➕ Add Category", self.add_top_level),
+                ("➕ Add Subcategory", self.add_subcategory),
+                ("✏️ Rename", self.rename_category),
+                ("📂 Move…", self.move_category),
+                ("🗑️ Delete", self.delete_category),
+            ]:
+                button = QPushButton(caption)
+                button.clicked.connect(handler)
+                edit_layout.addWidget(button)
+            layout.addLayout(edit_layout)
+
+        self.setLayout(layout)
+
+        self.expanded = set()  # ids to expand again once their branch is re-read
+        self.selected_id = None
+        self.categories_changed.connect(self.refresh)
+        events.subscribe(events.CATEGORIES_CHANGED, self.categories_changed.emit)
+        events.subscribe(events.DATABASE_RESTORED, self.categories_changed.emit)
+
+    def closeEvent(self, event):
+        events.unsubscribe(events.CATEGORIES_CHANGED, self.categories_changed.emit)
+        events.unsubscribe(events.DATABASE_RESTORED, self.categories_changed.emit)
+        super().closeEvent(event)
+
+    def reopen(self):
+        events.subscribe(events.CATEGORIES_CHANGED, self.categories_changed.emit)
+        events.subscribe(events.DATABASE_RESTORED, self.categories_changed.emit)
+        self.refresh()
+
+    def refresh(self):
+        """Re-read the tree, keeping the open branches and the selection."""
+        self.expanded |= self.expanded_ids()
+        self.selected_id = self.current_id() or self.selected_id
+        self.model.reset()
+
+    def expanded_ids(self, parent=QModelIndex()):
+        ids = set()
+        for row in range(self.model.rowCount(parent)):
+            index = self.model.index(row, 0, parent)
+            if self.tree.isExpanded(index):
+                ids.add(index.data(Qt.UserRole))
+                ids |= self.expanded_ids(index)
+        return ids
+
+    def restore_expanded(self, parent):
+        for row in range(self.model.rowCount(parent)):
+            index = self.model.index(row, 0, parent)
+            category_id = index.data(Qt.UserRole)
+            if category_id in self.expanded:
+                self.expanded.discard(category_id)
+                self.tree.expand(index)  # fetches the branch, which lands back here
+            if category_id == self.selected_id:
+                self.selected_id = None
+                self.tree.setCurrentIndex(index)
+
+    def current_id(self):
+        index = self.tree.currentIndex()
+        return index.data(Qt.UserRole) if index.isValid() else None
+
+    def selected(self):
+        """(id, name) of the selected category, or None after telling the user to pick one."""
+        index = self.tree.currentIndex()
+        if not index.isValid():
+            QMessageBox.warning(self, "No Category", "Select a category first.")
+            return None
+        return index.data(Qt.UserRole), self.model.node(index.siblingAtColumn(0)).name
+
+    def show_path(self, index):
+        self.path_label.clear()
+        if index.isValid():
+            run_query(
+                self, categories.path, index.data(Qt.UserRole),
+                done=lambda path: self.path_label.setText(" › ".join(category.name for category in path))
+            )
+
+    def emit_show_products(self, *_):
+        selected = self.selected()
+        if selected:
+            self.show_products.emit(selected[0])
+
+    def add_top_level(self):
+        self.add_category(None)
+
+    def add_subcategory(self):
+        selected = self.selected()
+        if selected:
+            self.expanded.add(selected[0])  # so the new subcategory shows
+            self.add_category(*selected)
+
+    def add_category(self, parent_id, parent_name=None):
+        label = f"Name of the new category under {parent_name}:" if parent_name else "Name of the new category:"
+        name, ok = QInputDialog.getText(self, "Add Category", label)
+        if not ok or not name.strip():
+            return
+        run_query(
+            self, categories.add_category, name, parent_id,
+            failed=lambda message: QMessageBox.critical(self, "Error", f"Failed to add category:\n{message}")
+        )
+
+    def rename_category(self):
+        selected = self.selected()
+        if not selected:
+            return
+        category_id, current_name = selected
+        name, ok = QInputDialog.getText(self, "Rename Category", "New name:", text=current_name)
+        if not ok or not name.strip() or name.strip() == current_name:
+            return
+        run_query(
+            self, categories.rename_category, category_id, name,
+            failed=lambda message: QMessageBox.critical(self, "Error", f"Failed to rename category:\n{message}")
+        )
+
+    def move_category(self):
+        selected = self.selected()
+        if not selected:
+            return
+        category_id, name = selected
+        # Every other category, from the shared list; moving under a subcategory is refused
+        model = category_model()
+        targets = [(None, "(Top level)")] + [
+            (model.item(row).data(Qt.UserRole), model.item(row).text()) for row in range(model.rowCount())
+            if model.item(row).data(Qt.UserRole) != category_id
+        ]
+        label, ok = QInputDialog.getItem(
+            self, "Move Category", f"Move {name} under:", [target[1] for target in targets], 0, False
+        )
+        if not ok:
+            return
+        parent_id = next(target[0] for target in targets if target[1] == label)
+        if parent_id is not None:
+            self.expanded.add(parent_id)
+        run_query(
+            self, categories.move_category, category_id, parent_id,
+            failed=lambda message: QMessageBox.critical(self, "Error", f"Failed to move category:\n{message}")
+        )
+
+    def delete_category(self):
+        selected = self.selected()
+        if not selected:
+            return
+        confirm = QMessageBox.question(
+            self,
+            "Confirm Delete",
+            f"Delete the category {selected[1]}?",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if confirm != QMessageBox.Yes:
+            return
+        run_query(
+            self, categories.delete_category, selected[0],
+            failed=lambda message: QMessageBox.critical(self, "Error", f"Failed to delete category:\n{message}")
+        )
@@ -1,20 +1,28 @@
 from PyQt5.QtWidgets import (
-    QWidget, QLabel, QVBoxLayout, QPushButton, QMessageBox
+    QWidget, QLabel, QVBoxLayout, QGridLayout, QPushButton, QMessageBox, QInputDialog, QProgressDialog,
+    QFileDialog, QTableWidget, QTableWidgetItem, QHeaderView
 )
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
+import os
 
-from ui.view_products_window import ViewProductsWindow
-from ui.add_product_window import AddProductWindow
-from ui.view_logs_window import ViewLogsWindow
-from ui.manage_users_window import ManageUsersWindow  # 👥 new import
+from inventory import products
+from models import events
+from ui.db_calls import run_query
+from ui.window_cache import WindowCache
 
-from models.backup_restore import backup_database, restore_database  # 💾 new import
+# The windows behind the buttons (and the backup code) are imported when a
+# button is first clicked, so the dashboard appears without loading them
 
 
 class DashboardWindow(QWidget):
+    stock_changed = pyqtSignal()  # carries product and restore events to the GUI thread
+    stock_summary_shown = pyqtSignal()  # the KPIs and category totals are filled in
+
     def __init__(self, username, role='user'):
         super().__init__()
         self.username = username
         self.role = role
+        self.windows = WindowCache()
 
         self.setWindowTitle("Dashboard")
 
@@ -25,10 +33,40 @@ class DashboardWindow(QWidget):
         welcome_label = QLabel(f"Welcome to the Dashboard, {username}!")
         layout.addWidget(welcome_label)
 
+        # 📊 Stock KPIs, read from the maintained summary tables
+        kpi_layout = QGridLayout()
+        self.kpi_labels = {}
+        kpis = [
+            ("product_count", "Products"),
+            ("total_quantity", "Units in Stock"),
+            ("stock_value", "Stock Value"),
+            ("low_stock_count", "⚠️ Low Stock"),
+        ]
+        for col, (key, caption) in enumerate(kpis):
+            value_label = QLabel("–")
+            value_label.setAlignment(Qt.AlignCenter)
+            value_label.setStyleSheet("font-size: 18px; font-weight: bold;")
+            caption_label = QLabel(caption)
+            caption_label.setAlignment(Qt.AlignCenter)
+            kpi_layout.addWidget(value_label, 0, col)
+            kpi_layout.addWidget(caption_label, 1, col)
+            self.kpi_labels[key] = value_label
+        layout.addLayout(kpi_layout)
+
+        self.category_table = QTableWidget(0, 4)
+        self.category_table.setHorizontalHeaderLabels(["Category", "Products", "Units", "Value"])
+        self.category_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.category_table.verticalHeader().hide()
+        self.category_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.category_table.setMaximumHeight(160)
+        layout.addWidget(self.category_table)
+
         # Buttons
         self.view_products_btn = QPushButton("📦 View Products")
         self.add_product_btn = QPushButton("➕ Add Product")
         self.view_logs_btn = QPushButton("📊 View Inventory Logs")
+        self.low_stock_btn = QPushButton("⚠️ Low Stock")
+        self.categories_btn = QPushButton("🗂️ Categories")
         self.manage_users_btn = QPushButton("👥 Manage Users")  # 👥 new button
         self.backup_btn = QPushButton("💾 Backup Database")      # 💾 new button
         self.restore_btn = QPushButton("♻️ Restore Database")   # ♻️ new button
@@ -38,6 +76,8 @@ class DashboardWindow(QWidget):
         self.view_products_btn.clicked.connect(self.view_products)
         self.add_product_btn.clicked.connect(self.add_product)
         self.view_logs_btn.clicked.connect(self.view_logs)
+        self.low_stock_btn.clicked.connect(self.view_low_stock)
+        self.categories_btn.clicked.connect(self.view_categories)
         self.manage_users_btn.clicked.connect(self.manage_users)  # 👥 connect
         self.backup_btn.clicked.connect(self.backup_db)           # 💾 connect
         self.restore_btn.clicked.connect(self.restore_db)         # ♻️ connect
@@ -47,6 +87,8 @@ class DashboardWindow(QWidget):
         layout.addWidget(self.view_products_btn)
         layout.addWidget(self.add_product_btn)
         layout.addWidget(self.view_logs_btn)
+        layout.addWidget(self.low_stock_btn)
+        layout.addWidget(self.categories_btn)
 
         # 👥 only show Manage Users if admin
         if self.role == 'admin':
@@ -62,27 +104,178 @@ class DashboardWindow(QWidget):
         # Set layout
         self.setLayout(layout)
 
+        # A burst of changes (e.g. several quick edits) refreshes the KPIs once
+        self.stock_timer = QTimer(self)
+        self.stock_timer.setSingleShot(True)
+        self.stock_timer.setInterval(200)
+        self.stock_timer.timeout.connect(self.load_stock_summary)
+        self.stock_changed.connect(self.stock_timer.start)
+        events.subscribe(events.PRODUCT_CHANGED, self.on_product_changed)
+        events.subscribe(events.PRODUCTS_RELOADED, self.stock_changed.emit)
+        events.subscribe(events.DATABASE_RESTORED, self.stock_changed.emit)
+
+        self.load_stock_summary()
+
+    def closeEvent(self, event):
+        events.unsubscribe(events.PRODUCT_CHANGED, self.on_product_changed)
+        events.unsubscribe(events.PRODUCTS_RELOADED, self.stock_changed.emit)
+        events.unsubscribe(events.DATABASE_RESTORED, self.stock_changed.emit)
+        self.windows.close_all()  # logging out closes what this user opened
+        super().closeEvent(event)
+
+    def on_product_changed(self, product_id, kind):
+        self.stock_changed.emit()
+
+    def load_stock_summary(self):
+        run_query(
+            self, products.stock_summary, done=self.show_stock_summary,
+            failed=lambda message: print(f"⚠️ Failed to load stock summary: {message}")
+        )
+
+    def show_stock_summary(self, summary):
+        self.kpi_labels["product_count"].setText(f"{summary.product_count:,}")
+        self.kpi_labels["total_quantity"].setText(f"{summary.total_quantity:,}")
+        self.kpi_labels["stock_value"].setText(f"{summary.stock_value:,.2f}")
+        self.kpi_labels["low_stock_count"].setText(f"{summary.low_stock_count:,}")
+
+        self.category_table.setRowCount(len(summary.categories))
+        for row_idx, (name, count, quantity, value) in enumerate(summary.categories):
+            for col, text in enumerate([name, f"{count:,}", f"{quantity:,}", f"{value:,.2f}"]):
+                item = QTableWidgetItem(text)
+                item.setTextAlignment(Qt.AlignCenter)
+                self.category_table.setItem(row_idx, col, item)
+        self.stock_summary_shown.emit()
+
     def view_products(self):
-        self.products_window = ViewProductsWindow()
-        self.products_window.show()
+        from ui.view_products_window import ViewProductsWindow
+        self.windows.show("products", ViewProductsWindow)
 
     def add_product(self):
-        self.add_product_window = AddProductWindow()
-        self.add_product_window.show()
+        from ui.add_product_window import AddProductWindow
+        self.windows.show("add_product", AddProductWindow)
 
     def view_logs(self):
-        self.logs_window = ViewLogsWindow()
-        self.logs_window.show()
+        from ui.view_logs_window import ViewLogsWindow
+        self.windows.show("logs", ViewLogsWindow)
+
+    def view_low_stock(self):
+        from ui.low_stock_window import LowStockWindow
+        # Thresholds can only be changed by admins
+        self.windows.show("low_stock", lambda: LowStockWindow(editable=self.role == 'admin'))
+
+    def view_categories(self):
+        self.windows.show("categories", self.build_category_tree)
+
+    def build_category_tree(self):
+        from ui.category_tree_window import CategoryTreeWindow
+        # The tree can only be changed by admins
+        window = CategoryTreeWindow(editable=self.role == 'admin')
+        window.show_products.connect(self.view_category_products)
+        return window
+
+    def view_category_products(self, category_id):
+        from ui.view_products_window import ViewProductsWindow
+        self.windows.show("products", ViewProductsWindow).select_category(category_id)
 
     def manage_users(self):
-        self.users_window = ManageUsersWindow()
-        self.users_window.show()
+        from ui.manage_users_window import ManageUsersWindow
+        self.windows.show("users", ManageUsersWindow)
 
     def backup_db(self):
-        backup_database(self)
+        from models.backup_restore import available_compressions
+        from ui.workers import BackupWorker
+
+        labels = {None: "Full copy", "gzip": "Full copy, gzip", "zstd": "Full copy, zstd (smallest, fastest)"}
+        choices = [(labels[name], name, False) for name in available_compressions()]
+        choices.append(("Incremental snapshot (only changed data)", None, True))
+        label, ok = QInputDialog.getItem(
+            self, "Backup Database", "Backup type:", [choice[0] for choice in choices], 0, False
+        )
+        if not ok:
+            return
+        _, compression, incremental = next(choice for choice in choices if choice[0] == label)
+
+        # Runs in the background against a snapshot, so the app stays usable
+        self.backup_progress = QProgressDialog("Backing up database…", "Cancel", 0, 100, self)
+        self.backup_progress.setWindowModality(Qt.WindowModal)
+        self.backup_progress.setMinimumDuration(0)
+
+        self.backup_worker = BackupWorker(compression, incremental, self)
+        self.backup_worker.progress.connect(self.backup_progress.setValue)
+        self.backup_worker.done.connect(self.backup_finished)
+        self.backup_worker.cancelled.connect(self.backup_progress.close)
+        self.backup_worker.failed.connect(self.backup_failed)
+        self.backup_progress.canceled.connect(self.backup_worker.cancel)
+        self.backup_worker.start()
+
+    def backup_finished(self, saved):
+        from models import incremental_backup
+
+        self.backup_progress.close()
+        if self.backup_worker.incremental:
+            saved = f"snapshot {saved} in\n{incremental_backup.STORE_DIR}"
+        QMessageBox.information(self, "Backup Successful", f"Backup saved to:\n{saved}")
+
+    def backup_failed(self, message):
+        self.backup_progress.close()
+        QMessageBox.critical(self, "Error", f"Backup failed:\n{message}")
 
     def restore_db(self):
-        restore_database(self)
+        from models import incremental_backup
+        from models.backup_restore import BACKUP_DIR
+        from ui.workers import RestoreWorker
+
+        file_path, _ = QFileDialog.getOpenFileName(
+            self,
+            "Select Backup File",
+            BACKUP_DIR,
+            "Backups (*.db *.db.gz *.db.zst);;Incremental Snapshots (*.json)"
+        )
+        if not file_path:
+            return
+
+        # A snapshot is picked by its file in backups/incremental/snapshots;
+        # full backups keep a .json manifest of their own, which isn't one
+        snapshot_id = None
+        if file_path.endswith(".json"):
+            snapshots_dir = os.path.join(incremental_backup.STORE_DIR, "snapshots")
+            if os.path.realpath(os.path.dirname(file_path)) != os.path.realpath(snapshots_dir):
+                QMessageBox.warning(
+                    self, "Not a Snapshot",
+                    f"Incremental snapshots are the .json files in:\n{snapshots_dir}\n\n"
+                    "To restore a full backup, pick its .db file."
+                )
+                return
+            snapshot_id = os.path.splitext(os.path.basename(file_path))[0]
+            file_path = None
+
+        confirm = QMessageBox.question(
+            self,
+            "Confirm Restore",
+            "Replace the current database with this backup?\n"
+            "Unsaved work in other windows will be reloaded from the backup.",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if confirm != QMessageBox.Yes:
+            return
+
+        self.restore_progress = QProgressDialog("Checking and restoring backup…", None, 0, 100, self)
+        self.restore_progress.setWindowModality(Qt.ApplicationModal)
+        self.restore_progress.setMinimumDuration(0)
+
+        self.restore_worker = RestoreWorker(file_path, snapshot_id, self)
+        self.restore_worker.progress.connect(self.restore_progress.setValue)
+        self.restore_worker.done.connect(self.restore_finished)
+        self.restore_worker.failed.connect(self.restore_failed)
+        self.restore_worker.start()
+
+    def restore_finished(self):
+        self.restore_progress.close()
+        QMessageBox.information(self, "Restore Successful", "Database restored from backup.")
+
+    def restore_failed(self, message):
+        self.restore_progress.close()
+        QMessageBox.critical(self, "Error", f"Restore failed:\n{message}")
 
     def logout(self):
         QMessageBox.information(self, "Logout", "Logging out…")
@@ -0,0 +1,46 @@
+from PyQt5.QtCore import QObject, pyqtSignal
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models import db_executor
+
+
+class DatabaseCall(QObject):
+    """Delivers the result of one db_executor call back on the GUI thread.
+
+    The future completes on the database thread; emitting from there queues
+    the signal to this object's thread, so `done`/`failed` handlers run on
+    the event loop like any other slot.
+    """
+
+    done = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def deliver(self, future):
+        try:
+            if future.exception() is None:
+                self.done.emit(future.result())
+            else:
+                self.failed.emit(str(future.exception()))
+            self.deleteLater()
+        except RuntimeError:
+            pass  # the window went away while the query ran
+
+
+def run_query(parent, fn, *args, done=None, failed=None, **kwargs):
+    """Run `fn(*args, **kwargs)` on the database thread without blocking the window.
+
+    `done(result)` / `failed(message)` are called on the GUI thread; the call
+    is parented to `parent`, so nothing is delivered once it is destroyed.
+    Calls run one at a time, in the order they were made.
+    """
+    call = DatabaseCall(parent)
+    if done:
+        call.done.connect(done)
+    if failed:
+        call.failed.connect(failed)
+    db_executor.submit(fn, *args, **kwargs).add_done_callback(call.deliver)
+    return call
@@ -8,7 +8,25 @@ import sys
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from inventory import products
 from models import db_manager
+from ui.category_model import category_model
+from ui.db_calls import run_query
+
+STOCK_REASONS = ["Received", "Sold", "Returned", "Damaged", "Correction"]
+
+
+def save_product(product_id, name, category_id, sku, price, change, reason, threshold):
+    """Runs on the database thread. Returns False if the product no longer exists.
+
+    The stock movement is its own ledger entry, made first so a refused one
+    (more out than in stock) leaves the product untouched. Both join one
+    transaction: the edit is saved and logged as a whole or not at all.
+    """
+    with db_manager.connection():
+        if change and products.adjust_stock("admin", product_id, change, reason) is None:
+            return False
+        return products.update_product("admin", product_id, name, category_id, sku, price, None, threshold)
 
 
 class EditProductWindow(QWidget):
@@ -31,6 +49,7 @@ class EditProductWindow(QWidget):
 
         layout.addWidget(QLabel("Category:"))
         self.category_dropdown = QComboBox()
+        self.category_dropdown.setModel(category_model())  # shared, kept up to date
         layout.addWidget(self.category_dropdown)
 
         layout.addWidget(QLabel("Price:"))
@@ -39,75 +58,83 @@ class EditProductWindow(QWidget):
         self.price_input.setDecimals(2)
         layout.addWidget(self.price_input)
 
-        layout.addWidget(QLabel("Quantity in Stock:"))
-        self.quantity_input = QSpinBox()
-        self.quantity_input.setMaximum(1000000)
-        layout.addWidget(self.quantity_input)
-
-        save_button = QPushButton("💾 Save Changes")
-        save_button.clicked.connect(self.save_changes)
-        layout.addWidget(save_button)
+        # Stock is moved, not overwritten: each change is a ledger entry
+        self.quantity_label = QLabel("Quantity in Stock:")
+        layout.addWidget(self.quantity_label)
+
+        layout.addWidget(QLabel("Stock Change (+ in / - out):"))
+        self.change_input = QSpinBox()
+        self.change_input.setRange(-1000000, 1000000)
+        layout.addWidget(self.change_input)
+
+        layout.addWidget(QLabel("Reason:"))
+        self.reason_dropdown = QComboBox()
+        self.reason_dropdown.setEditable(True)
+        self.reason_dropdown.addItems(STOCK_REASONS)
+        layout.addWidget(self.reason_dropdown)
+
+        # Low stock threshold; "Default" uses the category's or the global one
+        layout.addWidget(QLabel("Low Stock Below:"))
+        self.threshold_input = QSpinBox()
+        self.threshold_input.setRange(-1, 1000000)
+        self.threshold_input.setSpecialValueText("Default")
+        self.threshold_input.setValue(-1)
+        layout.addWidget(self.threshold_input)
+
+        self.save_button = QPushButton("💾 Save Changes")
+        self.save_button.clicked.connect(self.save_changes)
+        layout.addWidget(self.save_button)
 
         self.setLayout(layout)
 
-        self.load_categories()
+        # Queued in this order, so the categories are in the dropdown before the product arrives
+        category_model().refresh()
         self.load_product_data()
 
-    def load_categories(self):
-        conn = db_manager.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, name FROM categories")
-        categories = cursor.fetchall()
-        conn.close()
-
-        self.category_dropdown.clear()
-        for cat_id, cat_name in categories:
-            self.category_dropdown.addItem(cat_name, cat_id)
-
     def load_product_data(self):
-        conn = db_manager.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT name, category_id, sku, price, quantity_in_stock
-            FROM products
-            WHERE id=?
-        """, (self.product_id,))
-        product = cursor.fetchone()
-        conn.close()
+        run_query(self, products.get_product, self.product_id, done=self.show_product)
 
+    def show_product(self, product):
         if product:
-            self.name_input.setText(product[0])
-            idx = self.category_dropdown.findData(product[1])
+            self.name_input.setText(product.name)
+            idx = self.category_dropdown.findData(product.category_id)
             if idx >= 0:
                 self.category_dropdown.setCurrentIndex(idx)
-            self.sku_input.setText(product[2])
-            self.price_input.setValue(product[3])
-            self.quantity_input.setValue(product[4])
+            self.sku_input.setText(product.sku)
+            self.price_input.setValue(product.price)
+            self.quantity_label.setText(f"Quantity in Stock: {product.quantity}")
+            self.threshold_input.setValue(-1 if product.low_stock_threshold is None else product.low_stock_threshold)
 
     def save_changes(self):
         name = self.name_input.text()
         sku = self.sku_input.text()
         category_id = self.category_dropdown.currentData()
         price = self.price_input.value()
-        quantity = self.quantity_input.value()
+        change = self.change_input.value()
+        reason = self.reason_dropdown.currentText().strip() or "Correction"
+        threshold = self.threshold_input.value()
+        threshold = None if threshold < 0 else threshold
 
         if not name:
             QMessageBox.warning(self, "Error", "Product name cannot be empty.")
             return
 
-        conn = db_manager.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            UPDATE products
-            SET name=?, category_id=?, sku=?, price=?, quantity_in_stock=?
-            WHERE id=?
-        """, (name, category_id, sku, price, quantity, self.product_id))
-        conn.commit()
-        conn.close()
-
-        # Log it
-        db_manager.log_action("admin", "Edited", name)
+        self.save_button.setEnabled(False)
+        run_query(
+            self, save_product, self.product_id, name, category_id, sku, price, change, reason, threshold,
+            done=self.product_saved, failed=self.save_failed
+        )
+
+    def save_failed(self, message):
+        self.save_button.setEnabled(True)
+        QMessageBox.warning(self, "Error", message)
+
+    def product_saved(self, updated):
+        if not updated:
+            QMessageBox.warning(self, "Error", "This product no longer exists.")
+            self.parent.load_products()
+            self.close()
+            return
 
         QMessageBox.information(self, "Success", "Product updated successfully.")
-        self.parent.load_products()  # refresh products table
         self.close()
@@ -0,0 +1,145 @@
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, pyqtSignal
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from inventory import logs
+from ui.db_calls import run_query
+
+
+class LogTableModel(QAbstractTableModel):
+    """Audit log table, newest first, that pulls rows from SQLite one page at a time as the view scrolls.
+
+    Paging runs on into the monthly log archives, so archived rows show up
+    after the live ones as if they were one table. Pages are read on the
+    database thread and inserted when they arrive.
+    """
+
+    headers = ["Timestamp", "User", "Action", "Product Name"]
+    page_size = 200
+
+    refreshed = pyqtSignal(int)  # rows refresh() added to the top
+    failed = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []  # (id, timestamp, username, action, product name)
+        self.filters = {}
+        self.after = None  # (timestamp, id) of the last loaded row
+        self.newest_id = None  # highest log id already accounted for (None until the first page)
+        self.exhausted = True
+        self.loading = False
+        self.generation = 0  # bumped by set_filters(); pages for older filters are dropped
+
+    def set_filters(self, **filters):
+        """Drop the loaded rows and start paging again; see inventory.logs for the filters."""
+        self.beginResetModel()
+        self.filters = filters
+        self.rows = []
+        self.after = None
+        self.newest_id = None
+        self.exhausted = False
+        self.loading = False
+        self.generation += 1
+        self.endResetModel()
+
+        self.fetchMore()
+
+    def refresh(self):
+        """Add the rows logged since the last load to the top; emits `refreshed` with how many.
+
+        Entries still queued in this process are written out first.
+        """
+        if self.newest_id is None:
+            return  # the first page is still on its way
+        generation = self.generation
+        run_query(
+            self, logs.list_new, self.newest_id, **self.filters,
+            done=lambda new_rows: self.add_new_rows(generation, new_rows), failed=self.failed.emit
+        )
+
+    def add_new_rows(self, generation, new_rows):
+        if generation != self.generation or not new_rows:
+            self.refreshed.emit(0)
+            return
+
+        self.newest_id = max(self.newest_id, max(row[0] for row in new_rows))
+        self.beginInsertRows(QModelIndex(), 0, len(new_rows) - 1)
+        self.rows[:0] = new_rows
+        self.endInsertRows()
+        self.refreshed.emit(len(new_rows))
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.headers[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return str(self.rows[index.row()][index.column() + 1])
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self.exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self.exhausted or self.loading:
+            return
+
+        self.loading = True
+        generation = self.generation
+        first = self.newest_id is None
+        run_query(
+            self, self.read_page, self.after, first, self.filters,
+            done=lambda result: self.add_page(generation, *result),
+            failed=lambda message: self.page_failed(generation, message)
+        )
+
+    def read_page(self, after, first, filters):
+        """Runs on the database thread.
+
+        The first page also notes the newest log id, taken before the page so
+        a row logged in between shows up on refresh — unless the page already
+        has it, which would show it twice.
+        """
+        newest_id = logs.last_id() if first else None
+        page, after = logs.list_page(after, self.page_size, **filters)
+        if first and page:
+            newest_id = max(newest_id, max(entry.id for entry in page))
+        return newest_id, page, after
+
+    def page_failed(self, generation, message):
+        if generation != self.generation:
+            return
+        self.loading = False
+        self.exhausted = True
+        self.failed.emit(message)
+
+    def add_page(self, generation, newest_id, page, after):
+        if generation != self.generation:
+            return
+        self.loading = False
+        if newest_id is not None:
+            self.newest_id = newest_id
+        self.after = after
+        if len(page) < self.page_size:
+            self.exhausted = True
+        if not page:
+            return
+
+        start = len(self.rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(page) - 1)
+        self.rows.extend(page)
+        self.endInsertRows()
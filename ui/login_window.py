@@ -2,15 +2,15 @@ import sys
 import os
 
 from PyQt5.QtWidgets import (
-    QApplication, QWidget, QLabel, QLineEdit,
+    QWidget, QLabel, QLineEdit,
     QPushButton, QVBoxLayout, QMessageBox
 )
 
 # Add the project root to sys.path so we can import models
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from models import db_manager
-from ui.dashboard_window import DashboardWindow
+from inventory import users
+from ui.db_calls import run_query
 
 
 class LoginWindow(QWidget):
@@ -44,20 +44,22 @@ class LoginWindow(QWidget):
         username = self.username_input.text()
         password = self.password_input.text()
 
-        # Query the database
-        conn = db_manager.get_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT * FROM users WHERE username=? AND password=?",
-            (username, password)
-        )
-        user = cursor.fetchone()
-        conn.close()
+        self.login_button.setEnabled(False)
+        run_query(self, users.authenticate, username, password, done=self.login_checked, failed=self.login_failed)
+        # Not needed for the login form itself; loaded while the password is checked
+        import ui.dashboard_window  # noqa: F401
 
+    def login_failed(self, message):
+        self.login_button.setEnabled(True)
+        QMessageBox.critical(self, "Error", f"Login failed:\n{message}")
+
+    def login_checked(self, user):
+        self.login_button.setEnabled(True)
         if user:
+            from ui.dashboard_window import DashboardWindow
+
             # Login successful → open dashboard with role
-            role = user[3]  # id, username, password, role
-            self.dashboard = DashboardWindow(username, role)
+            self.dashboard = DashboardWindow(user.username, user.role)
             self.dashboard.show()
             self.close()
         else:
@@ -66,7 +68,6 @@ class LoginWindow(QWidget):
 
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    window = LoginWindow()
-    window.show()
-    sys.exit(app.exec_())
+    # Same startup as `python main.py`: schema, database thread, warm-up, schedulers
+    from main import main
+    sys.exit(main())
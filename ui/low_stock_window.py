@@ -0,0 +1,141 @@
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QTableWidget, QTableWidgetItem,
+    QPushButton, QSpinBox, QHeaderView, QMessageBox
+)
+from PyQt5.QtCore import Qt, pyqtSignal
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from inventory import categories, products
+from models import events
+from ui.db_calls import run_query
+
+
+class LowStockWindow(QWidget):
+    """The products below their low stock threshold, and where those thresholds are set.
+
+    A product's own threshold (set in Add/Edit Product) wins over its
+    category's, which wins over the default.
+    """
+
+    stock_changed = pyqtSignal()  # carries product and restore events to the GUI thread
+
+    def __init__(self, editable=False):
+        super().__init__()
+        self.editable = editable
+        self.setWindowTitle("⚠️ Low Stock")
+        self.resize(600, 500)
+
+        layout = QVBoxLayout()
+
+        # Products below their threshold, furthest below first
+        layout.addWidget(QLabel("⚠️ Products below their low stock threshold"))
+        self.products_table = QTableWidget(0, 4)
+        self.products_table.setHorizontalHeaderLabels(["Name", "Category", "Quantity", "Threshold"])
+        self.products_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.products_table.verticalHeader().hide()
+        self.products_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        layout.addWidget(self.products_table)
+
+        # Thresholds (admin only)
+        self.default_input = QSpinBox()
+        self.default_input.setMaximum(1000000)
+        self.categories_table = QTableWidget(0, 2)
+        self.categories_table.setHorizontalHeaderLabels(["Category", "Low Stock Below"])
+        self.categories_table.verticalHeader().hide()
+        self.categories_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+
+        if editable:
+            default_layout = QHBoxLayout()
+            default_layout.addWidget(QLabel("Default threshold:"))
+            default_layout.addWidget(self.default_input)
+            layout.addLayout(default_layout)
+
+            layout.addWidget(QLabel("Category thresholds (\"Default\" uses the default threshold):"))
+            layout.addWidget(self.categories_table)
+
+            save_btn = QPushButton("💾 Save Thresholds")
+            save_btn.clicked.connect(self.save_thresholds)
+            layout.addWidget(save_btn)
+
+        self.setLayout(layout)
+
+        self.stock_changed.connect(self.load_low_stock)
+        events.subscribe(events.PRODUCT_CHANGED, self.on_product_changed)
+        events.subscribe(events.PRODUCTS_RELOADED, self.stock_changed.emit)
+        events.subscribe(events.DATABASE_RESTORED, self.stock_changed.emit)
+
+        self.load_low_stock()
+        if editable:
+            self.load_thresholds()
+
+    def closeEvent(self, event):
+        events.unsubscribe(events.PRODUCT_CHANGED, self.on_product_changed)
+        events.unsubscribe(events.PRODUCTS_RELOADED, self.stock_changed.emit)
+        events.unsubscribe(events.DATABASE_RESTORED, self.stock_changed.emit)
+        super().closeEvent(event)
+
+    def reopen(self):
+        events.subscribe(events.PRODUCT_CHANGED, self.on_product_changed)
+        events.subscribe(events.PRODUCTS_RELOADED, self.stock_changed.emit)
+        events.subscribe(events.DATABASE_RESTORED, self.stock_changed.emit)
+        self.load_low_stock()
+        if self.editable:
+            self.load_thresholds()
+
+    def on_product_changed(self, product_id, kind):
+        self.stock_changed.emit()
+
+    def load_low_stock(self):
+        run_query(self, products.low_stock, done=self.show_low_stock)
+
+    def show_low_stock(self, rows):
+        self.products_table.setRowCount(len(rows))
+        for row_idx, (_, name, category, quantity, threshold) in enumerate(rows):
+            values = [name, category or "Uncategorized", quantity, threshold]
+            for col, value in enumerate(values):
+                item = QTableWidgetItem(str(value))
+                item.setTextAlignment(Qt.AlignCenter)
+                self.products_table.setItem(row_idx, col, item)
+
+    def load_thresholds(self):
+        run_query(
+            self, lambda: (categories.default_threshold(), categories.list_categories()),
+            done=self.show_thresholds
+        )
+
+    def show_thresholds(self, thresholds):
+        default, saved = thresholds
+        self.default_input.setValue(default)
+
+        self.categories_table.setRowCount(len(saved))
+        for row_idx, category in enumerate(saved):
+            item = QTableWidgetItem(category.name)
+            item.setFlags(item.flags() & ~Qt.ItemIsEditable)
+            item.setData(Qt.UserRole, (category.id, category.low_stock_threshold))
+            self.categories_table.setItem(row_idx, 0, item)
+
+            spin = QSpinBox()
+            spin.setRange(-1, 1000000)
+            spin.setSpecialValueText("Default")
+            spin.setValue(-1 if category.low_stock_threshold is None else category.low_stock_threshold)
+            self.categories_table.setCellWidget(row_idx, 1, spin)
+
+    def save_thresholds(self):
+        per_category = {}
+        for row_idx in range(self.categories_table.rowCount()):
+            cat_id, _ = self.categories_table.item(row_idx, 0).data(Qt.UserRole)
+            threshold = self.categories_table.cellWidget(row_idx, 1).value()
+            per_category[cat_id] = None if threshold < 0 else threshold
+        # Only changed values are written; publishes PRODUCTS_RELOADED if any were
+        run_query(
+            self, categories.set_thresholds, self.default_input.value(), per_category,
+            done=self.thresholds_saved,
+            failed=lambda message: QMessageBox.critical(self, "Error", f"Failed to save thresholds:\n{message}")
+        )
+
+    def thresholds_saved(self, changed):
+        self.load_thresholds()
+        QMessageBox.information(self, "Saved", "Low stock thresholds saved.")
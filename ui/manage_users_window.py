@@ -2,16 +2,20 @@ from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem,
     QPushButton, QHBoxLayout, QLineEdit, QComboBox, QMessageBox
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, pyqtSignal
 import os
 import sys
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from models import db_manager
+from inventory import users
+from models import events
+from ui.db_calls import run_query
 
 
 class ManageUsersWindow(QWidget):
+    database_restored = pyqtSignal()  # carries events.DATABASE_RESTORED to the GUI thread
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Manage Users")
@@ -47,20 +51,31 @@ class ManageUsersWindow(QWidget):
 
         self.setLayout(layout)
 
+        self.database_restored.connect(self.load_users)
+        events.subscribe(events.DATABASE_RESTORED, self.database_restored.emit)
+
+        self.load_users()
+
+    def closeEvent(self, event):
+        events.unsubscribe(events.DATABASE_RESTORED, self.database_restored.emit)
+        super().closeEvent(event)
+
+    def reopen(self):
+        events.subscribe(events.DATABASE_RESTORED, self.database_restored.emit)
         self.load_users()
 
     def load_users(self):
-        conn = db_manager.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, username, role FROM users")
-        users = cursor.fetchall()
-        conn.close()
+        run_query(
+            self, users.list_users, done=self.show_users,
+            failed=lambda message: QMessageBox.critical(self, "Error", f"Failed to load users:\n{message}")
+        )
 
-        self.table.setRowCount(len(users))
+    def show_users(self, accounts):
+        self.table.setRowCount(len(accounts))
         self.table.setColumnCount(4)
         self.table.setHorizontalHeaderLabels(["ID", "Username", "Role", "Actions"])
 
-        for row_idx, (uid, uname, role) in enumerate(users):
+        for row_idx, (uid, uname, role) in enumerate(accounts):
             self.table.setItem(row_idx, 0, QTableWidgetItem(str(uid)))
             self.table.setItem(row_idx, 1, QTableWidgetItem(uname))
             self.table.setItem(row_idx, 2, QTableWidgetItem(role))
@@ -85,20 +100,17 @@ class ManageUsersWindow(QWidget):
             QMessageBox.warning(self, "Validation Error", "Username and password are required.")
             return
 
-        try:
-            conn = db_manager.get_connection()
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO users (username, password, role) VALUES (?, ?, ?)
-            """, (username, password, role))
-            conn.commit()
-            conn.close()
-            QMessageBox.information(self, "Success", f"User '{username}' added.")
-            self.username_input.clear()
-            self.password_input.clear()
-            self.load_users()
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to add user:\n{e}")
+        run_query(
+            self, users.add_user, username, password, role,
+            done=lambda _: self.user_added(username),
+            failed=lambda message: QMessageBox.critical(self, "Error", f"Failed to add user:\n{message}")
+        )
+
+    def user_added(self, username):
+        QMessageBox.information(self, "Success", f"User '{username}' added.")
+        self.username_input.clear()
+        self.password_input.clear()
+        self.load_users()
 
     def delete_user(self, user_id):
         confirm = QMessageBox.question(
@@ -110,13 +122,12 @@ class ManageUsersWindow(QWidget):
         if confirm != QMessageBox.Yes:
             return
 
-        try:
-            conn = db_manager.get_connection()
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM users WHERE id=?", (user_id,))
-            conn.commit()
-            conn.close()
-            QMessageBox.information(self, "Deleted", "User deleted.")
-            self.load_users()
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to delete user:\n{e}")
+        run_query(
+            self, users.delete_user, user_id,
+            done=self.user_deleted,
+            failed=lambda message: QMessageBox.critical(self, "Error", f"Failed to delete user:\n{message}")
+        )
+
+    def user_deleted(self, _):
+        QMessageBox.information(self, "Deleted", "User deleted.")
+        self.load_users()
@@ -0,0 +1,105 @@
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+import os
+import sqlite3
+import sys
+import threading
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from inventory import products
+from models import db_manager
+
+
+class ProductSearch(QObject):
+    """Runs product searches off the GUI thread and only reports the newest one.
+
+    Typing restarts a short timer, so a query is only issued once the user
+    pauses. Starting a new query interrupts the one still running, and results
+    tagged with an older generation number are dropped.
+    """
+
+    # search text, category id, first page of rows, paging key after that page
+    results_ready = pyqtSignal(str, object, list, object)
+    failed = pyqtSignal(str)
+
+    # emitted from the worker thread, delivered on the GUI thread
+    finished = pyqtSignal(int, str, object, list, object)
+    errored = pyqtSignal(int, str)
+
+    def __init__(self, page_size, delay_ms=250, parent=None):
+        super().__init__(parent)
+        self.page_size = page_size
+        self.generation = 0
+        self.pending = ("", None)
+
+        self.running = {}  # generation -> connection, for interrupting stale queries
+        self.lock = threading.Lock()
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay_ms)
+        self.timer.timeout.connect(self.start)
+
+        self.finished.connect(self.deliver)
+        self.errored.connect(self.deliver_error)
+
+    def request(self, search_text, category_id, immediate=False):
+        """Queue a search; it runs after the typing pause unless `immediate`."""
+        self.pending = (search_text, category_id)
+        if immediate:
+            self.timer.stop()
+            self.start()
+        else:
+            self.timer.start()
+
+    def start(self):
+        self.generation += 1
+        generation = self.generation
+        search_text, category_id = self.pending
+
+        with self.lock:
+            for conn in self.running.values():
+                conn.interrupt()
+
+        worker = threading.Thread(
+            target=self.run, args=(generation, search_text, category_id), daemon=True
+        )
+        worker.start()
+
+    def run(self, generation, search_text, category_id):
+        conn = db_manager.open_connection()
+        with self.lock:
+            self.running[generation] = conn
+        try:
+            rows, after = products.list_page(
+                search_text, category_id, None, self.page_size, conn=conn
+            )
+        except (sqlite3.Error, ValueError) as e:  # interrupted, or any other database or input error
+            self.errored.emit(generation, str(e))
+            return
+        finally:
+            with self.lock:
+                del self.running[generation]
+            conn.close()
+            # The category filter may have read through this thread's pooled connection
+            db_manager.release_connection()
+
+        self.finished.emit(generation, search_text, category_id, rows, after)
+
+    def deliver(self, generation, search_text, category_id, rows, after):
+        if generation == self.generation:
+            self.results_ready.emit(search_text, category_id, rows, after)
+
+    def deliver_error(self, generation, message):
+        # a stale query failing is just the interrupt doing its job
+        if generation == self.generation:
+            self.failed.emit(message)
+
+    def cancel(self):
+        """Stop the pending timer and interrupt whatever is still running."""
+        self.timer.stop()
+        self.generation += 1
+        with self.lock:
+            for conn in self.running.values():
+                conn.interrupt()
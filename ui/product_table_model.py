@@ -0,0 +1,261 @@
+from PyQt5.QtWidgets import QStyledItemDelegate, QStyleOptionButton, QStyle, QApplication
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QRect, QEvent, pyqtSignal
+from PyQt5.QtGui import QColor
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from inventory import products
+from models import events
+from ui.db_calls import run_query
+
+QUANTITY_COLUMN = 5
+LOW_COLUMN = 6  # listing rows end with the low-stock flag (db_manager.LISTING_COLUMNS)
+
+
+class ProductTableModel(QAbstractTableModel):
+    """Products table that pulls rows from SQLite one page at a time as the view scrolls.
+
+    Pages and changed rows are read on the database thread and applied when
+    they arrive.
+    """
+
+    headers = ["ID", "Name", "Category", "SKU", "Price", "Quantity", "Actions"]
+    page_size = 200
+
+    reload_needed = pyqtSignal()  # a change couldn't be patched in; reload the listing
+    failed = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+        self.search_text = ""
+        self.category_id = None
+        self.after = None  # paging key of the last loaded row
+        self.exhausted = True  # nothing to page through until a filter is set
+        self.loading = False
+        self.generation = 0  # bumped by set_filter(); results for older filters are dropped
+
+    @property
+    def actions_column(self):
+        return len(self.headers) - 1
+
+    def set_filter(self, search_text, category_id, first_page=None, after=None):
+        """Drop the loaded rows and start paging again with a new filter.
+
+        `first_page` and `after` are the already-fetched first page for this
+        filter and its paging key (from a background search), so the view can
+        show it without querying again.
+        """
+        self.beginResetModel()
+        self.search_text = search_text
+        self.category_id = category_id
+        self.rows = list(first_page or [])
+        self.after = after
+        self.exhausted = first_page is not None and len(first_page) < self.page_size
+        self.loading = False
+        self.generation += 1
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.headers[section]
+        if role == Qt.TextAlignmentRole and orientation == Qt.Horizontal:
+            return Qt.AlignCenter
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        row = self.rows[index.row()]
+        col = index.column()
+
+        if role == Qt.UserRole:
+            return row[0]  # product id, used by the action delegate
+        if col == self.actions_column:
+            return None
+        if role == Qt.DisplayRole:
+            return str(row[col])
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        if role == Qt.BackgroundRole and col == QUANTITY_COLUMN and self.is_low_stock(row):
+            return QColor(255, 200, 200)
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self.exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self.exhausted or self.loading:
+            return
+
+        self.loading = True
+        generation = self.generation
+        run_query(
+            self, products.list_page, self.search_text, self.category_id, self.after, self.page_size,
+            done=lambda result: self.add_page(generation, *result),
+            failed=lambda message: self.page_failed(generation, message)
+        )
+
+    def page_failed(self, generation, message):
+        if generation != self.generation:
+            return
+        self.loading = False
+        self.exhausted = True
+        self.failed.emit(message)
+
+    def add_page(self, generation, page, after):
+        if generation != self.generation:
+            return
+        self.loading = False
+        self.after = after
+        if len(page) < self.page_size:
+            self.exhausted = True
+        if not page:
+            return
+
+        start = len(self.rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(page) - 1)
+        self.rows.extend(page)
+        self.endInsertRows()
+
+    def apply_change(self, product_id, kind):
+        """Patch one product's row in place after an events.PRODUCT_CHANGED.
+
+        Emits `reload_needed` when the change can't be placed without knowing
+        the ranks of the loaded rows (a ranked search gained a match inside
+        the loaded range).
+        """
+        if kind == events.DELETED:
+            self.place_row(self.generation, product_id, None, None)
+            return
+        generation = self.generation
+        run_query(
+            self, products.get_row, product_id, self.search_text, self.category_id,
+            done=lambda result: self.place_row(generation, product_id, *result),
+            failed=self.failed.emit
+        )
+
+    def place_row(self, generation, product_id, row, rank):
+        if generation != self.generation:
+            return  # the listing was reloaded meanwhile and has the change already
+        if not self.patch_row(product_id, row, rank):
+            self.reload_needed.emit()
+
+    def patch_row(self, product_id, row, rank):
+        position = next((i for i, loaded in enumerate(self.rows) if loaded[0] == product_id), None)
+
+        if position is not None:
+            if row is None:  # deleted, or no longer matches the filter
+                self.beginRemoveRows(QModelIndex(), position, position)
+                del self.rows[position]
+                self.endRemoveRows()
+            else:
+                self.rows[position] = row
+                self.dataChanged.emit(
+                    self.index(position, 0), self.index(position, len(self.headers) - 1)
+                )
+            return True
+
+        if row is None:
+            return True
+        if rank is not None:
+            # A ranked row past the loaded pages arrives with the next fetchMore
+            return not self.exhausted and (rank, product_id) > self.after
+        if not self.exhausted and (self.after is None or product_id > self.after):
+            return True
+
+        # Rows are in id order; put the new one where the next reload would
+        position = next((i for i, loaded in enumerate(self.rows) if loaded[0] > product_id), len(self.rows))
+        self.beginInsertRows(QModelIndex(), position, position)
+        self.rows.insert(position, row)
+        self.endInsertRows()
+        if self.after is None or product_id > self.after:
+            self.after = product_id
+        return True
+
+    @staticmethod
+    def is_low_stock(row):
+        """Whether the product is in the low_stock set (below its own, its category's or the default threshold)."""
+        return bool(row[LOW_COLUMN])
+
+
+class ProductActionsDelegate(QStyledItemDelegate):
+    """Paints the Edit/Delete buttons for every row and turns clicks into signals.
+
+    One delegate serves the whole Actions column, so rows cost no widgets.
+    """
+
+    edit_requested = pyqtSignal(int)
+    delete_requested = pyqtSignal(int)
+
+    labels = ("✏️ Edit", "🗑️ Delete")
+    button_width = 100
+    button_height = 30
+    spacing = 5
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pressed = None  # (row, button index) while the mouse is held down
+
+    def button_rects(self, cell):
+        total_width = 2 * self.button_width + self.spacing
+        left = cell.x() + max(2, (cell.width() - total_width) // 2)
+        top = cell.y() + (cell.height() - self.button_height) // 2
+        return [
+            QRect(left, top, self.button_width, self.button_height),
+            QRect(left + self.button_width + self.spacing, top, self.button_width, self.button_height),
+        ]
+
+    def paint(self, painter, option, index):
+        style = option.widget.style() if option.widget else QApplication.style()
+        for button, (rect, label) in enumerate(zip(self.button_rects(option.rect), self.labels)):
+            button_option = QStyleOptionButton()
+            button_option.rect = rect
+            button_option.text = label
+            button_option.state = QStyle.State_Enabled
+            if self.pressed == (index.row(), button):
+                button_option.state |= QStyle.State_Sunken
+            else:
+                button_option.state |= QStyle.State_Raised
+            style.drawControl(QStyle.CE_PushButton, button_option, painter, option.widget)
+
+    def sizeHint(self, option, index):
+        size = super().sizeHint(option, index)
+        size.setWidth(2 * self.button_width + self.spacing + 4)
+        size.setHeight(self.button_height + 10)
+        return size
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() not in (QEvent.MouseButtonPress, QEvent.MouseButtonRelease):
+            return False
+
+        hit = None
+        for button, rect in enumerate(self.button_rects(option.rect)):
+            if rect.contains(event.pos()):
+                hit = button
+
+        if event.type() == QEvent.MouseButtonPress:
+            self.pressed = (index.row(), hit) if hit is not None else None
+            return hit is not None
+
+        was_pressed = self.pressed
+        self.pressed = None
+        if hit is None or was_pressed != (index.row(), hit):
+            return False
+
+        product_id = index.data(Qt.UserRole)
+        if hit == 0:
+            self.edit_requested.emit(product_id)
+        else:
+            self.delete_requested.emit(product_id)
+        return True
@@ -10,7 +10,8 @@ import sys
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from models import db_manager
+from inventory import users
+from ui.db_calls import run_query
 
 
 class UserManagementWindow(QWidget):
@@ -48,7 +49,13 @@ class UserManagementWindow(QWidget):
         self.load_users()
 
     def load_users(self):
-        self.users = db_manager.get_all_users()
+        run_query(
+            self, users.list_users, done=self.show_users,
+            failed=lambda message: QMessageBox.critical(self, "Error", f"Failed to load users:\n{message}")
+        )
+
+    def show_users(self, accounts):
+        self.users = accounts
         headers = ["ID", "Username", "Role", "Actions"]
 
         self.table.setColumnCount(len(headers))
@@ -95,23 +102,15 @@ class UserManagementWindow(QWidget):
         dialog = UserDialog()
         if dialog.exec_() == QDialog.Accepted:
             username, password, role = dialog.get_data()
-            try:
-                db_manager.add_user(username, password, role)
-                QMessageBox.information(self, "Success", "User added.")
-                self.load_users()
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Failed to add user:\n{e}")
+            self.run_change(users.add_user, "User added.", "Failed to add user", username, password, role)
 
     def edit_user_dialog(self, user_id):
         dialog = UserDialog(edit=True)
         if dialog.exec_() == QDialog.Accepted:
             password, role = dialog.get_data(edit=True)
-            try:
-                db_manager.update_user(user_id, password=password, role=role)
-                QMessageBox.information(self, "Success", "User updated.")
-                self.load_users()
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Failed to update user:\n{e}")
+            self.run_change(
+                users.update_user, "User updated.", "Failed to update user", user_id, password=password, role=role
+            )
 
     def delete_user(self, user_id):
         confirm = QMessageBox.question(
@@ -122,12 +121,18 @@ class UserManagementWindow(QWidget):
         )
 
         if confirm == QMessageBox.Yes:
-            try:
-                db_manager.delete_user(user_id)
-                QMessageBox.information(self, "Deleted", "User deleted.")
-                self.load_users()
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Failed to delete user:\n{e}")
+            self.run_change(users.delete_user, "User deleted.", "Failed to delete user", user_id)
+
+    def run_change(self, change, success, failure, *args, **kwargs):
+        """Run a user change on the database thread, then report it and reload the table."""
+        def changed(_):
+            QMessageBox.information(self, "Success", success)
+            self.load_users()
+
+        run_query(
+            self, change, *args, **kwargs,
+            done=changed, failed=lambda message: QMessageBox.critical(self, "Error", f"{failure}:\n{message}")
+        )
 
 
 class UserDialog(QDialog):
@@ -1,18 +1,26 @@
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QLabel, QTableWidget,
-    QTableWidgetItem, QPushButton, QHeaderView, QMessageBox
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QTableView, QPushButton, QHeaderView,
+    QMessageBox, QComboBox, QLineEdit, QDateEdit
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QDate, QTimer, pyqtSignal
 import os
 import sys
 
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from models import db_manager
+from inventory import logs
+from models import events
+from ui.db_calls import run_query
+from ui.log_table_model import LogTableModel
+
+# QDateEdit can't be empty; its minimum date stands for "no limit" and shows as "Any"
+NO_DATE = QDate(2000, 1, 1)
 
 
 class ViewLogsWindow(QWidget):
+    database_restored = pyqtSignal()  # carries events.DATABASE_RESTORED to the GUI thread
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("📜 Inventory Logs")
@@ -25,50 +33,124 @@ class ViewLogsWindow(QWidget):
         title_label.setAlignment(Qt.AlignCenter)
         layout.addWidget(title_label)
 
-        # Table
-        self.table = QTableWidget()
+        # Filters, applied in SQL
+        filter_layout = QHBoxLayout()
+        self.user_dropdown = QComboBox()
+        self.action_dropdown = QComboBox()
+        self.product_input = QLineEdit()
+        self.product_input.setPlaceholderText("🔍 Product name")
+        self.date_from = self.date_filter("From")
+        self.date_to = self.date_filter("To")
+
+        self.product_timer = QTimer(self)
+        self.product_timer.setSingleShot(True)
+        self.product_timer.setInterval(300)
+        self.product_timer.timeout.connect(self.load_logs)
+
+        filter_layout.addWidget(self.user_dropdown)
+        filter_layout.addWidget(self.action_dropdown)
+        filter_layout.addWidget(self.product_input)
+        filter_layout.addWidget(QLabel("From:"))
+        filter_layout.addWidget(self.date_from)
+        filter_layout.addWidget(QLabel("To:"))
+        filter_layout.addWidget(self.date_to)
+        layout.addLayout(filter_layout)
+
+        # Table; rows are fetched page by page as it scrolls
+        self.model = LogTableModel(self)
+        self.model.refreshed.connect(self.logs_refreshed)
+        self.model.failed.connect(self.show_error)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.verticalHeader().hide()
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         layout.addWidget(self.table)
 
         # Refresh Button
         refresh_btn = QPushButton("🔄 Refresh Logs")
-        refresh_btn.clicked.connect(self.load_logs)
+        refresh_btn.clicked.connect(self.refresh_logs)
         layout.addWidget(refresh_btn)
 
         self.setLayout(layout)
 
+        self.load_filter_choices()
+        self.user_dropdown.currentIndexChanged.connect(self.load_logs)
+        self.action_dropdown.currentIndexChanged.connect(self.load_logs)
+        self.product_input.textChanged.connect(self.product_timer.start)
+        self.date_from.dateChanged.connect(self.load_logs)
+        self.date_to.dateChanged.connect(self.load_logs)
+
+        self.database_restored.connect(self.reload_after_restore)
+        events.subscribe(events.DATABASE_RESTORED, self.database_restored.emit)
+
+        self.load_logs()
+
+    def closeEvent(self, event):
+        events.unsubscribe(events.DATABASE_RESTORED, self.database_restored.emit)
+        super().closeEvent(event)
+
+    def reopen(self):
+        events.subscribe(events.DATABASE_RESTORED, self.database_restored.emit)
+        self.reload_after_restore()
+
+    def date_filter(self, tooltip):
+        date_edit = QDateEdit()
+        date_edit.setCalendarPopup(True)
+        date_edit.setDisplayFormat("yyyy-MM-dd")
+        date_edit.setMinimumDate(NO_DATE)
+        date_edit.setSpecialValueText("Any")
+        date_edit.setDate(NO_DATE)
+        date_edit.setToolTip(f"{tooltip} date (UTC)")
+        return date_edit
+
+    def load_filter_choices(self):
+        run_query(
+            self, lambda: (logs.distinct_values("username"), logs.distinct_values("action")),
+            done=self.show_filter_choices, failed=self.show_error
+        )
+
+    def show_filter_choices(self, choices):
+        usernames, actions = choices
+        # Filling the dropdowns mustn't count as picking a filter
+        for dropdown in (self.user_dropdown, self.action_dropdown):
+            dropdown.blockSignals(True)
+            dropdown.clear()
+        self.user_dropdown.addItem("All Users", None)
+        for username in usernames:
+            self.user_dropdown.addItem(username, username)
+        self.action_dropdown.addItem("All Actions", None)
+        for action in actions:
+            self.action_dropdown.addItem(action, action)
+        for dropdown in (self.user_dropdown, self.action_dropdown):
+            dropdown.blockSignals(False)
+
+    def reload_after_restore(self):
+        self.load_filter_choices()
         self.load_logs()
 
+    def current_filters(self):
+        def date_text(date_edit):
+            date = date_edit.date()
+            return None if date == NO_DATE else date.toString("yyyy-MM-dd")
+
+        return {
+            "username": self.user_dropdown.currentData(),
+            "action": self.action_dropdown.currentData(),
+            "product": self.product_input.text().strip(),
+            "date_from": date_text(self.date_from),
+            "date_to": date_text(self.date_to),
+        }
+
     def load_logs(self):
-        try:
-            conn = db_manager.get_connection()
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT timestamp, username, action, product_name
-                FROM logs
-                ORDER BY timestamp DESC
-            """)
-            logs = cursor.fetchall()
-            conn.close()
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to load logs:\n{e}")
-            return
-
-        headers = ["Timestamp", "User", "Action", "Product Name"]
-
-        self.table.setColumnCount(len(headers))
-        self.table.setHorizontalHeaderLabels(headers)
-        self.table.setRowCount(len(logs))
-
-        header = self.table.horizontalHeader()
-        for col in range(len(headers)):
-            header.setSectionResizeMode(col, QHeaderView.Stretch)
-
-        if not logs:
-            QMessageBox.information(self, "Logs", "No logs found.")
-            return
-
-        for row_idx, row_data in enumerate(logs):
-            for col_idx, cell_data in enumerate(row_data):
-                item = QTableWidgetItem(str(cell_data))
-                item.setTextAlignment(Qt.AlignCenter)
-                self.table.setItem(row_idx, col_idx, item)
+        self.model.set_filters(**self.current_filters())
+
+    def refresh_logs(self):
+        # Only the rows logged since the last load are read
+        self.model.refresh()
+
+    def logs_refreshed(self, added):
+        if added:
+            self.table.scrollToTop()
+
+    def show_error(self, message):
+        QMessageBox.critical(self, "Error", f"Failed to load logs:\n{message}")
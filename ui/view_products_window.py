@@ -1,22 +1,28 @@
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QLabel, QTableWidget,
-    QTableWidgetItem, QPushButton, QMessageBox,
-    QHBoxLayout, QHeaderView, QLineEdit, QComboBox, QFileDialog
+    QWidget, QVBoxLayout, QLabel, QTableView, QPushButton, QMessageBox,
+    QHBoxLayout, QHeaderView, QLineEdit, QComboBox, QFileDialog, QProgressDialog
 )
-from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QColor
+from PyQt5.QtCore import Qt, pyqtSignal
 import os
 import sys
-import csv
 
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from models import db_manager
-from ui.edit_product_window import EditProductWindow
+from inventory import products
+from models import events
+from ui.category_model import category_filter_model
+from ui.db_calls import run_query
+from ui.product_table_model import ProductTableModel, ProductActionsDelegate
+from ui.product_search import ProductSearch
 
 
 class ViewProductsWindow(QWidget):
+    # events arrive on whichever thread made the change; these carry them to the GUI thread
+    product_changed = pyqtSignal(int, str)
+    products_reloaded = pyqtSignal()
+    database_restored = pyqtSignal()
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("View Products")
@@ -32,11 +38,12 @@ class ViewProductsWindow(QWidget):
         filter_layout = QHBoxLayout()
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("🔍 Search by Name or SKU")
-        self.search_input.textChanged.connect(self.load_products)
+        self.search_input.textChanged.connect(self.on_search_changed)
 
         self.category_dropdown = QComboBox()
-        self.category_dropdown.addItem("All Categories", None)
-        self.category_dropdown.currentIndexChanged.connect(self.load_products)
+        self.category_dropdown.setModel(category_filter_model())  # shared; "All Categories" first
+        self.category_dropdown.currentIndexChanged.connect(self.on_category_changed)
+        self.category_id = None
 
         filter_layout.addWidget(self.search_input)
         filter_layout.addWidget(self.category_dropdown)
@@ -44,12 +51,30 @@ class ViewProductsWindow(QWidget):
         layout.addLayout(filter_layout)
 
         # Table
-        self.table = QTableWidget()
+        self.model = ProductTableModel(self)
+        self.model.reload_needed.connect(self.load_products)
+        self.model.failed.connect(self.show_search_error)
+        self.search = ProductSearch(self.model.page_size, parent=self)
+        self.search.results_ready.connect(self.show_products)
+        self.search.failed.connect(self.show_search_error)
+        self.columns_sized = False
+
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.verticalHeader().setDefaultSectionSize(40)
+
+        # One shared delegate draws the Edit/Delete buttons for every row
+        self.actions_delegate = ProductActionsDelegate(self.table)
+        self.actions_delegate.edit_requested.connect(self.edit_product)
+        self.actions_delegate.delete_requested.connect(self.delete_product)
+        self.table.setItemDelegateForColumn(self.model.actions_column, self.actions_delegate)
         layout.addWidget(self.table)
 
         # Make headers resizable properly
         header = self.table.horizontalHeader()
         header.setSectionResizeMode(QHeaderView.Interactive)
+        header.setStretchLastSection(True)
+        header.setDefaultAlignment(Qt.AlignCenter)
 
         # Buttons below table
         btns_layout = QHBoxLayout()
@@ -59,110 +84,80 @@ class ViewProductsWindow(QWidget):
         export_btn = QPushButton("📄 Export to CSV")
         export_btn.clicked.connect(self.export_to_csv)
 
+        import_btn = QPushButton("📥 Import CSV")
+        import_btn.clicked.connect(self.import_from_csv)
+
         btns_layout.addWidget(refresh_btn)
         btns_layout.addWidget(export_btn)
+        btns_layout.addWidget(import_btn)
         btns_layout.addStretch()
         layout.addLayout(btns_layout)
 
         self.setLayout(layout)
 
-        # Load categories & products at start
-        self.load_categories()
-        self.load_products()
-
-    def load_categories(self):
-        conn = db_manager.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, name FROM categories")
-        categories = cursor.fetchall()
-        conn.close()
-
-        for cat_id, cat_name in categories:
-            self.category_dropdown.addItem(cat_name, cat_id)
-
-    def load_products(self):
-        self.products_data = []
-
-        search_text = self.search_input.text().strip()
-        selected_category = self.category_dropdown.currentData()
-
-        conn = db_manager.get_connection()
-        cursor = conn.cursor()
-
-        query = """
-            SELECT p.id, p.name, c.name as category, p.sku, p.price, p.quantity_in_stock
-            FROM products p
-            LEFT JOIN categories c ON p.category_id = c.id
-            WHERE 1=1
-        """
-        params = []
-
-        if search_text:
-            query += " AND (p.name LIKE ? OR p.sku LIKE ?)"
-            params.extend([f"%{search_text}%", f"%{search_text}%"])
-
-        if selected_category:
-            query += " AND p.category_id = ?"
-            params.append(selected_category)
-
-        cursor.execute(query, params)
-        products = cursor.fetchall()
-        conn.close()
-
-        self.products_data = products
-
-        headers = ["ID", "Name", "Category", "SKU", "Price", "Quantity", "Actions"]
-
-        self.table.setColumnCount(len(headers))
-        self.table.setHorizontalHeaderLabels(headers)
-        self.table.setRowCount(len(products))
-
-        header = self.table.horizontalHeader()
-        for col in range(len(headers) - 1):
-            header.setSectionResizeMode(col, QHeaderView.ResizeToContents)
-        header.setSectionResizeMode(len(headers) - 1, QHeaderView.Stretch)
-        self.table.horizontalHeader().setDefaultAlignment(Qt.AlignCenter)
-
-        low_stock_found = False
-
-        for row_idx, row_data in enumerate(products):
-            for col_idx, cell_data in enumerate(row_data):
-                item = QTableWidgetItem(str(cell_data))
-                item.setTextAlignment(Qt.AlignCenter)
-
-                # Highlight low stock
-                if col_idx == 5 and int(cell_data) < 5:
-                    item.setBackground(QColor(255, 200, 200))
-                    low_stock_found = True
-
-                self.table.setItem(row_idx, col_idx, item)
-
-            # Add Edit & Delete buttons
-            btn_layout = QHBoxLayout()
-            btn_layout.setContentsMargins(2, 2, 2, 2)
-            btn_layout.setSpacing(5)
+        # Patch the table when products change instead of reloading it
+        self.product_changed.connect(self.apply_product_change)
+        self.products_reloaded.connect(self.load_products)
+        events.subscribe(events.PRODUCT_CHANGED, self.product_changed.emit)
+        events.subscribe(events.PRODUCTS_RELOADED, self.products_reloaded.emit)
+        self.database_restored.connect(self.reload_after_restore)
+        events.subscribe(events.DATABASE_RESTORED, self.database_restored.emit)
 
-            edit_btn = QPushButton("✏️ Edit")
-            delete_btn = QPushButton("🗑️ Delete")
-
-            edit_btn.setFixedSize(100, 30)
-            delete_btn.setFixedSize(100, 30)
-
-            edit_btn.clicked.connect(lambda _, pid=row_data[0]: self.edit_product(pid))
-            delete_btn.clicked.connect(lambda _, pid=row_data[0]: self.delete_product(pid))
+        # Load products at start
+        self.load_products()
 
-            btn_layout.addWidget(edit_btn)
-            btn_layout.addWidget(delete_btn)
+    def reload_after_restore(self):
+        # The category list refreshes itself (ui/category_model.py)
+        self.category_dropdown.blockSignals(True)
+        self.category_dropdown.setCurrentIndex(0)
+        self.category_dropdown.blockSignals(False)
+        self.load_products()
 
-            btn_widget = QWidget()
-            btn_widget.setLayout(btn_layout)
+    def on_search_changed(self):
+        # Wait for a pause in typing before querying
+        self.search.request(self.search_input.text().strip(), self.category_dropdown.currentData())
 
-            self.table.setCellWidget(row_idx, len(headers) - 1, btn_widget)
+    def on_category_changed(self):
+        # A category added to the shared list shifts the index without changing the selection
+        if self.category_dropdown.currentData() != self.category_id:
+            self.load_products()
 
-            self.table.setRowHeight(row_idx, 40)
+    def load_products(self):
+        self.category_id = self.category_dropdown.currentData()
+        self.search.request(self.search_input.text().strip(), self.category_id, immediate=True)
+
+    def show_products(self, search_text, category_id, first_page, after):
+        # Further rows are fetched lazily by the model as the table scrolls
+        self.model.set_filter(search_text, category_id, first_page, after)
+        if not self.columns_sized:
+            self.table.resizeColumnsToContents()
+            self.columns_sized = True
+
+    def apply_product_change(self, product_id, kind):
+        self.model.apply_change(product_id, kind)
+
+    def show_search_error(self, message):
+        QMessageBox.critical(self, "Error", f"Failed to load products:\n{message}")
+
+    def closeEvent(self, event):
+        events.unsubscribe(events.PRODUCT_CHANGED, self.product_changed.emit)
+        events.unsubscribe(events.PRODUCTS_RELOADED, self.products_reloaded.emit)
+        events.unsubscribe(events.DATABASE_RESTORED, self.database_restored.emit)
+        self.search.cancel()
+        super().closeEvent(event)
+
+    def reopen(self):
+        # Shown again from the dashboard: listen again and catch up, keeping the filters
+        events.subscribe(events.PRODUCT_CHANGED, self.product_changed.emit)
+        events.subscribe(events.PRODUCTS_RELOADED, self.products_reloaded.emit)
+        events.subscribe(events.DATABASE_RESTORED, self.database_restored.emit)
+        self.load_products()
 
-        if low_stock_found:
-            QMessageBox.warning(self, "⚠️ Low Stock", "Some products have low stock (<5)!")
+    def select_category(self, category_id):
+        """Filter on a category (and its subcategories), e.g. when picked in the category tree."""
+        index = self.category_dropdown.findData(category_id)
+        if index >= 0:
+            self.category_dropdown.setCurrentIndex(index)
 
     def reset_filters(self):
         self.search_input.clear()
@@ -178,42 +173,106 @@ class ViewProductsWindow(QWidget):
         )
 
         if confirm == QMessageBox.Yes:
-            conn = db_manager.get_connection()
-            cursor = conn.cursor()
-
-            cursor.execute("SELECT name FROM products WHERE id=?", (product_id,))
-            result = cursor.fetchone()
-            product_name = result[0] if result else "Unknown"
-
-            cursor.execute("DELETE FROM products WHERE id=?", (product_id,))
-            conn.commit()
-            conn.close()
-
-            db_manager.log_action("admin", "Deleted", product_name)
+            run_query(
+                self, products.delete_product, "admin", product_id,
+                done=self.product_deleted,
+                failed=lambda message: QMessageBox.critical(self, "Error", f"Failed to delete product:\n{message}")
+            )
 
-            QMessageBox.information(self, "Deleted", f"Product '{product_name}' deleted successfully.")
-            self.load_products()
+    def product_deleted(self, product_name):
+        QMessageBox.information(self, "Deleted", f"Product '{product_name or 'Unknown'}' deleted successfully.")
 
     def edit_product(self, product_id):
+        from ui.edit_product_window import EditProductWindow
         self.edit_window = EditProductWindow(product_id, self)
         self.edit_window.show()
 
     def export_to_csv(self):
-        if not self.products_data:
+        from ui.workers import ProductExportWorker
+
+        formats = {
+            "CSV Files (*.csv)": ".csv",
+            "Compressed CSV (*.csv.gz)": ".csv.gz",
+            "Parquet Files (*.parquet)": ".parquet",
+            "Arrow Files (*.arrow)": ".arrow",
+        }
+        path, selected = QFileDialog.getSaveFileName(
+            self, "Save File", "products_export.csv", ";;".join(formats)
+        )
+        if not path:
+            return
+        extension = formats.get(selected, ".csv")
+        if not path.lower().endswith(extension):
+            path = os.path.splitext(path)[0] + extension
+
+        # Streams straight from the database with the current filters applied
+        self.export_progress = QProgressDialog("Exporting products…", "Cancel", 0, 100, self)
+        self.export_progress.setWindowModality(Qt.WindowModal)
+        self.export_progress.setMinimumDuration(0)
+
+        self.export_worker = ProductExportWorker(
+            path, self.search_input.text().strip(), self.category_dropdown.currentData(), self
+        )
+        self.export_worker.progress.connect(self.show_export_progress)
+        self.export_worker.done.connect(lambda rows: self.export_finished(path, rows))
+        self.export_worker.cancelled.connect(self.export_progress.close)
+        self.export_worker.failed.connect(self.export_failed)
+        self.export_progress.canceled.connect(self.export_worker.cancel)
+        self.export_worker.start()
+
+    def show_export_progress(self, rows, total):
+        self.export_progress.setLabelText(f"Exporting products… {rows:,} of {total:,}")
+        self.export_progress.setValue(int(rows * 100 / total) if total else 100)
+
+    def export_finished(self, path, rows):
+        self.export_progress.close()
+        if not rows:
             QMessageBox.warning(self, "No Data", "There is no data to export.")
             return
+        QMessageBox.information(self, "Exported", f"{rows:,} products exported to:\n{path}")
+
+    def export_failed(self, message):
+        self.export_progress.close()
+        QMessageBox.critical(self, "Error", f"Failed to export:\n{message}")
+
+    def import_from_csv(self):
+        from ui.workers import ProductImportWorker
 
-        path, _ = QFileDialog.getSaveFileName(self, "Save File", "products_export.csv", "CSV Files (*.csv)")
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Import Products", "", "Product Files (*.csv *.xlsx);;CSV Files (*.csv)"
+        )
         if not path:
             return
 
-        try:
-            with open(path, mode='w', newline='', encoding='utf-8') as file:
-                writer = csv.writer(file)
-                writer.writerow(["ID", "Name", "Category", "SKU", "Price", "Quantity"])
-                for row in self.products_data:
-                    writer.writerow(row)
-
-            QMessageBox.information(self, "Exported", f"Data exported to:\n{path}")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to export:\n{e}")
+        self.import_progress = QProgressDialog("Importing products…", "Cancel", 0, 100, self)
+        self.import_progress.setWindowModality(Qt.WindowModal)
+        self.import_progress.setMinimumDuration(0)
+
+        self.import_worker = ProductImportWorker(path, "admin", self)
+        self.import_worker.progress.connect(self.show_import_progress)
+        self.import_worker.done.connect(self.import_finished)
+        self.import_worker.failed.connect(self.import_failed)
+        self.import_progress.canceled.connect(self.import_worker.cancel)
+        self.import_worker.start()
+
+    def show_import_progress(self, rows, percent):
+        self.import_progress.setLabelText(f"Importing products… {rows:,} rows read")
+        self.import_progress.setValue(percent)
+
+    def import_finished(self, result):
+        self.import_progress.close()
+
+        summary = f"{result.inserted:,} added, {result.updated:,} updated."
+        if result.cancelled:
+            summary = "Import cancelled. " + summary
+        if result.error_count:
+            shown = "\n".join(f"Line {line}: {message}" for line, message in result.errors[:10])
+            summary += f"\n\n{result.error_count:,} row(s) skipped:\n{shown}"
+            if result.error_count > 10:
+                summary += "\n…"
+
+        QMessageBox.information(self, "Import Finished", summary)
+
+    def import_failed(self, message):
+        self.import_progress.close()
+        QMessageBox.critical(self, "Error", f"Import failed:\n{message}")
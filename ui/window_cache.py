@@ -0,0 +1,40 @@
+from PyQt5 import sip
+
+
+class WindowCache:
+    """Builds each window the first time it is asked for and shows that same window afterwards.
+
+    Clicking a dashboard button again raises the open window instead of
+    stacking a second copy. A window that was closed is shown again with its
+    filters and scroll position intact; its `reopen()` (if it has one) is
+    called first so it can catch up on changes it stopped listening for when
+    it closed. Windows without `reopen()` are rebuilt after being closed.
+    """
+
+    def __init__(self):
+        self.windows = {}
+
+    def show(self, key, factory):
+        """Show the window cached under `key`, building it with `factory()` if needed."""
+        window = self.windows.get(key)
+        if window is not None and sip.isdeleted(window):
+            window = None
+        if window is not None and window.isHidden():
+            if hasattr(window, "reopen"):
+                window.reopen()
+            else:
+                window.deleteLater()
+                window = None
+        if window is None:
+            window = self.windows[key] = factory()
+        window.show()
+        window.raise_()
+        window.activateWindow()
+        return window
+
+    def close_all(self):
+        for window in self.windows.values():
+            if not sip.isdeleted(window):
+                window.close()
+                window.deleteLater()
+        self.windows.clear()
@@ -0,0 +1,151 @@
+from PyQt5.QtCore import QThread, pyqtSignal
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models import backup_restore, db_manager, incremental_backup, product_exporter, product_importer
+
+
+class DatabaseWorker(QThread):
+    """Runs `work()` on its own thread, then closes the thread's pooled database connection."""
+
+    def __init__(self, work, parent=None):
+        super().__init__(parent)
+        self.work = work
+
+    def run(self):
+        try:
+            self.work()
+        finally:
+            db_manager.release_connection()
+
+
+class ProductImportWorker(DatabaseWorker):
+    """Runs a bulk product import off the GUI thread."""
+
+    progress = pyqtSignal(int, int)  # rows read, percent done
+    done = pyqtSignal(object)        # ImportResult
+    failed = pyqtSignal(str)
+
+    def __init__(self, path, username, parent=None):
+        super().__init__(self.import_products, parent)
+        self.path = path
+        self.username = username
+        self.cancelled = False
+
+    def cancel(self):
+        # Checked between batches; committed batches are kept
+        self.cancelled = True
+
+    def import_products(self):
+        try:
+            result = product_importer.import_products(
+                self.path,
+                self.username,
+                progress=lambda rows, fraction: self.progress.emit(rows, int(fraction * 100)),
+                is_cancelled=lambda: self.cancelled,
+            )
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.done.emit(result)
+
+
+class ProductExportWorker(DatabaseWorker):
+    """Streams a product export to a file off the GUI thread."""
+
+    progress = pyqtSignal(int, int)  # rows written, total rows
+    done = pyqtSignal(int)           # rows written
+    cancelled = pyqtSignal()
+    failed = pyqtSignal(str)
+
+    def __init__(self, path, search_text, category_id, parent=None):
+        super().__init__(self.export_products, parent)
+        self.path = path
+        self.search_text = search_text
+        self.category_id = category_id
+        self.cancel_requested = False
+
+    def cancel(self):
+        self.cancel_requested = True
+
+    def export_products(self):
+        try:
+            rows = product_exporter.export_products(
+                self.path,
+                self.search_text,
+                self.category_id,
+                progress=self.progress.emit,
+                is_cancelled=lambda: self.cancel_requested,
+            )
+        except product_exporter.ExportCancelled:
+            self.cancelled.emit()
+            return
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.done.emit(rows)
+
+
+class BackupWorker(DatabaseWorker):
+    """Takes an online database backup (a full copy or an incremental snapshot) off the GUI thread."""
+
+    progress = pyqtSignal(int)  # percent done
+    done = pyqtSignal(str)      # backup file path, or the snapshot id
+    cancelled = pyqtSignal()
+    failed = pyqtSignal(str)
+
+    def __init__(self, compression=None, incremental=False, parent=None):
+        super().__init__(self.take_backup, parent)
+        self.compression = compression
+        self.incremental = incremental
+        self.cancel_requested = False
+
+    def cancel(self):
+        self.cancel_requested = True
+
+    def take_backup(self):
+        progress = lambda fraction: self.progress.emit(int(fraction * 100))
+        is_cancelled = lambda: self.cancel_requested
+        try:
+            if self.incremental:
+                path = incremental_backup.take_snapshot(progress=progress, is_cancelled=is_cancelled)
+                incremental_backup.prune()
+            else:
+                path = backup_restore.backup_database(
+                    compression=self.compression, progress=progress, is_cancelled=is_cancelled
+                )
+        except backup_restore.BackupCancelled:
+            self.cancelled.emit()
+            return
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.done.emit(path)
+
+
+class RestoreWorker(DatabaseWorker):
+    """Validates a backup and swaps it in for the live database off the GUI thread."""
+
+    progress = pyqtSignal(int)  # percent done
+    done = pyqtSignal()
+    failed = pyqtSignal(str)
+
+    def __init__(self, path=None, snapshot_id=None, parent=None):
+        super().__init__(self.restore, parent)
+        self.path = path
+        self.snapshot_id = snapshot_id
+
+    def restore(self):
+        progress = lambda fraction: self.progress.emit(int(fraction * 100))
+        try:
+            if self.snapshot_id:
+                incremental_backup.restore_snapshot_to_live(self.snapshot_id, progress=progress)
+            else:
+                backup_restore.restore_database(self.path, progress=progress)
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.done.emit()
@@ -0,0 +1,51 @@
+"""Move old audit and stock log rows into the monthly archives now.
+
+The app already does this once a day in the background; run it by hand to
+apply new limits straight away, or to change them:
+
+    python utils/archive_logs.py                      # use the configured limits
+    python utils/archive_logs.py --days 180 --save    # keep 180 days from now on
+    python utils/archive_logs.py --max-rows 500000
+    python utils/archive_logs.py --enable-incremental-vacuum   # older databases, once
+"""
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models import db_manager, log_archive
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, help="archive rows older than this many days")
+    parser.add_argument("--max-rows", type=int, help="keep at most this many live rows per table")
+    parser.add_argument("--save", action="store_true", help="store --days/--max-rows as the new limits")
+    parser.add_argument(
+        "--enable-incremental-vacuum", action="store_true",
+        help="switch an older database to incremental vacuum (one full VACUUM; close the app first)"
+    )
+    args = parser.parse_args()
+
+    db_manager.create_tables()
+    if args.save:
+        if args.days is not None:
+            db_manager.set_setting("log_retention_days", args.days)
+        if args.max_rows is not None:
+            db_manager.set_setting("log_max_rows", args.max_rows)
+
+    days, max_rows = log_archive.retention_limits()
+    days = days if args.days is None else args.days
+    max_rows = max_rows if args.max_rows is None else args.max_rows
+    print(f"🗄️ Keeping {days} day(s), at most {max_rows:,} row(s) per table…")
+
+    archived = log_archive.run_retention(days, max_rows, convert_vacuum=args.enable_incremental_vacuum)
+    for table, count in archived.items():
+        print(f"   {table}: {count:,} row(s) archived")
+    print(f"✅ Archives in {log_archive.archive_dir()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
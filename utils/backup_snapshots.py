@@ -0,0 +1,54 @@
+"""Take, list, restore and prune incremental backup snapshots.
+
+Meant for a scheduler (cron / Task Scheduler) as well as by hand:
+
+    python utils/backup_snapshots.py take            # snapshot now, then prune
+    python utils/backup_snapshots.py list
+    python utils/backup_snapshots.py restore 20250710_153000_000000 restored.db
+    python utils/backup_snapshots.py prune --hourly 48 --daily 14 --weekly 8
+"""
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models import incremental_backup
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("take", help="snapshot the live database, then prune")
+    commands.add_parser("list", help="list snapshots, newest first")
+    restore = commands.add_parser("restore", help="rebuild a snapshot into a database file")
+    restore.add_argument("snapshot_id")
+    restore.add_argument("path")
+    prune = commands.add_parser("prune", help="delete snapshots the keep policy doesn't need")
+    for period, count in incremental_backup.DEFAULT_KEEP.items():
+        prune.add_argument(f"--{period}", type=int, default=count, help=f"default {count}")
+    args = parser.parse_args()
+
+    if args.command == "take":
+        snapshot_id = incremental_backup.take_snapshot()
+        snapshot = incremental_backup.load_snapshot(snapshot_id)
+        print(f"✅ Snapshot {snapshot_id}: {snapshot['new_chunks']} of {len(snapshot['chunks'])} chunks new, "
+              f"{snapshot['bytes_written'] / 1e6:.1f} MB written")
+        args.hourly, args.daily, args.weekly = (incremental_backup.DEFAULT_KEEP[period]
+                                                for period in ("hourly", "daily", "weekly"))
+
+    if args.command == "list":
+        for snapshot in incremental_backup.list_snapshots():
+            print(f"{snapshot['id']}  {snapshot['created']} UTC  {snapshot['size'] / 1e6:>9.1f} MB  "
+                  f"schema v{snapshot['schema_version']}")
+    elif args.command == "restore":
+        incremental_backup.restore_snapshot(args.snapshot_id, args.path)
+        print(f"✅ Snapshot {args.snapshot_id} restored to {args.path}")
+    else:
+        snapshots, chunks = incremental_backup.prune(args.hourly, args.daily, args.weekly)
+        print(f"🧹 Pruned {snapshots} snapshot(s) and {chunks} unused chunk(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,475 @@
+"""Time the app's real code paths against a synthetic inventory of a given size.
+
+Generates a database with the app's schema (tables + migrations, so the
+search index, stock triggers and log indexes are all there), then times:
+product listing/filter/search queries (including a category with its
+subcategories), the category tree, log listing and filters, the login
+lookup, add/edit/stock/delete with their log rows, CSV export, backup,
+verify and restore, and — unless --no-ui — the product, log and dashboard
+windows on the offscreen Qt platform. Runs headless on a plain Linux box.
+
+Each run appends one JSON line to --output (the commit, the dataset and,
+per benchmark, the median/p95/min/max in ms; by default to
+benchmarks/benchmark_results.jsonl, which git ignores), so results can be
+compared across commits; --compare checks this run against the previous one for the
+same dataset and exits with status 1 if anything got slower than --tolerance.
+
+    python utils/benchmark.py                          # 10k products, 100k log rows
+    python utils/benchmark.py --size 1m --compare      # 1M products, 10M log rows
+    python utils/benchmark.py --size 10m --database /data/bench-10m.db   # 10M / 100M, kept for reuse
+    python utils/benchmark.py --products 500000 --logs 20000000 --only products. logs.
+
+Generating the 10M/100M dataset takes a while and needs ~25 GB of disk;
+pass --database to keep it and skip generation on later runs.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from inventory import categories, logs, products, users
+from models import backup_restore, db_executor, db_manager, passwords, product_exporter
+
+RESULTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+# --size → (products, log rows)
+SIZES = {
+    "10k": (10_000, 100_000),
+    "1m": (1_000_000, 10_000_000),
+    "10m": (10_000_000, 100_000_000),
+}
+CATEGORIES = 50
+CATEGORY_GROUPS = 5  # top-level categories the others are nested under
+USERS = 20  # each one costs a password hash to create
+LOG_USERS = 20
+GENERATE_BATCH = 1_000_000  # rows per transaction, so the WAL stays small
+DATASET_SETTING = "benchmark_dataset"
+
+PRODUCT_WORDS = ("Laptop", "Cable", "Apple", "Chair", "Monitor", "Pencil", "Drill", "Kettle")
+PRODUCT_MODELS = ("Pro", "Mini", "Max", "Lite", "Plus", "Air")
+LOG_ACTIONS = ("Added", "Edited", "Deleted", "Stock Sold", "Stock Received")
+
+_app = None  # the offscreen QApplication, kept for the rest of the run once the UI benchmarks create it
+
+
+def _case(expression, values):
+    whens = " ".join(f"WHEN {i} THEN '{value}'" for i, value in enumerate(values))
+    return f"CASE ({expression}) % {len(values)} {whens} END"
+
+
+# 🏗️ Dataset
+
+def generate(product_count, log_count):
+    """Fill the (empty) database at db_manager.DB_PATH with synthetic rows."""
+    db_manager.create_tables()
+    with db_manager.connection() as conn:
+        conn.executemany(
+            "INSERT OR IGNORE INTO categories (name) VALUES (?)",
+            ((f"Category {i:02d}",) for i in range(CATEGORIES))
+        )
+        category_ids = [row[0] for row in conn.execute("SELECT id FROM categories ORDER BY id")]
+        groups = [
+            conn.execute("INSERT INTO categories (name) VALUES (?)", (f"Group {i}",)).lastrowid
+            for i in range(CATEGORY_GROUPS)
+        ]
+        conn.executemany(
+            "UPDATE categories SET parent_id=? WHERE id=?",
+            ((groups[i % CATEGORY_GROUPS], category_id) for i, category_id in enumerate(category_ids))
+        )
+        hashes = passwords.hash_many(f"password{i}" for i in range(USERS))
+        conn.executemany(
+            "INSERT OR IGNORE INTO users (username, password, role) VALUES (?, ?, 'user')",
+            ((f"user{i}", encoded) for i, encoded in enumerate(hashes))
+        )
+
+    # Rows come from a recursive CTE so millions of them don't cross into
+    # Python; the products triggers (search index, stock summary) still fire
+    name = (f"printf('%s %s %d', {_case('i', PRODUCT_WORDS)}, "
+            f"{_case(f'i / {len(PRODUCT_WORDS)}', PRODUCT_MODELS)}, i)")
+    for start in range(1, product_count + 1, GENERATE_BATCH):
+        end = min(start + GENERATE_BATCH - 1, product_count)
+        with db_manager.connection() as conn:
+            conn.execute(f"""
+                INSERT INTO products (name, category_id, sku, price, quantity_in_stock)
+                WITH RECURSIVE seq(i) AS (SELECT ? UNION ALL SELECT i + 1 FROM seq WHERE i < ?)
+                SELECT {name}, {category_ids[0]} + i % {len(category_ids)}, printf('SKU-%09d', i),
+                       (i % 100000) / 100.0, i % 60
+                FROM seq
+            """, (start, end))
+        print(f"   products {end:,}/{product_count:,}", end="\r", flush=True)
+
+    # A year of logs, oldest first, spread evenly
+    step = max(1, 365 * 24 * 3600 // max(log_count, 1))
+    start_time = int(datetime(2025, 1, 1, tzinfo=timezone.utc).timestamp())
+    for start in range(1, log_count + 1, GENERATE_BATCH):
+        end = min(start + GENERATE_BATCH - 1, log_count)
+        with db_manager.connection() as conn:
+            conn.execute(f"""
+                INSERT INTO logs (timestamp, username, action, product_name)
+                WITH RECURSIVE seq(i) AS (SELECT ? UNION ALL SELECT i + 1 FROM seq WHERE i < ?)
+                SELECT datetime({start_time} + i * {step}, 'unixepoch'), 'user' || (i % {LOG_USERS}),
+                       {_case('i', LOG_ACTIONS)}, 'Product ' || (1 + i % {max(product_count, 1)})
+                FROM seq
+            """, (start, end))
+        print(f"   log rows {end:,}/{log_count:,}   ", end="\r", flush=True)
+    print()
+
+    with db_manager.connection() as conn:
+        conn.execute("ANALYZE")
+    db_manager.set_setting(DATASET_SETTING, json.dumps(
+        {"products": product_count, "logs": log_count, "category_groups": CATEGORY_GROUPS}
+    ))
+
+
+def open_dataset(path, product_count, log_count):
+    """Point the app at `path`, generating the dataset there first if it is new.
+
+    Returns the seconds spent generating (0 when an existing one was reused).
+    """
+    exists = os.path.exists(path)
+    db_manager.set_database_path(path)
+    wanted = {"products": product_count, "logs": log_count, "category_groups": CATEGORY_GROUPS}
+    if exists:
+        db_manager.create_tables()
+        saved = db_manager.get_setting(DATASET_SETTING)
+        if saved is None or json.loads(saved) != wanted:
+            raise SystemExit(f"❌ {path} holds a different dataset ({saved}); use another --database.")
+        print(f"♻️ Reusing {path}")
+        return 0.0
+
+    print(f"🏗️ Generating {product_count:,} products and {log_count:,} log rows in {path}")
+    start = time.perf_counter()
+    generate(product_count, log_count)
+    return time.perf_counter() - start
+
+
+# ⏱️ Timing
+
+class Runner:
+    def __init__(self, only=None):
+        self.only = only or []
+        self.results = {}
+
+    def wanted(self, name):
+        return not self.only or any(name.startswith(prefix) for prefix in self.only)
+
+    def time(self, name, fn, repeat, warmup=1):
+        """Time `fn()` `repeat` times (after `warmup` untimed calls)."""
+        if not self.wanted(name):
+            return
+        for _ in range(warmup):
+            fn()
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - start) * 1000)
+        self.record(name, samples)
+
+    def record(self, name, samples, **extra):
+        samples = sorted(samples)
+        result = {
+            "runs": len(samples),
+            "median_ms": round(statistics.median(samples), 3),
+            "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+            "min_ms": round(samples[0], 3),
+            "max_ms": round(samples[-1], 3),
+            **extra,
+        }
+        self.results[name] = result
+        print(f"   {name:<38} {result['median_ms']:>10.2f} ms   (p95 {result['p95_ms']:.2f}, n={len(samples)})")
+
+
+def bench_reads(runner, product_count, repeat):
+    print("🔎 Reads")
+    def ids():
+        return random.randint(1, product_count)
+
+    runner.time("products.first_page", lambda: products.list_page(), repeat)
+    runner.time("products.deep_page", lambda: products.list_page(after=max(product_count - 500, 0)), repeat)
+    runner.time("products.category_page", lambda: products.list_page(category_id=7), repeat)
+    runner.time("products.search", lambda: products.list_page("aptop Pr"), repeat)
+    _, after = products.list_page("aptop Pr")
+    runner.time("products.search_next_page", lambda: products.list_page("aptop Pr", after=after), repeat)
+    runner.time("products.search_category", lambda: products.list_page("Cable", category_id=7), repeat)
+    group = categories.path(7)[0].id  # the top-level category 7 is nested under
+    runner.time("products.subtree_page", lambda: products.list_page(category_id=group), repeat)
+    runner.time("products.search_subtree", lambda: products.list_page("Cable", category_id=group), repeat)
+    runner.time("products.search_short_term", lambda: products.list_page("Mi"), repeat)
+    runner.time("products.get_row", lambda: products.get_row(ids(), "Laptop"), repeat)
+    runner.time("products.get_product", lambda: products.get_product(ids()), repeat)
+    runner.time("products.find_by_sku", lambda: products.find_by_sku(f"SKU-{ids():09d}"), repeat)
+    runner.time("products.stock_summary", products.stock_summary, repeat)
+    runner.time("products.low_stock", products.low_stock, repeat)
+    runner.time("categories.list", categories.list_categories, repeat)
+    runner.time("categories.children", lambda: (categories.children(), categories.children(group)), repeat)
+    runner.time("categories.path", lambda: categories.path(7), repeat)
+
+    runner.time("logs.first_page", lambda: logs.list_page(), repeat)
+    page, after = logs.list_page(limit=logs.MAX_PAGE_SIZE)
+    runner.time("logs.next_page", lambda: logs.list_page(after), repeat)
+    runner.time("logs.by_user", lambda: logs.list_page(username="user3"), repeat)
+    runner.time("logs.by_action_and_date",
+                lambda: logs.list_page(action="Edited", date_from="2025-03-01", date_to="2025-03-31"), repeat)
+    runner.time("logs.by_product", lambda: logs.list_page(product="Product 42"), repeat)
+    newest = logs.last_id()
+    runner.time("logs.new_since", lambda: logs.list_new(newest - 100), repeat)
+    runner.time("logs.filter_choices", lambda: (logs.distinct_values("username"), logs.distinct_values("action")), repeat)
+
+    # Cold: the password hash is derived; cached: verified earlier in this process
+    runner.time("users.login_cold", lambda: (passwords.clear_cache(), users.authenticate("user7", "password7")), repeat)
+    runner.time("users.login_cached", lambda: users.authenticate("user7", "password7"), repeat)
+    runner.time("users.login_unknown", lambda: users.authenticate("nobody", "x"), repeat)
+
+
+def bench_writes(runner, product_count, repeat):
+    """Add, edit, move stock and delete through the service, each with its log row."""
+    print("✏️ Writes")
+    added = []
+
+    def add():
+        added.append(products.add_product("bench", "Bench product", 1, "BENCH", 1.0, 5))
+
+    def edit():
+        products.update_product("bench", random.choice(added), "Bench product edited", 2, "BENCH-2", 2.0)
+
+    def move():
+        products.adjust_stock("bench", random.choice(added), random.choice((1, -1)), "Correction")
+
+    def delete():
+        products.delete_product("bench", added.pop())
+
+    # Log rows are written by a background batcher; waiting for it is part of the cost
+    for name, fn in (("writes.add_product", add), ("writes.update_product", edit),
+                     ("writes.adjust_stock", move), ("writes.delete_product", delete)):
+        if not runner.wanted(name):
+            continue
+        if not added and fn is not add:
+            for _ in range(repeat + 1):
+                add()
+        runner.time(name, lambda: fn(), repeat)
+        db_manager.flush_logs()
+    runner.time("writes.adjust_stock_until_logged", lambda: (products.adjust_stock("bench", 1, 1, "Correction"), db_manager.flush_logs()),
+                max(1, repeat // 10))
+    while added:
+        products.delete_product("bench", added.pop())
+
+    movements_per_batch = 500
+    if runner.wanted("writes.stock_batch"):
+        from inventory.records import Movement
+        batch = [Movement(1, "Received", product_id=random.randint(1, product_count))
+                 for _ in range(movements_per_batch)]
+        runner.time("writes.stock_batch", lambda: products.apply_movements("bench", batch), max(1, repeat // 10))
+        runner.results["writes.stock_batch"]["movements"] = movements_per_batch
+
+
+def bench_files(runner, tmp, product_count):
+    print("💾 Export, backup and restore")
+    path = os.path.join(tmp, "export.csv")
+    if runner.wanted("export.csv_all"):
+        start = time.perf_counter()
+        rows = product_exporter.export_products(path)
+        runner.record("export.csv_all", [(time.perf_counter() - start) * 1000], rows=rows)
+    if runner.wanted("export.csv_search"):
+        start = time.perf_counter()
+        rows = product_exporter.export_products(path, search_text="Kettle")
+        runner.record("export.csv_search", [(time.perf_counter() - start) * 1000], rows=rows)
+    if os.path.exists(path):
+        os.remove(path)
+
+    if not any(runner.wanted(name) for name in ("backup.full", "backup.verify", "backup.restore")):
+        return
+    backup_dir = os.path.join(tmp, "backups")
+    start = time.perf_counter()
+    backup_path = backup_restore.backup_database(backup_dir)
+    runner.record("backup.full", [(time.perf_counter() - start) * 1000], bytes=os.path.getsize(backup_path))
+    start = time.perf_counter()
+    backup_restore.verify_backup(backup_path)
+    runner.record("backup.verify", [(time.perf_counter() - start) * 1000])
+    start = time.perf_counter()
+    backup_restore.restore_database(backup_path)
+    runner.record("backup.restore", [(time.perf_counter() - start) * 1000])
+
+
+def bench_ui(runner, repeat):
+    """Open the main windows offscreen and time how long until they show data."""
+    from PyQt5.QtWidgets import QApplication
+    from ui.dashboard_window import DashboardWindow
+    from ui.view_logs_window import ViewLogsWindow
+    from ui.view_products_window import ViewProductsWindow
+
+    global _app
+    print("🖥️ Windows (offscreen)")
+    # Shared Qt objects (e.g. the category model) live as long as the
+    # application, and later benchmarks still publish events to them
+    app = _app = QApplication.instance() or QApplication([])
+
+    def wait_for(condition, timeout=120):
+        deadline = time.perf_counter() + timeout
+        while not condition():
+            if time.perf_counter() > deadline:
+                raise TimeoutError("window never showed its data")
+            app.processEvents()
+            time.sleep(0.001)
+
+    def open_window(factory, loaded):
+        window = factory()
+        window.show()
+        wait_for(lambda: loaded(window))
+        window.close()
+        window.deleteLater()
+        app.processEvents()
+
+    runner.time("ui.view_products_open",
+                lambda: open_window(ViewProductsWindow, lambda w: w.model.rowCount() > 0), repeat)
+    runner.time("ui.view_logs_open",
+                lambda: open_window(ViewLogsWindow, lambda w: w.model.rowCount() > 0), repeat)
+    def dashboard():
+        window = DashboardWindow("admin", "admin")
+        window.summary_shown = False
+        window.stock_summary_shown.connect(lambda: setattr(window, "summary_shown", True))
+        return window
+
+    runner.time("ui.dashboard_open", lambda: open_window(dashboard, lambda w: w.summary_shown), repeat)
+
+    if runner.wanted("ui.products_scroll_10_pages"):
+        window = ViewProductsWindow()
+        window.show()
+        wait_for(lambda: window.model.rowCount() > 0)
+        start = time.perf_counter()
+        target = window.model.page_size * 10
+        while window.model.rowCount() < target and window.model.canFetchMore():
+            window.model.fetchMore()
+            wait_for(lambda: not window.model.loading)
+        runner.record("ui.products_scroll_10_pages", [(time.perf_counter() - start) * 1000])
+        window.close()
+        app.processEvents()
+    db_executor.flush()
+
+
+# 📈 Results
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def previous_run(output, dataset):
+    """The last record in `output` for the same dataset, or None."""
+    if not os.path.exists(output):
+        return None
+    previous = None
+    with open(output, encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                record = json.loads(line)
+                if record.get("dataset") == dataset:
+                    previous = record
+    return previous
+
+
+def compare(previous, results, tolerance, slack_ms=0.5):
+    """Print how each median moved since `previous`. Returns the names that regressed."""
+    print(f"📈 Against {previous.get('commit') or 'the previous run'} ({previous['timestamp']}):")
+    regressed = []
+    for name, result in results.items():
+        before = previous["results"].get(name)
+        if not before:
+            continue
+        old, new = before["median_ms"], result["median_ms"]
+        ratio = new / old if old else float("inf")
+        slower = new > old * (1 + tolerance) and new - old > slack_ms
+        if slower:
+            regressed.append(name)
+        print(f"   {'❌' if slower else '  '} {name:<38} {old:>10.2f} → {new:>10.2f} ms  ({ratio:.2f}x)")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", choices=SIZES, default="10k", help="preset dataset size (default: 10k)")
+    parser.add_argument("--products", type=int, help="number of products (overrides --size)")
+    parser.add_argument("--logs", type=int, help="number of log rows (overrides --size)")
+    parser.add_argument("--database", help="keep the generated database here and reuse it on later runs")
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per query (writes: 10x this)")
+    parser.add_argument("--only", nargs="*", help="only benchmarks whose name starts with one of these")
+    parser.add_argument("--no-ui", action="store_true", help="skip the Qt window benchmarks")
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "benchmark_results.jsonl"),
+                        help="JSON lines file to append to")
+    parser.add_argument("--compare", action="store_true", help="compare with the previous run on this dataset")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown for --compare (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    product_count, log_count = SIZES[args.size]
+    product_count = args.products if args.products is not None else product_count
+    log_count = args.logs if args.logs is not None else log_count
+    dataset = {"products": product_count, "logs": log_count}
+    runner = Runner(args.only)
+    random.seed(42)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.abspath(args.database) if args.database else os.path.join(tmp, "bench.db")
+        generate_seconds = open_dataset(path, product_count, log_count)
+        if generate_seconds:
+            print(f"   generated in {generate_seconds:.1f}s")
+
+        bench_reads(runner, product_count, args.repeat)
+        if not args.no_ui:
+            bench_ui(runner, max(1, args.repeat // 4))
+        bench_writes(runner, product_count, args.repeat * 10)
+        bench_files(runner, tmp, product_count)
+
+        db_executor.flush()
+        db_manager.flush_logs()
+        database_bytes = os.path.getsize(path)
+        db_manager.close_all_connections()
+
+    record = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "dataset": dataset,
+        "database_bytes": database_bytes,
+        "generate_seconds": round(generate_seconds, 1),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "results": runner.results,
+    }
+
+    status = 0
+    if args.compare:
+        previous = previous_run(args.output, dataset)
+        if previous is None:
+            print("📈 No earlier run on this dataset to compare with.")
+        else:
+            regressed = compare(previous, runner.results, args.tolerance)
+            if regressed:
+                print(f"❌ {len(regressed)} benchmark(s) slower than {args.tolerance:.0%}: {', '.join(regressed)}")
+                status = 1
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "a", encoding="utf-8") as file:
+        file.write(json.dumps(record) + "\n")
+    print(f"✅ Results appended to {args.output}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
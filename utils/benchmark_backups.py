@@ -0,0 +1,113 @@
+"""Compare full backups with incremental snapshots: bytes written and time taken.
+
+Builds a throwaway copy of the database with `--products` products and
+`--logs` log rows, then takes `--rounds` backups of each kind, changing a
+little data between them the way a working day would (a few edits, new log
+rows). Results are printed and written as JSON (by default to
+benchmarks/backup_benchmark.json, which git ignores).
+
+    python utils/benchmark_backups.py
+    python utils/benchmark_backups.py --products 200000 --logs 2000000 --rounds 5
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models import backup_restore, db_manager, incremental_backup
+
+RESULTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+
+def build_database(products, logs):
+    db_manager.create_tables()
+    with db_manager.connection() as conn:
+        conn.executemany(
+            "INSERT INTO products (name, category_id, sku, price, quantity_in_stock) VALUES (?, NULL, ?, ?, ?)",
+            ((f"Product {i}", f"SKU-{i}", 9.99, i % 100) for i in range(products))
+        )
+        conn.executemany(
+            "INSERT INTO logs (timestamp, username, action, product_name) VALUES (?, 'admin', 'Edited', ?)",
+            ((f"2025-01-01 00:00:{i % 60:02d}", f"Product {i % products}") for i in range(logs))
+        )
+    # Into the main file, so its size is the database's
+    db_manager.get_connection().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+
+def simulate_changes(products, edits=200, new_logs=5000):
+    with db_manager.connection() as conn:
+        conn.executemany(
+            "UPDATE products SET quantity_in_stock = quantity_in_stock + 1 WHERE id = ?",
+            ((random.randint(1, products),) for _ in range(edits))
+        )
+        conn.executemany(
+            "INSERT INTO logs (timestamp, username, action, product_name) VALUES (datetime('now'), 'admin', 'Edited', 'x')",
+            (() for _ in range(new_logs))
+        )
+    db_manager.get_connection().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--products", type=int, default=100000)
+    parser.add_argument("--logs", type=int, default=1000000)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "backup_benchmark.json"))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_manager.set_database_path(os.path.join(tmp, "bench.db"))
+        build_database(args.products, args.logs)
+        database_size = os.path.getsize(db_manager.DB_PATH)
+        print(f"📦 Database: {database_size / 1e6:.1f} MB")
+
+        results = {"database_bytes": database_size, "full": [], "incremental": []}
+        full_dir = os.path.join(tmp, "full")
+        store_dir = os.path.join(tmp, "incremental")
+
+        for round_number in range(args.rounds):
+            if round_number:
+                simulate_changes(args.products)
+
+            start = time.perf_counter()
+            path = backup_restore.backup_database(full_dir)
+            results["full"].append({"seconds": time.perf_counter() - start, "bytes_written": os.path.getsize(path)})
+            os.remove(path)  # keep one at a time; the next second's name would differ anyway
+
+            start = time.perf_counter()
+            snapshot_id = incremental_backup.take_snapshot(store_dir)
+            snapshot = incremental_backup.load_snapshot(snapshot_id, store_dir)
+            results["incremental"].append({
+                "seconds": time.perf_counter() - start,
+                "bytes_written": snapshot["bytes_written"],
+                "new_chunks": snapshot["new_chunks"],
+                "chunks": len(snapshot["chunks"]),
+            })
+            time.sleep(1)  # full backups are named by the second
+
+        start = time.perf_counter()
+        incremental_backup.restore_snapshot(snapshot_id, os.path.join(tmp, "restored.db"), store_dir)
+        results["restore_seconds"] = time.perf_counter() - start
+        db_manager.close_all_connections()
+
+    print(f"{'round':>5} {'full MB':>9} {'full s':>7} {'incr MB':>9} {'incr s':>7} {'new chunks':>11}")
+    for number, (full, incremental) in enumerate(zip(results["full"], results["incremental"]), start=1):
+        print(f"{number:>5} {full['bytes_written'] / 1e6:>9.1f} {full['seconds']:>7.2f} "
+              f"{incremental['bytes_written'] / 1e6:>9.1f} {incremental['seconds']:>7.2f} "
+              f"{incremental['new_chunks']:>5}/{incremental['chunks']:<5}")
+    print(f"♻️ Restoring the last snapshot took {results['restore_seconds']:.2f}s")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=2)
+    print(f"✅ Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""Login latency at different password hashing costs.
+
+For each cost setting, stores a user's password hashed at that cost in a
+throwaway database and times `inventory.users.authenticate()`:
+
+- cold: the key is derived (first login of a session, or after a restart)
+- cached: the same credentials again in the same process
+- wrong password, and an unknown username (which should cost the same as cold)
+
+Pick the highest cost whose cold login is still acceptable for a person at
+the login window; the cached path is what the HTTP API pays per request.
+Results are printed and written as JSON (by default to
+benchmarks/login_benchmark.json, which git ignores).
+
+    python utils/benchmark_login.py
+    python utils/benchmark_login.py --repeat 20 --output /tmp/login.json
+"""
+import argparse
+import hashlib
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from inventory import users
+from models import db_manager, passwords
+
+RESULTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+# (scheme, parameters); parameters not given keep the current defaults
+COSTS = [
+    (passwords.SCRYPT, {"n": 2 ** 12}),
+    (passwords.SCRYPT, {"n": 2 ** 13}),
+    (passwords.SCRYPT, {"n": 2 ** 14}),
+    (passwords.SCRYPT, {"n": 2 ** 15}),
+    (passwords.SCRYPT, {"n": 2 ** 16}),
+    (passwords.SCRYPT, {"n": 2 ** 17}),
+    (passwords.PBKDF2, {"iterations": 100_000}),
+    (passwords.PBKDF2, {"iterations": 310_000}),
+    (passwords.PBKDF2, {"iterations": 600_000}),
+]
+
+
+def time_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(samples), 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="timed logins per measurement")
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "login_benchmark.json"))
+    args = parser.parse_args()
+
+    if not hasattr(hashlib, "scrypt"):
+        print("⚠️ This Python's hashlib has no scrypt; only PBKDF2 is measured.")
+    costs = [(scheme, params) for scheme, params in COSTS
+             if scheme == passwords.PBKDF2 or passwords.DEFAULT_SCHEME == passwords.SCRYPT]
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        db_manager.set_database_path(os.path.join(tmp, "login.db"))
+        db_manager.create_tables()
+        users.add_user("bench", "correct horse")
+        user_id = next(user.id for user in users.list_users() if user.username == "bench")
+
+        for scheme, params in costs:
+            encoded = passwords.hash_password("correct horse", scheme, **params)
+            db_manager.set_password_hash(user_id, encoded)
+            # Keep authenticate() from "upgrading" the row to the default cost mid-run
+            rehash = passwords.needs_rehash
+            passwords.needs_rehash = lambda _: False
+            try:
+                cold = time_ms(lambda: (passwords.clear_cache(), users.authenticate("bench", "correct horse")),
+                               args.repeat)
+                users.authenticate("bench", "correct horse")
+                cached = time_ms(lambda: users.authenticate("bench", "correct horse"), args.repeat * 20)
+                wrong = time_ms(lambda: users.authenticate("bench", "wrong"), args.repeat)
+            finally:
+                passwords.needs_rehash = rehash
+            setting = ", ".join(f"{name}={value}" for name, value in passwords.parse(encoded)[1].items())
+            results.append({"scheme": scheme, "params": passwords.parse(encoded)[1], "cold_ms": cold,
+                            "cached_ms": cached, "wrong_password_ms": wrong})
+            print(f"   {scheme:<14} {setting:<24} cold {cold:>8.1f} ms   cached {cached:>6.3f} ms   "
+                  f"wrong password {wrong:>8.1f} ms")
+
+        unknown = time_ms(lambda: users.authenticate("nobody", "x"), args.repeat)
+        print(f"   unknown username (current default cost): {unknown:.1f} ms")
+        db_manager.close_all_connections()
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump({"default": {"scheme": passwords.DEFAULT_SCHEME, "params": passwords.current_params()},
+                   "unknown_user_ms": unknown, "costs": results}, file, indent=2)
+    print(f"✅ Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
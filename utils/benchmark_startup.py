@@ -0,0 +1,126 @@
+"""Startup time: what is imported before the login form appears, and how long until it is painted.
+
+Two measurements, each in a fresh interpreter:
+
+- `python -X importtime` over the login window's imports: the total, the
+  slowest modules, and any module from LAZY that crept back into startup
+  (those belong behind the first click that needs them).
+- Time to first paint: `python main.py` is launched on the offscreen Qt
+  platform (no display needed) and quits at the login window's first paint,
+  reporting its startup phases. The median over `--repeat` launches is
+  checked against `--budget-ms`; the exit status is 1 if it is over budget
+  or a LAZY module is imported at startup.
+
+    python utils/benchmark_startup.py
+    python utils/benchmark_startup.py --repeat 10 --budget-ms 400
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+
+from models import db_manager
+
+DEFAULT_BUDGET_MS = 250
+
+# Imported on first use, never before the login form is shown
+LAZY = [
+    "ui.dashboard_window", "ui.view_products_window", "ui.add_product_window", "ui.view_logs_window",
+    "ui.manage_users_window", "ui.low_stock_window", "ui.edit_product_window", "ui.workers",
+    "ui.category_tree_window", "ui.category_model",
+    "models.backup_restore", "models.incremental_backup", "models.product_exporter",
+    "models.product_importer", "csv", "asyncio",
+]
+
+def startup_imports():
+    """(total µs, [(cumulative µs, module)] of the login window's imports."""
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import ui.login_window"],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules.append((int(cumulative), name.strip()))
+    total = next(cumulative for cumulative, name in reversed(modules) if name == "ui.login_window")
+    return total, modules
+
+
+def first_paint(database):
+    """{phase: ms} of one launch of main.py, plus `interpreter` (before main.py ran) and `total`."""
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    command = [sys.executable, os.path.join(ROOT, "main.py"), "--database", database,
+               "--timings", "json", "--exit-after-first-paint"]
+    start = time.perf_counter()
+    result = subprocess.run(command, cwd=ROOT, env=env, capture_output=True, text=True, timeout=60)
+    total = (time.perf_counter() - start) * 1000
+    lines = [line for line in result.stdout.splitlines() if line.startswith("{")]
+    if result.returncode or not lines:
+        raise RuntimeError(f"Login window was never painted:\n{result.stderr.strip()}")
+    phases = {entry["phase"]: entry["ms"] for entry in json.loads(lines[-1])["phases"]
+              if not entry["background"]}
+    phases["interpreter"] = total - phases["first paint"]
+    phases["total"] = total
+    return phases
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="launches to time")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help="time-to-first-paint budget for the median launch")
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    parser.add_argument("--output", help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    failed = False
+
+    total_us, modules = startup_imports()
+    print(f"📦 Imports before the login form: {total_us / 1000:.1f} ms ({len(modules)} modules)")
+    for cumulative, name in sorted(modules, reverse=True)[1:args.top + 1]:
+        print(f"   {cumulative / 1000:8.1f} ms   {name}")
+    eager = [name for name in LAZY if any(module == name for _, module in modules)]
+    for name in eager:
+        print(f"❌ {name} is imported at startup; import it where it is first needed")
+        failed = True
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # A copy, migrated once up front, so every launch does the usual no-op schema check
+        database = os.path.join(tmp, "startup.db")
+        shutil.copy2(db_manager.DB_PATH, database)
+        db_manager.set_database_path(database)
+        db_manager.create_tables()
+        db_manager.close_all_connections()
+
+        runs = [first_paint(database) for _ in range(args.repeat)]
+
+    phases = {name: statistics.median(run[name] for run in runs) for name in runs[0]}
+    print(f"🖼️ Time to first paint (median of {args.repeat}): {phases['total']:.0f} ms")
+    for name in ["interpreter", *(name for name in runs[0] if name not in ("interpreter", "first paint", "total"))]:
+        print(f"   {name:<20} {phases[name]:8.1f} ms")
+    if phases["total"] > args.budget_ms:
+        print(f"❌ Over the {args.budget_ms:.0f} ms budget")
+        failed = True
+    else:
+        print(f"✅ Within the {args.budget_ms:.0f} ms budget")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump({"imports_ms": total_us / 1000, "eager_imports": eager, "first_paint_ms": phases,
+                       "budget_ms": args.budget_ms}, file, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,252 @@
+"""Fail if any query the app issues falls back to a full table scan.
+
+Builds a throwaway database with the current schema (tables + migrations),
+runs `EXPLAIN QUERY PLAN` on every query in `queries()` and exits with status 1
+if a plan contains a bare `SCAN <table>` or sorts through a temp B-tree,
+unless that query explicitly allows it.
+
+Run it after changing the schema or adding a query:
+
+    python utils/check_query_plans.py
+
+The product listing and log viewer queries come from the app's own builders
+(db_manager.build_products_page_query, build_logs_page_query, ...), run with
+every combination of their filters, so new filters are checked as they are
+added. Statements the app writes out inline are listed in `statements()`;
+when you add one of those, add it there too.
+"""
+import itertools
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from inventory import logs, products
+from models import db_manager, log_archive
+
+# main() nests LEAF (no subcategories of its own) under PARENT
+PARENT = 1
+LEAF = 3
+ARCHIVE_MONTH = "2025-01"  # attached while checking, for the archived log queries
+
+# (label, search text) and (label, category id) the product queries are built with
+PRODUCT_SEARCHES = [("", None), ("short search", "la"), ("search", "lap")]
+PRODUCT_CATEGORIES = [("", None), ("category", LEAF), ("category and subcategories", PARENT)]
+
+# (label, filters) the log queries are built with, in every combination
+LOG_FILTERS = [
+    ("user", {"username": "admin"}),
+    ("action", {"action": "Added"}),
+    ("product", {"product": "bat"}),
+    ("dates", {"date_from": "2025-07-01", "date_to": "2025-07-31"}),
+]
+LOG_TABLES = [("Log list", "logs"), ("Archived log list", f"{log_archive.ARCHIVE_ALIAS}.logs")]
+
+
+def product_queries():
+    """Every product listing, refresh, export and count query, for every filter combination.
+
+    A query may read every product only when nothing narrows it down through
+    an index. Ranked searches sort their matches by rank, and a category with
+    subcategories sorts the ids it collects from the closure table; nothing
+    else sorts.
+    """
+    for (searched, search_text), (filtered, category_id) in itertools.product(
+            PRODUCT_SEARCHES, PRODUCT_CATEGORIES):
+        label = ", ".join(part for part in (searched, filtered) if part) or "all products"
+        ranked = bool(search_text) and len(search_text) >= db_manager.FTS_MIN_TERM_LENGTH
+        scans = ("p",) if not ranked and category_id is None else ()
+        sorted_ = ranked or category_id == PARENT
+
+        query, params, _ = db_manager.build_products_page_query(search_text, category_id)
+        yield f"Product list, {label}", (query, params), scans, sorted_
+        after = (-1.0, 10) if ranked else 200
+        query, params, _ = db_manager.build_products_page_query(search_text, category_id, after)
+        yield f"Product list, {label}, next page", (query, params), scans, sorted_
+        query, params, _ = db_manager.build_product_row_query(1, search_text, category_id)
+        yield f"Refresh one changed product, {label}", (query, params), (), False
+        yield (f"Export products, {label}",
+               db_manager.build_products_query(search_text, category_id), scans, sorted_)
+        yield (f"Export count, {label}",
+               db_manager.build_products_count_query(search_text, category_id), scans, False)
+
+
+def log_queries():
+    """Every log viewer query, for every combination of its filters, on the live table and an archive."""
+    for size in range(len(LOG_FILTERS) + 1):
+        for combination in itertools.combinations(LOG_FILTERS, size):
+            label = " and ".join(name for name, _ in combination) or "unfiltered"
+            filters = {key: value for _, values in combination for key, value in values.items()}
+            for caption, table in LOG_TABLES:
+                yield (f"{caption}, {label}",
+                       db_manager.build_logs_page_query(table=table, **filters), (), False)
+                yield (f"{caption}, {label}, next page",
+                       db_manager.build_logs_page_query(("2025-07-10 15:34:53", 8), table=table, **filters),
+                       (), False)
+            # sorts only the rows newer than the last load
+            yield f"Log refresh, {label}", db_manager.build_new_logs_query(8, **filters), (), True
+
+    for column in logs.FILTER_COLUMNS:
+        for caption, table in LOG_TABLES:
+            # "seen" is the CTE's own handful of rows
+            yield (f"{caption} filter: every {column}",
+                   (db_manager.build_distinct_log_values_query(column, table), []), ("seen",), False)
+
+
+def queries():
+    """(description, (query, params), tables allowed to be scanned, temp B-tree sort allowed) of each query.
+
+    Built once the plan database exists: how a product query filters on a
+    category depends on whether that category has subcategories.
+    """
+    return statements() + list(product_queries()) + list(log_queries())
+
+
+def statements():
+    """The queries the app writes out inline, in the same form as `queries()`."""
+    return [
+        ("Login lookup",
+         ("SELECT id, username, role, password FROM users WHERE username=?", ["admin"]), (), False),
+        ("Store a rehashed password", ("UPDATE users SET password=? WHERE id=?", ["scrypt$...", 1]), (), False),
+        ("Category list",  # read once into models/category_cache.py; also the importer's name map
+         ("SELECT id, name, low_stock_threshold, parent_id FROM categories ORDER BY name", []),
+         ("categories",), False),
+        ("Category tree: top level", (db_manager.CATEGORY_CHILDREN_QUERY, [None]), (), False),
+        ("Category tree: subcategories", (db_manager.CATEGORY_CHILDREN_QUERY, [PARENT]), (), False),
+        ("Category path", (db_manager.CATEGORY_PATH_QUERY, [LEAF]), (), False),
+        ("Delete category: subcategory check",
+         ("SELECT 1 FROM categories WHERE parent_id=? LIMIT 1", [PARENT]), (), False),
+        ("Delete category: product check",
+         ("SELECT 1 FROM products WHERE category_id=? LIMIT 1", [LEAF]), (), False),
+        ("Tree trigger: ancestors of the new parent",
+         ("SELECT ancestor_id, depth + 1 FROM category_tree WHERE descendant_id = ?", [PARENT]), (), False),
+        ("Tree trigger: cycle check",
+         ("SELECT 1 WHERE ? IN (SELECT descendant_id FROM category_tree WHERE ancestor_id = ?)", [PARENT, LEAF]),
+         (), False),
+        ("Tree trigger: unlink a moved subtree",
+         ("DELETE FROM category_tree WHERE descendant_id IN (SELECT descendant_id FROM category_tree "
+          "WHERE ancestor_id = ?) AND ancestor_id IN (SELECT ancestor_id FROM category_tree "
+          "WHERE descendant_id = ? AND ancestor_id != ?)", [LEAF, LEAF, LEAF]), (), False),
+        ("Tree trigger: link a moved subtree",
+         ("SELECT above.ancestor_id, below.descendant_id FROM category_tree above, category_tree below "
+          "WHERE above.descendant_id = ? AND below.ancestor_id = ?", [PARENT, LEAF]), (), False),
+        ("Load product for editing", (products._PRODUCT_QUERY + " WHERE p.id = ?", [1]), (), False),
+        ("Product by SKU",  # scanners and batch stock moves
+         (products._PRODUCT_QUERY + " WHERE p.sku = ? LIMIT 2", ["SKU123"]), (), False),
+        ("Update product",
+         ("UPDATE products SET name=?, category_id=?, sku=?, price=?, quantity_in_stock=? WHERE id=?",
+          ["Laptop", 1, "SKU123", 1000.0, 10, 1]), (), False),
+        ("Stock before update", ("SELECT quantity_in_stock FROM products WHERE id=?", [1]), (), False),
+        ("Product name before delete", ("SELECT name FROM products WHERE id=?", [1]), (), False),
+        ("Delete product stock history", ("DELETE FROM inventory_logs WHERE product_id=?", [1]), (), False),
+        ("Delete product", ("DELETE FROM products WHERE id=?", [1]), (), False),
+        ("Import: existing products by SKU",
+         ("SELECT id, name, sku, quantity_in_stock FROM products WHERE sku IN (?, ?)", ["A", "B"]), (), False),
+        ("Import: last product id", ("SELECT COALESCE(MAX(id), 0) FROM products", []), (), False),
+        ("Retention: oldest log row due",
+         ("SELECT timestamp, id FROM logs WHERE (timestamp, id) < (?, ?) ORDER BY timestamp, id LIMIT 1",
+          ["2025-01-01", 0]), (), False),
+        ("Retention: first log row kept",
+         ("SELECT timestamp, id FROM logs ORDER BY timestamp, id LIMIT 1 OFFSET ?", [1000]), (), False),
+        ("Retention: delete archived log rows",
+         ("DELETE FROM logs WHERE (timestamp, id) < (?, ?)", ["2025-01-01", 0]), (), False),
+        ("Retention: oldest stock row due",
+         ("SELECT timestamp, id FROM inventory_logs WHERE (timestamp, id) < (?, ?) ORDER BY timestamp, id LIMIT 1",
+          ["2025-01-01", 0]), (), False),
+        ("Retention: delete archived stock rows",
+         ("DELETE FROM inventory_logs WHERE (timestamp, id) < (?, ?)", ["2025-01-01", 0]), (), False),
+        ("Setting lookup", ("SELECT value FROM settings WHERE key=?", ["log_max_rows"]), (), False),
+        ("Ledger: latest checkpoint",  # walks the rowid backwards and stops at the first row
+         ("SELECT id, taken_at, ledger_id FROM stock_checkpoints ORDER BY id DESC LIMIT 1", []),
+         ("stock_checkpoints",), False),
+        ("Ledger: checkpoint before a moment",
+         ("SELECT id, taken_at, ledger_id FROM stock_checkpoints WHERE taken_at <= ? "
+          "ORDER BY taken_at DESC, id DESC LIMIT 1", ["2025-07-01"]), (), False),
+        ("Ledger: product balance at a checkpoint",
+         ("SELECT product_id, quantity FROM stock_checkpoint_balances WHERE product_id = ? AND checkpoint_id <= ? "
+          "ORDER BY checkpoint_id DESC LIMIT 1", [1, 1]), (), False),
+        ("Ledger: first row after a moment",
+         ("SELECT id FROM inventory_logs WHERE timestamp > ? ORDER BY timestamp, id LIMIT 1", ["2025-07-01"]),
+         (), False),
+        ("Ledger: one product's movements since a checkpoint",
+         ("SELECT product_id, SUM(change) FROM inventory_logs WHERE id > ? AND timestamp <= ? "
+          "AND product_id IN (SELECT id FROM main.products) AND id < ? AND product_id = ? GROUP BY product_id",
+          [0, "2025-07-01", 100, 1]), (), False),
+        ("Ledger: movements since a checkpoint",  # rowid range; grouping sorts only those rows
+         ("SELECT product_id, SUM(change) FROM inventory_logs NOT INDEXED WHERE id > ? AND timestamp <= ? "
+          "AND product_id IN (SELECT id FROM main.products) AND id < ? GROUP BY product_id",
+          [0, "2025-07-01", 100]), (), True),
+        ("Retention: first ledger row after the checkpoint",
+         ("SELECT timestamp, id FROM inventory_logs WHERE id > ? ORDER BY id LIMIT 1", [0]), (), False),
+        ("Stock summary per category",  # one row per category, not per product
+         ("SELECT COALESCE(c.name, 'Uncategorized'), s.product_count, s.total_quantity, s.stock_value "
+          "FROM category_stock s LEFT JOIN categories c ON c.id = s.category_id "
+          "WHERE s.product_count > 0 ORDER BY s.stock_value DESC", []), ("s",), True),
+        ("Low stock count", ("SELECT COUNT(*) FROM low_stock", []), ("low_stock",), False),
+        ("Low stock list",  # sorts only the products that are below their threshold
+         ("SELECT p.id, p.name, c.name, l.quantity, l.threshold FROM low_stock l "
+          "CROSS JOIN products p ON p.id = l.product_id LEFT JOIN categories c ON c.id = p.category_id "
+          "ORDER BY l.quantity - l.threshold, p.id LIMIT ?", [100]), ("l",), True),
+        ("Stock trigger: category totals",
+         ("UPDATE category_stock SET product_count = product_count - 1 WHERE category_id = ?", [1]), (), False),
+        ("Stock trigger: category threshold changed",
+         ("DELETE FROM low_stock WHERE product_id IN (SELECT id FROM products WHERE category_id = ?)", [1]),
+         (), False),
+        ("Last log id", ("SELECT COALESCE(MAX(id), 0) FROM logs", []), (), False),
+        ("User list", ("SELECT id, username, role FROM users", []), ("users",), False),
+        ("Update user", ("UPDATE users SET password=?, role=? WHERE id=?", ["x", "user", 1]), (), False),
+        ("Delete user", ("DELETE FROM users WHERE id=?", [1]), (), False),
+    ]
+
+
+def plan_problems(plan, allowed_scans, sort_allowed):
+    """Return the plan lines that mean a full scan or an unindexed sort."""
+    problems = []
+    for detail in plan:
+        words = detail.split()
+        # "SCAN t" alone is a full table scan; "SCAN t USING INDEX ..." and
+        # "SCAN t VIRTUAL TABLE ..." walk an index instead
+        if words[0] == "SCAN" and len(words) == 2 and words[1] not in allowed_scans:
+            problems.append(detail)
+        if detail.startswith("USE TEMP B-TREE") and not sort_allowed:
+            problems.append(detail)
+    return problems
+
+
+def check(conn):
+    failures = 0
+    for description, (query, params), allowed_scans, sort_allowed in queries():
+        plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + query, params)]
+        problems = plan_problems(plan, allowed_scans, sort_allowed)
+
+        print(f"{'❌' if problems else '✅'} {description}")
+        for detail in plan:
+            print(f"     {detail}")
+        failures += bool(problems)
+    return failures
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_manager.set_database_path(os.path.join(tmp, "plans.db"))
+        db_manager.create_tables()
+        with db_manager.connection() as conn:
+            conn.execute("INSERT INTO categories (id, name) VALUES (?, 'Electronics')", (PARENT,))
+            conn.execute("INSERT INTO categories (id, name, parent_id) VALUES (?, 'Laptops', ?)", (LEAF, PARENT))
+
+        # pooled connections have foreign_keys on, so deletes plan their FK checks
+        conn = db_manager.get_connection()
+        with log_archive.attached(conn, ARCHIVE_MONTH, create=True):
+            failures = check(conn)
+        db_manager.close_all_connections()
+
+    if failures:
+        print(f"\n❌ {failures} quer{'y' if failures == 1 else 'ies'} fall back to a full scan.")
+        return 1
+    print("\n✅ Every query uses an index.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
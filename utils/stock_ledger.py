@@ -0,0 +1,64 @@
+"""Stock ledger tools: checkpoints, reconciliation and past stock levels.
+
+The app takes a checkpoint and reconciles once a day in the background; run
+these by hand to check or repair balances, or to look back in time:
+
+    python utils/stock_ledger.py checkpoint
+    python utils/stock_ledger.py reconcile          # list products whose stock disagrees with the ledger
+    python utils/stock_ledger.py reconcile --fix    # ... and set their stock to the ledger's
+    python utils/stock_ledger.py as-of 2025-07-01   # every product's stock at the end of that day (UTC)
+    python utils/stock_ledger.py as-of "2025-07-01 12:00:00" --product 7
+"""
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models import db_manager, inventory_ledger
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("checkpoint", help="checkpoint the ledger now")
+    reconcile = commands.add_parser("reconcile", help="check every balance against the ledger")
+    reconcile.add_argument("--fix", action="store_true", help="set mismatched balances to the ledger's")
+    as_of = commands.add_parser("as-of", help="stock at a past moment")
+    as_of.add_argument("moment", help='"YYYY-MM-DD" (end of that day) or "YYYY-MM-DD HH:MM:SS", UTC')
+    as_of.add_argument("--product", type=int, help="just this product id")
+    args = parser.parse_args()
+
+    db_manager.create_tables()
+
+    if args.command == "checkpoint":
+        checkpoint_id = inventory_ledger.take_checkpoint()
+        print(f"✅ Checkpoint {checkpoint_id} taken." if checkpoint_id else "✅ Nothing moved since the last checkpoint.")
+        return 0
+
+    if args.command == "reconcile":
+        mismatches = inventory_ledger.reconcile(fix=args.fix, username="reconcile")
+        for product_id, name, balance, ledger in mismatches:
+            print(f"   #{product_id} {name}: stock {balance}, ledger {ledger}")
+        if not mismatches:
+            print("✅ Every balance matches the ledger.")
+            return 0
+        print(f"{'🔧 Fixed' if args.fix else '❌ Found'} {len(mismatches)} mismatch(es).")
+        return 0 if args.fix else 1
+
+    moment = args.moment if len(args.moment) > 10 else args.moment + " 23:59:59"
+    if args.product is not None:
+        print(f"#{args.product}: {inventory_ledger.stock_as_of(moment, args.product)}")
+        return 0
+
+    stock = inventory_ledger.stock_as_of(moment)
+    with db_manager.connection() as conn:
+        names = dict(conn.execute("SELECT id, name FROM products"))
+    for product_id, quantity in sorted(stock.items()):
+        print(f"   #{product_id} {names.get(product_id, '?')}: {quantity}")
+    print(f"📦 {len(stock)} product(s) in stock at {moment}, {sum(stock.values()):,} unit(s).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())